@@ -1,6 +1,7 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_file
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_file, make_response
 from flask_login import LoginManager, login_required, current_user
 from werkzeug.utils import secure_filename
+from werkzeug.http import is_resource_modified
 import os
 from dotenv import load_dotenv
 import uuid
@@ -18,10 +19,20 @@ import base64
 from io import BytesIO
 
 # Import new modules
-from supabase_client import SupabaseManager
-from pdf_processor import PDFProcessor
+from supabase_client import create_database_manager, clamp_page_size, encode_document_cursor, decode_document_cursor
+from pdf_processor import SECTION5_WIDGETS
+from preview_cache import get_preview_cache, IMAGE_MIME_TYPES
+from render_cache import get_render_cache
+from pdf_renderer import UPLOAD_FOLDER, get_pdf_processor, completed_pdf_cache_key, generate_completed_pdf, fill_pdf_fields_advanced
+from template_compiler import get_template_compiler
+from file_security import get_file_hash
+from user_cache import get_user_cache, cacheable_user
 from models import User, AnonymousUser
 from auth import auth_bp, init_auth
+from collaboration import init_collaboration
+from documents_api import documents_api_bp, init_documents_api
+from job_queue import get_job_queue
+from async_db import init_async_db
 from decorators import admin_required, document_access_required, document_edit_required, api_document_access_required, api_auth_required, api_admin_required
 
 load_dotenv()
@@ -41,20 +52,29 @@ login_manager.anonymous_user = AnonymousUser
 
 # Initialize database and PDF processor
 try:
-    db = SupabaseManager()
-    pdf_processor = PDFProcessor()
+    db = create_database_manager()
+    pdf_processor = get_pdf_processor()
     USE_DATABASE = True
-    print("✅ Connected to Supabase database")
+    print(f"✅ Connected to {type(db).__name__} database")
 except Exception as e:
     print(f"⚠️  Database connection failed: {e}")
     print("🔄 Falling back to mock data")
     db = None
-    pdf_processor = PDFProcessor()
+    pdf_processor = get_pdf_processor()
     USE_DATABASE = False
 
+# Concurrent queries for multi-query routes
+async_db = init_async_db(db)
+
 # Initialize authentication
 init_auth(app, db)
 
+# REST API for the real-time editor
+init_documents_api(app, db)
+
+# Real-time collaboration (Socket.IO)
+socketio = init_collaboration(app, db)
+
 # User loader for Flask-Login
 @login_manager.user_loader
 def load_user(user_id):
@@ -63,7 +83,16 @@ def load_user(user_id):
         return None
     
     try:
-        user_data = db.get_user_by_id(user_id)
+        # Runs on every authenticated request, so serve it from the user cache when possible
+        user_cache = get_user_cache()
+        user_data = user_cache.get(user_id)
+        if user_data is None:
+            user_data = db.get_user_by_id(user_id)
+            if user_data:
+                # Same columns whether or not the row came from the cache
+                user_data = cacheable_user(user_data)
+                user_cache.put(user_id, user_data)
+        
         if user_data and user_data.get('is_active', False):
             return User(user_data)
         return None
@@ -73,9 +102,9 @@ def load_user(user_id):
 
 # Register blueprints
 app.register_blueprint(auth_bp, url_prefix='/auth')
+app.register_blueprint(documents_api_bp, url_prefix='/api/documents')
 
-# File upload configuration
-UPLOAD_FOLDER = 'uploads'
+# File upload configuration (UPLOAD_FOLDER comes from pdf_renderer, which writes completed PDFs there)
 ALLOWED_EXTENSIONS = {'pdf'}
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
@@ -208,21 +237,60 @@ MOCK_DOCUMENTS = [
     }
 ]
 
-def get_documents():
-    """Get documents from database or mock data"""
+def paginate_mock_documents(documents, cursor=None, limit=None):
+    """Keyset-paginate an in-memory document list the same way SupabaseManager.get_documents_page does"""
+    limit = clamp_page_size(limit)
+    ordered = sorted(documents, key=lambda doc: (doc.get('created_at') or '', str(doc['id'])), reverse=True)
+    
+    position = decode_document_cursor(cursor)
+    if position:
+        ordered = [doc for doc in ordered if (doc.get('created_at') or '', str(doc['id'])) < position]
+    
+    page = ordered[:limit]
+    return {
+        'documents': page,
+        'next_cursor': encode_document_cursor(page[-1]) if len(ordered) > limit else None,
+        'total_estimate': len(documents),
+        'limit': limit
+    }
+
+def get_documents(cursor=None, limit=None, user_id=None):
+    """Get one page of documents from database or mock data"""
     if USE_DATABASE and db:
         try:
-            return db.get_all_documents()
+            return db.get_documents_page(limit=limit, cursor=cursor, user_id=user_id)
         except Exception as e:
             print(f"Database error: {e}")
-            return MOCK_DOCUMENTS
-    return MOCK_DOCUMENTS
+            if user_id:
+                # Never show a user documents that aren't theirs - an empty list until the database is back
+                return paginate_mock_documents([], cursor, limit)
+            return paginate_mock_documents(MOCK_DOCUMENTS, cursor, limit)
+    return paginate_mock_documents(MOCK_DOCUMENTS, cursor, limit)
+
+def get_compiled_template(template):
+    """Compiled bundle of a database template; its PDF is only fetched (streamed from the blob store) the first time on this node"""
+    compiler = get_template_compiler()
+    # Blob keys and bundles are both the SHA-256 of the template, so any node finds the bundle directly
+    template_bundle = compiler.load(template.get('blob_key')) or compiler.load_for_template(template['id'])
+    if template_bundle:
+        return template_bundle
+    
+    file_path = db.get_template_file_path(template['id'])
+    if not file_path:
+        return None
+    
+    try:
+        return compiler.compile(file_path, template['filename'], template['id'], extract_fields=extract_pdf_fields)
+    except Exception as e:
+        print(f"❌ Error compiling template {template['id']}: {e}")
+        return None
 
-def get_document_by_id(document_id):
-    """Get single document by ID"""
+def get_document_by_id(document_id, view='full'):
+    """Get single document by ID (view picks the columns loaded - see DOCUMENT_VIEWS)"""
     if USE_DATABASE and db:
         try:
-            return db.get_document(document_id)
+            # Document row and fields in one round trip
+            return db.load_document(document_id, view)
         except Exception as e:
             print(f"Database error: {e}")
             return next((doc for doc in MOCK_DOCUMENTS if doc['id'] == document_id), None)
@@ -268,63 +336,11 @@ def create_enhanced_pdf_with_section5(input_pdf_path, output_pdf_path):
     try:
         print(f"🛠️  Creating enhanced PDF with Section 5 widgets...")
         
-        # Define Section 5 fields with improved positioning on PAGE 5
-        section5_fields = [
-            {
-                'name': 'Account Holder Name (Affidavit)',
-                'pdf_field_name': 'account_holder_name_affidavit',
-                'type': 'text',
-                'assigned_to': 'user2',
-                'page': 4,  # Page 5 (0-indexed)
-                'position': {'x': 145, 'y': 135, 'width': 250, 'height': 25}  # Final position: right (X=145) and adjusted down (Y=135)
-            },
-            {
-                'name': 'Household Member Names (No Income)', 
-                'pdf_field_name': 'household_member_names_no_income',
-                'type': 'textarea',
-                'assigned_to': 'user2',
-                'page': 4,  # Page 5 (0-indexed)
-                'position': {'x': 35, 'y': 255, 'width': 450, 'height': 80}
-            },
-            {
-                'name': 'Affidavit Signature',
-                'pdf_field_name': 'affidavit_signature', 
-                'type': 'signature',
-                'assigned_to': 'user2',
-                'page': 4,  # Page 5 (0-indexed)
-                'position': {'x': 40, 'y': 470, 'width': 200, 'height': 30}
-            },
-            {
-                'name': 'Printed Name (Affidavit)',
-                'pdf_field_name': 'printed_name_affidavit',
-                'type': 'text',
-                'assigned_to': 'user2',
-                'page': 4,  # Page 5 (0-indexed)
-                'position': {'x': 305, 'y': 480, 'width': 230, 'height': 25}
-            },
-            {
-                'name': 'Date (Affidavit)',
-                'pdf_field_name': 'date_affidavit',
-                'type': 'date',
-                'assigned_to': 'user2',
-                'page': 4,  # Page 5 (0-indexed)
-                'position': {'x': 40, 'y': 525, 'width': 150, 'height': 25}
-            },
-            {
-                'name': 'Telephone (Affidavit)',
-                'pdf_field_name': 'telephone_affidavit',
-                'type': 'tel', 
-                'assigned_to': 'user2',
-                'page': 4,  # Page 5 (0-indexed)
-                'position': {'x': 305, 'y': 525, 'width': 150, 'height': 25}
-            }
-        ]
-        
         # Use the PDF processor to add widgets
-        success = pdf_processor.add_form_widgets_to_pdf(input_pdf_path, section5_fields, output_pdf_path)
+        success = pdf_processor.add_form_widgets_to_pdf(input_pdf_path, SECTION5_WIDGETS, output_pdf_path)
         
         if success:
-            print(f"✅ Successfully created enhanced PDF with {len(section5_fields)} Section 5 widgets")
+            print(f"✅ Successfully created enhanced PDF with {len(SECTION5_WIDGETS)} Section 5 widgets")
             return True
         else:
             print(f"❌ Failed to create enhanced PDF")
@@ -695,352 +711,72 @@ def convert_pdf_to_image(pdf_path, page_num=0):
         print(f"Error converting PDF to image: {e}")
         return "/static/placeholder-pdf.png"
 
-def generate_completed_pdf(document):
-    """Generate a completed PDF with all field values filled"""
-    try:
-        print(f"🎯 Generating completed PDF for document: {document['name']}")
-        print(f"📊 Document has keys: {list(document.keys())}")
-        
-        # Debug: print document data
-        if 'pdf_fields' in document:
-            print(f"📋 PDF fields count: {len(document['pdf_fields'])}")
-            for field in document['pdf_fields'][:3]:  # Show first 3 fields
-                print(f"   - {field.get('name', 'unnamed')}: '{field.get('value', '')}' → {field.get('assigned_to', 'unassigned')}")
-        
-        if 'user1_data' in document:
-            print(f"👤 User 1 data: {list(document['user1_data'].keys())}")
-            
-        if 'user2_data' in document:
-            print(f"👥 User 2 data: {list(document['user2_data'].keys())}")
-        
-        # Check if we have the original PDF file
-        if 'file_path' not in document or not os.path.exists(document['file_path']):
-            print("❌ Original PDF file not found, generating summary PDF")
-            return generate_summary_pdf(document)
-        
-        print(f"📄 Original PDF found: {document['file_path']}")
-        
-        # Check if we need to use enhanced PDF with Section 5 widgets
-        enhanced_pdf_path = document['file_path'].replace('.pdf', '_enhanced.pdf')
-        if os.path.exists(enhanced_pdf_path):
-            print(f"🛠️  Using enhanced PDF with Section 5 widgets: {enhanced_pdf_path}")
-            source_pdf_path = enhanced_pdf_path
-        else:
-            print(f"📄 Using original PDF: {document['file_path']}")
-            source_pdf_path = document['file_path']
-        
-        # Create output path
-        output_filename = f"completed_{document['id']}_{document['name']}"
-        output_path = os.path.join(app.config['UPLOAD_FOLDER'], output_filename)
-        print(f"📁 Output path: {output_path}")
-        
-        # Try PyMuPDF first for better accuracy
-        print("🔧 Attempting to fill PDF with PyMuPDF...")
-        if pdf_processor.fill_pdf_with_pymupdf(source_pdf_path, document, output_path):
-            print(f"✅ Successfully filled PDF with PyMuPDF: {output_path}")
-            return output_path
-        
-        # Fallback to advanced filling
-        print("🔧 Attempting to fill with legacy method...")
-        if fill_pdf_fields_advanced(document['file_path'], document, output_path):
-            print(f"✅ Successfully filled original PDF: {output_path}")
-            return output_path
-        
-        # Final fallback: create overlay PDF
-        print("🔧 Attempting to create overlay PDF...")
-        if pdf_processor.create_overlay_pdf(document['file_path'], document.get('pdf_fields', []), output_path):
-            print(f"✅ Successfully created overlay PDF: {output_path}")
-            return output_path
-        else:
-            print("⚠️  Could not fill original PDF, generating summary PDF instead")
-            return generate_summary_pdf(document)
-            
-    except Exception as e:
-        print(f"❌ Error generating completed PDF: {e}")
-        import traceback
-        traceback.print_exc()
-        print("🔄 Falling back to summary PDF generation...")
-        return generate_summary_pdf(document)
+def page_image_version(pdf_path):
+    """Short content version used to make page image URLs cache-busting"""
+    return get_file_hash(pdf_path)[:16]
 
-def fill_pdf_fields_advanced(pdf_path, document, output_path):
-    """Advanced PDF field filling with better field matching"""
+def page_image_response(pdf_path, page_index, tile=None):
+    """Stream a rendered page (or one (column, row) tile of it) as raw image bytes with ETag/Last-Modified caching headers"""
+    image_format = request.args.get('format', 'png').lower()
+    if image_format == 'jpg':
+        image_format = 'jpeg'
+    if image_format not in IMAGE_MIME_TYPES:
+        return jsonify({'error': f'Unsupported image format: {image_format}'}), 400
+    
     try:
-        with open(pdf_path, 'rb') as input_file:
-            pdf_reader = PyPDF2.PdfReader(input_file)
-            pdf_writer = PyPDF2.PdfWriter()
-            
-            print(f"📄 Processing PDF with {len(pdf_reader.pages)} pages")
-            
-            # Create a mapping of field names to values from our extracted fields
-            field_mapping = {}
-            
-            # Map PDF field values using the original field names/IDs from extraction
-            if 'pdf_fields' in document:
-                for field in document['pdf_fields']:
-                    if field.get('value'):
-                        # Use the original field name from the PDF extraction
-                        original_name = field['name']
-                        field_id = field.get('id', '')
-                        field_value = field['value']
-                        pdf_field_name = field.get('pdf_field_name', original_name)
-                        
-                        # Map using exact field names first (highest priority)
-                        field_mapping[pdf_field_name] = field_value
-                        field_mapping[original_name] = field_value
-                        field_mapping[field_id] = field_value
-                        
-                        # Also map lowercase versions for fallback
-                        field_mapping[pdf_field_name.lower()] = field_value
-                        field_mapping[original_name.lower()] = field_value
-                        
-                        print(f"📝 Mapping field: '{pdf_field_name}' = '{field_value}'")
-            
-            print(f"📋 Created {len(field_mapping)} field mappings")
-            filled_count = 0
-            
-            # Method 1: Try to fill using AcroForm fields directly
-            if '/AcroForm' in pdf_reader.trailer.get('/Root', {}):
-                acro_form = pdf_reader.trailer['/Root']['/AcroForm']
-                print("✅ Found AcroForm in PDF")
-                
-                if '/Fields' in acro_form:
-                    form_fields = acro_form['/Fields']
-                    print(f"📋 Found {len(form_fields)} form fields in AcroForm")
-                    
-                    for i, field_ref in enumerate(form_fields):
-                        try:
-                            field_obj = field_ref.get_object()
-                            if '/T' in field_obj:
-                                field_name = str(field_obj['/T'])
-                                print(f"🔍 Processing form field: '{field_name}'")
-                                
-                                # Look for a matching value in our mapping
-                                field_value = None
-                                
-                                # Try exact match first
-                                if field_name in field_mapping:
-                                    field_value = field_mapping[field_name]
-                                # Try lowercase match
-                                elif field_name.lower() in field_mapping:
-                                    field_value = field_mapping[field_name.lower()]
-                                # Try partial matches
-                                else:
-                                    for mapped_name, mapped_value in field_mapping.items():
-                                        if (mapped_name.lower() in field_name.lower() or 
-                                            field_name.lower() in mapped_name.lower()):
-                                            field_value = mapped_value
-                                            break
-                                
-                                if field_value:
-                                    try:
-                                        # Fill the field value
-                                        field_obj.update({
-                                            PyPDF2.generic.NameObject('/V'): 
-                                            PyPDF2.generic.TextStringObject(str(field_value))
-                                        })
-                                        filled_count += 1
-                                        print(f"✅ Filled field '{field_name}' with '{field_value}'")
-                                    except Exception as e:
-                                        print(f"⚠️  Could not fill field '{field_name}': {e}")
-                                else:
-                                    print(f"⭕ No value found for field '{field_name}'")
-                        except Exception as e:
-                            print(f"⚠️  Error processing field {i}: {e}")
-            
-            # Method 2: Also try annotation-based approach for additional coverage
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                
-                if '/Annots' in page:
-                    annotations = page['/Annots']
-                    for annotation in annotations:
-                        try:
-                            annotation_obj = annotation.get_object()
-                            if '/T' in annotation_obj and '/Subtype' in annotation_obj:
-                                subtype = annotation_obj['/Subtype']
-                                if subtype == '/Widget':  # Form field widget
-                                    field_name = str(annotation_obj['/T'])
-                                    
-                                    # Skip if we already filled this field
-                                    if any(field_name in str(filled) for filled in range(filled_count)):
-                                        continue
-                                    
-                                    # Look for value
-                                    field_value = None
-                                    if field_name in field_mapping:
-                                        field_value = field_mapping[field_name]
-                                    elif field_name.lower() in field_mapping:
-                                        field_value = field_mapping[field_name.lower()]
-                                    
-                                    if field_value:
-                                        try:
-                                            annotation_obj.update({
-                                                PyPDF2.generic.NameObject('/V'): 
-                                                PyPDF2.generic.TextStringObject(str(field_value))
-                                            })
-                                            filled_count += 1
-                                            print(f"✅ Filled annotation field '{field_name}' with '{field_value}'")
-                                        except Exception as e:
-                                            print(f"⚠️  Could not fill annotation field '{field_name}': {e}")
-                        except Exception as e:
-                            continue
-                
-                pdf_writer.add_page(page)
-            
-            # Write the filled PDF
-            with open(output_path, 'wb') as output_file:
-                pdf_writer.write(output_file)
-            
-            print(f"✅ Successfully filled {filled_count} fields in original PDF")
-            
-            # Only consider it successful if we actually filled some fields
-            if filled_count > 0:
-                return True
-            else:
-                print("⚠️  No fields were actually filled in original PDF")
-                return False
-                
-    except Exception as e:
-        print(f"❌ Error in fill_pdf_fields_advanced: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+        scale = min(max(float(request.args.get('scale', 2.0)), 0.25), 4.0)
+        tile_size = min(max(int(request.args.get('tile_size', 512)), 128), 2048)
+    except ValueError:
+        return jsonify({'error': 'Invalid scale or tile size'}), 400
+    
+    file_hash = get_file_hash(pdf_path)
+    if not file_hash:
+        return jsonify({'error': 'PDF file not found'}), 404
+    
+    etag = f"{file_hash}-p{page_index}-s{scale:g}-{image_format}"
+    if tile is not None:
+        etag += f"-t{tile_size}-{tile[0]}x{tile[1]}"
+    last_modified = datetime.utcfromtimestamp(int(os.path.getmtime(pdf_path)))
+    
+    # URLs carrying the current content version never change, so browsers can keep them forever;
+    # anything else must revalidate (cheap - answered with a 304 below)
+    if request.args.get('v') == file_hash[:16]:
+        cache_control = 'private, max-age=31536000, immutable'
+    else:
+        cache_control = 'private, no-cache'
+    
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = make_response('', 304)
+    else:
+        if tile is None:
+            image_data = pdf_processor.render_page_image(pdf_path, page_index, scale, image_format)
+        else:
+            image_data = pdf_processor.render_page_tile(pdf_path, page_index, tile[0], tile[1],
+                                                        scale, tile_size, image_format)
+        if image_data is None:
+            # Pages (and tiles) outside the document render nothing
+            return jsonify({'error': 'Page not found'}), 404
+        response = make_response(image_data)
+        response.mimetype = IMAGE_MIME_TYPES[image_format]
+    
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = cache_control
+    return response
 
-def generate_summary_pdf(document):
-    """Generate a summary PDF when original PDF filling fails"""
-    try:
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.pagesizes import letter
-        from reportlab.lib import colors
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        
-        output_filename = f"summary_{document['id']}_{document['name']}"
-        output_path = os.path.join(app.config['UPLOAD_FOLDER'], output_filename)
-        
-        # Create PDF document
-        doc = SimpleDocTemplate(output_path, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
-        
-        # Title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Title'],
-            fontSize=18,
-            textColor=colors.darkblue,
-            spaceAfter=20
-        )
-        story.append(Paragraph(f"Completed Document: {document['name']}", title_style))
-        story.append(Spacer(1, 20))
-        
-        # Document info
-        info_data = [
-            ['Document ID:', document['id']],
-            ['Status:', document.get('status', 'Completed')],
-            ['Completed:', document.get('completed_at', 'Recently')[:10] if document.get('completed_at') else 'Recently']
-        ]
-        
-        info_table = Table(info_data, colWidths=[2*inch, 4*inch])
-        info_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(info_table)
-        story.append(Spacer(1, 20))
-        
-        # User 1 Information
-        if document.get('user1_data'):
-            story.append(Paragraph("User 1 Information", styles['Heading2']))
-            user1_data = []
-            for key, value in document['user1_data'].items():
-                if value:
-                    user1_data.append([key.replace('_', ' ').title(), str(value)])
-            
-            if user1_data:
-                user1_table = Table(user1_data, colWidths=[2*inch, 4*inch])
-                user1_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (0, -1), colors.lightblue),
-                    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                story.append(user1_table)
-                story.append(Spacer(1, 20))
-        
-        # PDF Fields
-        if document.get('pdf_fields'):
-            story.append(Paragraph("Completed Form Fields", styles['Heading2']))
-            
-            # Add header row
-            field_data = [['Field Name', 'Value', 'Completed By']]
-            
-            for field in document['pdf_fields']:
-                if field.get('value'):
-                    user_label = "User 1" if field['assigned_to'] == 'user1' else "User 2"
-                    field_data.append([
-                        field['name'],
-                        field['value'],
-                        user_label
-                    ])
-            
-            if len(field_data) > 1:  # More than just header
-                field_table = Table(field_data, colWidths=[2.5*inch, 3*inch, 1*inch])
-                field_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-                ]))
-                story.append(field_table)
-                story.append(Spacer(1, 20))
-            else:
-                story.append(Paragraph("No field values were provided.", styles['Normal']))
-                story.append(Spacer(1, 20))
-        
-        # User 2 Information
-        if document.get('user2_data'):
-            story.append(Paragraph("User 2 Information", styles['Heading2']))
-            user2_data = []
-            for key, value in document['user2_data'].items():
-                if value and key != 'signature':
-                    user2_data.append([key.replace('_', ' ').title(), str(value)])
-            
-            if user2_data:
-                user2_table = Table(user2_data, colWidths=[2*inch, 4*inch])
-                user2_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (0, -1), colors.orange),
-                    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                story.append(user2_table)
-        
-        # Build PDF
-        doc.build(story)
-        print(f"✅ Generated summary PDF: {output_path}")
-        return output_path
-        
-    except Exception as e:
-        print(f"❌ Error generating summary PDF: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
+def completed_pdf_response(output_path, download_name, cache_key=None):
+    """send_file for a completed PDF, answering If-None-Match with 304 when the render is unchanged"""
+    response = send_file(
+        output_path,
+        as_attachment=True,
+        download_name=download_name,
+        mimetype='application/pdf',
+        conditional=True,
+        etag=cache_key or True
+    )
+    # Field values can change at any time, so clients must revalidate (cheap: a 304 from the cache key)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 def fill_pdf_fields(pdf_path, field_data, output_path):
     """Legacy PDF field filling function"""
@@ -1050,18 +786,22 @@ def fill_pdf_fields(pdf_path, field_data, output_path):
 @login_required
 def dashboard():
     """Home/Dashboard page - matches your React Dashboard component"""
-    if USE_DATABASE and db:
-        # Get documents specific to this user
-        if current_user.is_admin():
-            # Admins can see all documents
-            documents = db.get_all_documents()
-        else:
-            # Regular users see only their documents and shared documents
-            documents = db.get_user_documents(current_user.id)
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', type=int)
+    
+    if USE_DATABASE and db and not current_user.is_admin():
+        # Regular users see only their documents and shared documents
+        page = get_documents(cursor, limit, user_id=current_user.id)
     else:
-        # Fallback to mock data
-        documents = get_documents()
-    return render_template('dashboard.html', documents=documents)
+        # Admins can see all documents (falls back to mock data without a database)
+        page = get_documents(cursor, limit)
+    
+    return render_template('dashboard.html',
+                           documents=page['documents'],
+                           next_cursor=page['next_cursor'],
+                           total_estimate=page['total_estimate'],
+                           page_limit=page['limit'],
+                           is_first_page=not cursor)
 
 @app.route('/start-workflow')
 @login_required
@@ -1094,24 +834,18 @@ def user1_interface():
             if not template:
                 template = templates[0]  # Fallback to first template
             
-            # Get template file data
-            file_data = db.get_template_file_data(template['id'])
-            if not file_data:
-                flash('Error accessing template document', 'error')
-                return redirect(request.url)
-            
-            # Save template to uploads folder for processing
+            # Fields, widget index and thumbnails come from the compiled bundle; the document gets its own PDF copy
             document_id = str(uuid.uuid4())
             filename = template['filename']
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{document_id}_{filename}")
-            
-            try:
-                with open(file_path, 'wb') as f:
-                    f.write(file_data)
-                print(f"✅ Using template document: {template['name']}")
-            except Exception as e:
-                flash(f'Error creating document from template: {str(e)}', 'error')
+            template_bundle = get_compiled_template(template)
+            if not template_bundle:
+                flash('Error accessing template document', 'error')
                 return redirect(request.url)
+            
+            file_path = get_template_compiler().create_document_file(
+                template_bundle, app.config['UPLOAD_FOLDER'], document_id, filename
+            )
+            print(f"✅ Using template document: {template['name']}")
         else:
             # Fallback for development - use local file
             local_pdf_path = os.path.join(os.getcwd(), 'homworks.pdf')
@@ -1122,10 +856,14 @@ def user1_interface():
             
             document_id = str(uuid.uuid4())
             filename = 'homworks.pdf'
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{document_id}_{filename}")
+            template_bundle = get_template_compiler().compile(local_pdf_path, filename, extract_fields=extract_pdf_fields)
+            if not template_bundle:
+                flash('Error processing PDF template', 'error')
+                return redirect(request.url)
             
-            import shutil
-            shutil.copy2(local_pdf_path, file_path)
+            file_path = get_template_compiler().create_document_file(
+                template_bundle, app.config['UPLOAD_FOLDER'], document_id, filename
+            )
             print(f"✅ Using local template file: {filename}")
         
         # Get form data from User 1
@@ -1141,11 +879,8 @@ def user1_interface():
             'address': request.form.get('address', '')
         }
         
-        # Extract PDF fields
-        pdf_analysis = extract_pdf_fields(file_path)
-        if "error" in pdf_analysis:
-            flash(f'Error processing PDF: {pdf_analysis["error"]}', 'error')
-            return redirect(request.url)
+        # Fields were extracted when the template was compiled
+        pdf_analysis = {'fields': get_template_compiler().get_fields(template_bundle)}
         
         # Process PDF fields data from User 1
         pdf_fields_data = request.form.get('pdf_fields')
@@ -1206,7 +941,7 @@ def user1_interface():
         # Save document to database with current user as owner
         if USE_DATABASE and db:
             try:
-                db.create_document(
+                async_db.run(async_db.create_document(
                     document_id=document_id,
                     name=filename,
                     file_path=file_path,
@@ -1216,7 +951,7 @@ def user1_interface():
                         'pdf_fields': pdf_analysis['fields'],
                         'field_assignments': {field['id']: field['assigned_to'] for field in pdf_analysis['fields']}
                     }
-                )
+                ))
                 print(f"✅ Document saved to database with owner: {current_user.id}")
             except Exception as e:
                 print(f"⚠️ Error saving to database: {e}")
@@ -1342,6 +1077,9 @@ def user2_interface(document_id):
                 })
                 break
         
+        # User 2's values change the completed PDF
+        get_render_cache().invalidate_document(document_id)
+        
         return redirect(url_for('completion_page', document_id=document_id))
     
     return render_template('user2_enhanced.html', document=document)
@@ -1356,7 +1094,7 @@ def completion_page(document_id):
         flash('Document not found', 'error')
         return redirect(url_for('dashboard'))
     
-    return render_template('completion.html', document=document)
+    return render_template('completion.html', document=document, job_id=request.args.get('job_id'))
 
 @app.route('/download/<document_id>')
 @login_required
@@ -1365,7 +1103,7 @@ def download_document(document_id):
     """Download completed PDF document"""
     print(f"🔽 Download request for document: {document_id}")
     
-    document = get_document_by_id(document_id)
+    document = get_document_by_id(document_id, view='download')
     if not document:
         print(f"❌ Document not found: {document_id}")
         flash('Document not found', 'error')
@@ -1374,6 +1112,20 @@ def download_document(document_id):
     print(f"📋 Document found: {document.get('name', 'unknown')}")
     print(f"📊 Document data keys: {list(document.keys())}")
     
+    # Unchanged since the last render: serve it (or a 304) without touching the fill pipeline
+    cache_key = completed_pdf_cache_key(document)
+    cached_path = get_render_cache().get(document_id, cache_key)
+    if cached_path:
+        print(f"♻️  Serving cached completed PDF: {cached_path}")
+        return completed_pdf_response(cached_path, f"completed_{document['name']}", cache_key)
+    
+    if render_jobs_enabled():
+        # Rendering can take seconds on big forms, so hand it to a worker and let the client poll
+        job = enqueue_render_job(document)
+        if request.accept_mimetypes.best == 'application/json':
+            return jsonify(job_status_payload(job)), 202
+        return redirect(url_for('completion_page', document_id=document_id, job_id=job['id']))
+    
     # Debug: Show field values at download time
     if 'pdf_fields' in document:
         fields_with_values = [f for f in document['pdf_fields'] if f.get('value')]
@@ -1409,12 +1161,8 @@ def download_document(document_id):
             print("📤 Sending PDF file for download...")
             
             # Return the file for download with improved headers
-            return send_file(
-                output_path,
-                as_attachment=True,
-                download_name=f"completed_{document['name']}",
-                mimetype='application/pdf'
-            )
+            etag = cache_key if get_render_cache().holds(output_path) else None
+            return completed_pdf_response(output_path, f"completed_{document['name']}", etag)
         else:
             print("❌ PDF generation failed - no output file")
             flash('Error generating PDF. Please try again.', 'error')
@@ -1427,6 +1175,81 @@ def download_document(document_id):
         flash(f'Error generating PDF download: {str(e)}', 'error')
         return redirect(url_for('completion_page', document_id=document_id))
 
+def render_jobs_enabled():
+    """Background rendering needs the database - worker processes can't see this process's mock data"""
+    return get_job_queue().enabled and USE_DATABASE and db is not None
+
+def enqueue_render_job(document):
+    """Queue generation of the completed PDF (reusing a pending job for the same source file and field values)"""
+    # Field saves don't bump updated_at, so key on what the render depends on
+    version = completed_pdf_cache_key(document) or document.get('updated_at', '')
+    dedupe_key = f"render:{document['id']}:{version}"
+    return get_job_queue().enqueue('render_completed_pdf', {'document_id': document['id']}, dedupe_key=dedupe_key)
+
+def job_status_payload(job):
+    """Public view of a job for the status endpoint"""
+    payload = {
+        'job_id': job['id'],
+        'status': job['status'],
+        'status_url': url_for('get_job_status', job_id=job['id'])
+    }
+    if job['status'] == 'done':
+        payload['download_url'] = url_for('download_job_result', job_id=job['id'])
+    elif job['status'] == 'failed':
+        payload['error'] = job.get('error') or 'PDF generation failed'
+    return payload
+
+def get_accessible_job(job_id):
+    """Look up a job, or None if it doesn't exist or the current user can't see its document"""
+    job = get_job_queue().get(job_id)
+    if not job:
+        return None
+    if not current_user.can_access_document(job['payload'].get('document_id'), db):
+        return None
+    return job
+
+@app.route('/api/download-jobs/<document_id>', methods=['POST'])
+@login_required
+@api_document_access_required
+def create_download_job(document_id):
+    """Queue generation of the completed PDF and return the job's status URL"""
+    document = get_document_by_id(document_id, view='download')
+    if not document:
+        return jsonify({'error': 'Document not found'}), 404
+    
+    if not render_jobs_enabled():
+        # Synchronous fallback: the download URL renders the PDF itself
+        return jsonify({'status': 'done', 'download_url': url_for('download_document', document_id=document_id)})
+    
+    job = enqueue_render_job(document)
+    return jsonify(job_status_payload(job)), 202
+
+@app.route('/api/jobs/<job_id>')
+@login_required
+def get_job_status(job_id):
+    """Status of a background job"""
+    job = get_accessible_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify(job_status_payload(job))
+
+@app.route('/download/job/<job_id>')
+@login_required
+def download_job_result(job_id):
+    """Download the PDF produced by a finished render job"""
+    job = get_accessible_job(job_id)
+    if not job or job['status'] != 'done':
+        flash('The document is not ready yet', 'error')
+        return redirect(url_for('dashboard'))
+    
+    result = job['result']
+    if not os.path.exists(result['output_path']):
+        flash('Generated PDF is no longer available. Please download again.', 'error')
+        return redirect(url_for('completion_page', document_id=job['payload']['document_id']))
+    
+    return completed_pdf_response(result['output_path'], result['download_name'], result.get('cache_key'))
+
 @app.route('/api/pdf-fields/<document_id>')
 @login_required
 @api_document_access_required
@@ -1515,6 +1338,7 @@ def update_field_value(document_id):
             if field['id'] == field_id:
                 field['value'] = value
                 break
+    get_render_cache().invalidate_document(document_id)
     
     return jsonify({'success': True, 'field_id': field_id, 'value': value})
 
@@ -1528,21 +1352,12 @@ def extract_fields_local_api():
         if not os.path.exists(local_pdf_path):
             return jsonify({'error': 'Local PDF file (homworks.pdf) not found'}), 404
         
-        # Create enhanced PDF with Section 5 widgets first
-        enhanced_pdf_path = local_pdf_path.replace('.pdf', '_enhanced.pdf')
-        if create_enhanced_pdf_with_section5(local_pdf_path, enhanced_pdf_path):
-            print(f"✅ Created enhanced PDF with Section 5 widgets: {enhanced_pdf_path}")
-            # Use the enhanced PDF for field extraction
-            extraction_path = enhanced_pdf_path
-        else:
-            print(f"⚠️  Using original PDF for extraction")
-            extraction_path = local_pdf_path
+        # The compiled bundle already holds the Section 5 enhanced PDF and its extracted fields
+        template_bundle = get_template_compiler().compile(local_pdf_path, 'homworks.pdf', extract_fields=extract_pdf_fields)
+        if not template_bundle:
+            return jsonify({'error': 'Failed to compile local PDF template'}), 500
         
-        # Extract PDF fields from the enhanced version
-        pdf_analysis = extract_pdf_fields(extraction_path)
-        
-        if "error" in pdf_analysis:
-            return jsonify({'error': pdf_analysis['error']}), 500
+        pdf_analysis = {'fields': get_template_compiler().get_fields(template_bundle)}
         
         return jsonify({
             'fields': pdf_analysis['fields'],
@@ -1643,8 +1458,9 @@ def get_pdf_preview(document_id):
     if not document or 'file_path' not in document:
         return jsonify({'error': 'Document not found'}), 404
     
-    # Convert PDF to image
-    image_url = convert_pdf_to_image(document['file_path'])
+    # Point the client at the binary image endpoint instead of inlining the image
+    image_url = url_for('get_document_page_image', document_id=document_id, page_num=1,
+                        v=page_image_version(document['file_path']))
     
     # Get PDF info
     pdf_info = pdf_processor.get_pdf_info(document['file_path'])
@@ -1681,13 +1497,10 @@ def get_pdf_preview_upload():
         file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
         file.save(file_path)
         
-        # Convert PDF to image (specific page or auto-select)
-        image_url = convert_pdf_to_image(file_path, page_num)
-        
         # Get PDF info
         pdf_info = pdf_processor.get_pdf_info(file_path)
         
-        # Determine which page was actually rendered
+        # Determine which page to show (specific page or auto-select)
         actual_page = 0  # Default
         if page_num is not None:
             actual_page = min(page_num, pdf_info.get('page_count', 1) - 1)
@@ -1704,6 +1517,10 @@ def get_pdf_preview_upload():
                     actual_page = p_num
             doc.close()
         
+        # Point the client at the binary image endpoint instead of inlining the image
+        image_url = url_for('get_page_image', file_path=file_path, page_num=actual_page + 1,
+                            v=page_image_version(file_path))
+        
         # Clean up temporary file (optional - could keep for later use)
         # os.remove(file_path)
         
@@ -1731,8 +1548,9 @@ def get_pdf_page(file_path, page_num):
         if not os.path.exists(file_path):
             return jsonify({'error': 'PDF file not found'}), 404
         
-        # Convert specific page to image
-        image_url = convert_pdf_to_image(file_path, page_num - 1)  # Convert to 0-indexed
+        # Point the client at the binary image endpoint for this page
+        image_url = url_for('get_page_image', file_path=file_path, page_num=page_num,
+                            v=page_image_version(file_path))
         
         # Get PDF info
         pdf_info = pdf_processor.get_pdf_info(file_path)
@@ -1748,6 +1566,106 @@ def get_pdf_page(file_path, page_num):
         print(f"Error generating PDF page: {e}")
         return jsonify({'error': f'Failed to generate PDF page: {str(e)}'}), 500
 
+def resolve_upload_path(file_path):
+    """Real path of a file inside the upload folder, or None (rejects ../ and symlinks that leave it)"""
+    upload_root = os.path.realpath(app.config['UPLOAD_FOLDER'])
+    real_path = os.path.realpath(file_path)
+    if os.path.commonpath([upload_root, real_path]) != upload_root or real_path == upload_root:
+        return None
+    return real_path
+
+@app.route('/api/page-image/<path:file_path>/<int:page_num>')
+@login_required
+def get_page_image(file_path, page_num):
+    """Raw page image (PNG/JPEG/WebP) of an already uploaded PDF, with HTTP caching"""
+    # Security check - ensure file path resolves to a file within the uploads directory
+    real_path = resolve_upload_path(file_path)
+    if not real_path:
+        return jsonify({'error': 'Invalid file path'}), 400
+    
+    if not os.path.isfile(real_path):
+        return jsonify({'error': 'PDF file not found'}), 404
+    
+    return page_image_response(real_path, page_num - 1)  # Convert to 0-indexed
+
+@app.route('/api/document-page-image/<document_id>/<int:page_num>')
+@login_required
+@api_document_access_required
+def get_document_page_image(document_id, page_num):
+    """Raw page image (PNG/JPEG/WebP) of a document's PDF, with HTTP caching"""
+    document = get_document_by_id(document_id)
+    if not document or 'file_path' not in document or not os.path.exists(document['file_path']):
+        return jsonify({'error': 'Document not found'}), 404
+    
+    return page_image_response(document['file_path'], page_num - 1)  # Convert to 0-indexed
+
+@app.route('/api/template-thumbnail/<template_hash>/<int:page_num>')
+@login_required
+def get_template_thumbnail(template_hash, page_num):
+    """Page thumbnail (1-indexed) from a compiled template bundle"""
+    if not all(c in '0123456789abcdef' for c in template_hash):
+        return jsonify({'error': 'Invalid template'}), 400
+    
+    template_bundle = get_template_compiler().load(template_hash)
+    if (not template_bundle or page_num < 1 or page_num > len(template_bundle['thumbnail_paths'])
+            or not template_bundle['thumbnail_paths'][page_num - 1]):
+        return jsonify({'error': 'Thumbnail not found'}), 404
+    
+    # Bundles are immutable (keyed by content hash)
+    response = send_file(template_bundle['thumbnail_paths'][page_num - 1], mimetype='image/jpeg', conditional=True)
+    response.headers['Cache-Control'] = 'private, max-age=31536000, immutable'
+    return response
+
+@app.route('/api/document-page-tile/<document_id>/<int:page_num>/<int:column>/<int:row>')
+@login_required
+@api_document_access_required
+def get_document_page_tile(document_id, page_num, column, row):
+    """One tile of a document page rendered at full resolution, with HTTP caching"""
+    document = get_document_by_id(document_id)
+    if not document or 'file_path' not in document or not os.path.exists(document['file_path']):
+        return jsonify({'error': 'Document not found'}), 404
+    
+    return page_image_response(document['file_path'], page_num - 1, tile=(column, row))
+
+@app.route('/api/document-page-tiles/<document_id>/<int:page_num>')
+@login_required
+@api_document_access_required
+def get_document_page_tiles(document_id, page_num):
+    """Tile manifest for progressive rendering: a low-resolution preview plus the full-resolution tile grid"""
+    document = get_document_by_id(document_id)
+    if not document or 'file_path' not in document or not os.path.exists(document['file_path']):
+        return jsonify({'error': 'Document not found'}), 404
+    
+    try:
+        scale = min(max(float(request.args.get('scale', 2.0)), 0.25), 4.0)
+        tile_size = min(max(int(request.args.get('tile_size', 512)), 128), 2048)
+    except ValueError:
+        return jsonify({'error': 'Invalid scale or tile size'}), 400
+    
+    file_path = document['file_path']
+    layout = pdf_processor.get_page_tile_layout(file_path, page_num - 1, scale, tile_size)
+    if layout is None:
+        return jsonify({'error': 'Page not found'}), 404
+    
+    version = page_image_version(file_path)
+    
+    # The preview scale keeps the first paint small (roughly one tile's worth of pixels) whatever the page size
+    preview_scale = round(min(0.5, tile_size / max(layout['page_width'], layout['page_height'], 1)), 3)
+    preview_url = url_for('get_document_page_image', document_id=document_id, page_num=page_num,
+                          scale=preview_scale, format='jpeg', v=version)
+    
+    # Flask would percent-encode literal placeholders, so build the template from a sentinel tile
+    tile_url_template = url_for('get_document_page_tile', document_id=document_id, page_num=page_num,
+                                column=987654321, row=123456789, scale=scale, tile_size=tile_size, v=version)
+    tile_url_template = tile_url_template.replace('987654321', '{column}').replace('123456789', '{row}')
+    
+    return jsonify({
+        'page': page_num,
+        'preview_url': preview_url,
+        'tile_url_template': tile_url_template,
+        **layout
+    })
+
 @app.route('/api/save-fields/<document_id>', methods=['POST'])
 @login_required
 @api_document_access_required
@@ -1763,11 +1681,12 @@ def save_fields(document_id):
         
         if USE_DATABASE and db:
             # Save to database
-            success = db.save_pdf_fields(document_id, fields)
-            if success:
-                return jsonify({'success': True, 'message': f'Saved {len(fields)} fields'})
-            else:
-                return jsonify({'error': 'Failed to save fields to database'}), 500
+            changes = db.save_pdf_fields(document_id, fields)
+            return jsonify({
+                'success': True,
+                'message': f"Saved {len(fields)} fields ({changes['added']} added, {changes['updated']} updated, {changes['removed']} removed)",
+                'changes': changes
+            })
         else:
             # Update mock data
             for doc in MOCK_DOCUMENTS:
@@ -1775,6 +1694,7 @@ def save_fields(document_id):
                     doc['pdf_fields'] = fields
                     doc['field_assignments'] = {field['id']: field['assigned_to'] for field in fields}
                     break
+            get_render_cache().invalidate_document(document_id)
             
             return jsonify({'success': True, 'message': f'Saved {len(fields)} fields'})
             
@@ -1870,7 +1790,7 @@ def debug_pdf_extraction(document_id):
     
     # Test PyMuPDF extraction
     try:
-        pymupdf_result = pdf_processor.extract_fields_with_pymupdf(file_path)
+        pymupdf_result = pdf_processor.extract_fields_with_pymupdf(file_path, use_cache=False)
         results['extraction_results']['pymupdf'] = pymupdf_result
     except Exception as e:
         results['extraction_results']['pymupdf'] = {'error': str(e)}
@@ -1891,6 +1811,28 @@ def debug_pdf_extraction(document_id):
     
     return jsonify(results)
 
+@app.route('/api/admin/preview-cache-stats')
+@login_required
+@api_admin_required
+def preview_cache_stats():
+    """Hit/miss counters and memory usage of the rendered page-preview cache"""
+    return jsonify(get_preview_cache().stats())
+
+@app.route('/api/admin/render-cache-stats')
+@login_required
+@api_admin_required
+def render_cache_stats():
+    """Hit/miss counters of the completed-PDF render cache"""
+    return jsonify(get_render_cache().stats())
+
+@app.route('/api/admin/supabase-transport-stats')
+@login_required
+@api_admin_required
+def supabase_transport_stats():
+    """Connection pool settings and per-table PostgREST latency histograms"""
+    from supabase_transport import get_supabase_transport
+    return jsonify(get_supabase_transport().stats())
+
 @app.route('/debug-fields')
 def debug_fields_page():
     """Debug page for testing PDF field extraction"""
@@ -1900,4 +1842,4 @@ if __name__ == '__main__':
     print("🚀 PDF Collaborator Flask App Starting...")
     print("📊 Using mock data for development")
     print("🌐 Access at: http://localhost:5006")
-    app.run(debug=True, port=5006)
\ No newline at end of file
+    socketio.run(app, debug=True, port=5006)
\ No newline at end of file
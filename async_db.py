@@ -0,0 +1,108 @@
+"""
+Asyncio variant of the storage manager that issues independent queries concurrently, plus a sync facade for Flask routes
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Dict, List, Optional
+
+
+class AsyncSupabaseManager:
+    """Same methods as the wrapped manager (SupabaseManager or SQLiteManager), as coroutines
+
+    Each call runs on a bounded thread pool (the underlying clients are blocking), so awaiting
+    several calls together with gather() costs the latency of the slowest one.
+    """
+
+    def __init__(self, manager, max_workers: int = None):
+        self.manager = manager
+        # Sized like the Supabase connection pool so concurrent calls never queue for a connection twice
+        self.max_workers = max_workers or int(os.getenv('ASYNC_DB_MAX_WORKERS', os.getenv('SUPABASE_POOL_MAX_CONNECTIONS', '20')))
+        self.timeout = float(os.getenv('ASYNC_DB_TIMEOUT_SECONDS', '30'))
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str):
+        # Any manager method not overridden below becomes a coroutine running on the pool
+        if name == 'manager':
+            raise AttributeError(name)
+        method = getattr(self.manager, name)
+        if name.startswith('_') or not callable(method):
+            return method
+
+        async def call(*args, **kwargs):
+            return await self.call(method, *args, **kwargs)
+        return call
+
+    async def call(self, method, *args, **kwargs) -> Any:
+        """Run one blocking manager call on the pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(method, *args, **kwargs))
+
+    async def gather(self, *calls: Awaitable) -> List[Any]:
+        """Await independent calls concurrently; the first error is raised once all have finished"""
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return list(results)
+
+    async def create_document(self, document_id: str, name: str, file_path: str, owner_id: str,
+                              metadata: Dict[str, Any] = None) -> str:
+        """Create a new document record; the owner relationship and audit entry are written concurrently"""
+        await self.call(self.manager.insert_document, document_id, name, file_path, metadata)
+
+        await self.gather(
+            self.call(self.manager.add_user_to_document, document_id, owner_id, 'owner', created_by=owner_id),
+            self.call(self.manager.log_action, document_id, owner_id, 'document_created',
+                      f"Document '{name}' created")
+        )
+        return document_id
+
+    # Sync facade
+    def run(self, coroutine: Awaitable, timeout: float = None) -> Any:
+        """Run a coroutine from synchronous code (Flask routes) and wait for its result"""
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._get_loop())
+        return future.result(timeout or self.timeout)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        self._ensure_process()
+        return self._executor
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        self._ensure_process()
+        return self._loop
+
+    def _ensure_process(self) -> None:
+        # Threads don't survive a fork, so each (gunicorn) worker process starts its own loop and pool
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='async-db')
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, name='async-db-loop', daemon=True).start()
+            self._pid = os.getpid()
+
+
+# Global instance (created once the storage backend is known)
+async_db: Optional[AsyncSupabaseManager] = None
+
+def init_async_db(db_manager) -> Optional[AsyncSupabaseManager]:
+    """Wrap the app's storage manager (None when running on mock data)"""
+    global async_db
+    async_db = AsyncSupabaseManager(db_manager) if db_manager else None
+    return async_db
+
+def get_async_db() -> Optional[AsyncSupabaseManager]:
+    """Get the global async storage manager"""
+    return async_db
@@ -0,0 +1,250 @@
+"""
+Background writer that batches audit-log records into bulk inserts
+"""
+
+import atexit
+import glob
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Control messages travel through the same queue as records so they are handled in order
+_FLUSH = 'flush'
+_STOP = 'stop'
+
+# Postgres SQLSTATE classes that retrying can't fix: data exceptions, constraint violations, bad columns
+PERMANENT_SQLSTATE_CLASSES = ('22', '23', '42')
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """True if an insert failed because of the records themselves (retrying the same rows fails again)"""
+    if isinstance(error, (sqlite3.IntegrityError, TypeError, ValueError)):
+        return True
+
+    # postgrest APIError carries the SQLSTATE, a PGRST code, or the HTTP status when the body wasn't JSON
+    code = getattr(error, 'code', None)
+    if isinstance(code, str) and code.isdigit() and len(code) == 3:
+        code = int(code)
+    if isinstance(code, int):
+        return 400 <= code < 500 and code not in (408, 429)
+    if isinstance(code, str):
+        return code[:2] in PERMANENT_SQLSTATE_CLASSES or code.startswith(('PGRST1', 'PGRST2'))
+    return False
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class AuditWriter:
+    """Buffers audit records in a bounded queue and writes them in bulk from a daemon thread"""
+
+    def __init__(self, insert_batch: Callable[[List[Dict[str, Any]]], None], spool_path: str = None,
+                 batch_size: int = None, flush_interval: float = None, max_queue: int = None):
+        self.insert_batch = insert_batch
+        self.spool_path = spool_path or os.getenv('AUDIT_SPOOL_PATH', os.path.join('cache', 'audit_spool.jsonl'))
+        self.batch_size = batch_size or int(os.getenv('AUDIT_BATCH_SIZE', '50'))
+        self.flush_interval = flush_interval or float(os.getenv('AUDIT_FLUSH_INTERVAL_SECONDS', '2'))
+        self.retry_interval = float(os.getenv('AUDIT_RETRY_INTERVAL_SECONDS', '30'))
+
+        # Records that can't be inserted (database down, queue full) go to the JSONL spool and are replayed later;
+        # records the database rejects outright go to the .rejected file instead
+        self.rejected_path = f"{self.spool_path}.rejected"
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue or int(os.getenv('AUDIT_QUEUE_SIZE', '10000')))
+        self._spool_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+        self._retry_spool_at = 0.0
+
+        spool_dir = os.path.dirname(self.spool_path)
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+
+        atexit.register(self.stop)
+
+    def enqueue(self, record: Dict[str, Any]) -> None:
+        """Queue a record for the next bulk insert without blocking the caller"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            # Never block a request on auditing; the spool is replayed once the backlog clears
+            self._spool([record])
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Write everything queued so far; returns False if the writer did not finish in time"""
+        if not self._is_running():
+            return True
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        return done.wait(timeout)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush and stop the writer thread (registered with atexit)"""
+        if not self._is_running():
+            return
+        done = threading.Event()
+        self._queue.put((_STOP, done))
+        done.wait(timeout)
+
+    def _is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and self._pid == os.getpid()
+
+    def _ensure_started(self) -> None:
+        # Worker threads don't survive fork (gunicorn preload), so each process starts its own
+        if self._is_running():
+            return
+        with self._start_lock:
+            if self._is_running():
+                return
+            if self._pid != os.getpid():
+                # Anything inherited from the parent's queue belongs to the parent process
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._pid = os.getpid()
+            self._adopt_orphaned_replays()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, tuple):
+                command, done = item
+                self._write(batch, force_spool_replay=True)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+                done.set()
+                if command == _STOP:
+                    return
+                continue
+
+            if item is not None:
+                batch.append(item)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._write(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _write(self, batch: List[Dict[str, Any]], force_spool_replay: bool = False) -> None:
+        if force_spool_replay or time.monotonic() >= self._retry_spool_at:
+            self._replay_spool()
+
+        if not batch:
+            return
+
+        failed = self._insert(batch)
+        if failed:
+            print(f"⚠️  Spooling {len(failed)} audit records")
+            self._spool(failed)
+            self._retry_spool_at = time.monotonic() + self.retry_interval
+
+    def _insert(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert records, returning those to retry later; a permanently rejected batch is bisected
+        so one bad record can't hold back the rest"""
+        try:
+            self.insert_batch(records)
+            return []
+        except Exception as e:
+            if not is_permanent_error(e):
+                print(f"⚠️  Audit log insert failed ({e})")
+                return records
+            if len(records) == 1:
+                self._reject(records[0], e)
+                return []
+            middle = len(records) // 2
+            return self._insert(records[:middle]) + self._insert(records[middle:])
+
+    def _reject(self, record: Dict[str, Any], error: Exception) -> None:
+        print(f"❌ Audit record rejected ({error}), moved to {self.rejected_path}")
+        try:
+            with self._spool_lock:
+                with open(self.rejected_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'record': record, 'error': str(error)}, default=str) + '\n')
+        except Exception as e:
+            print(f"❌ Could not keep rejected audit record: {e}")
+
+    def _spool(self, records: List[Dict[str, Any]]) -> None:
+        try:
+            with self._spool_lock:
+                with open(self.spool_path, 'a', encoding='utf-8') as f:
+                    for record in records:
+                        f.write(json.dumps(record, default=str) + '\n')
+        except Exception as e:
+            print(f"❌ Could not spool audit records, {len(records)} lost: {e}")
+
+    def _replay_spool(self) -> None:
+        if not os.path.exists(self.spool_path):
+            return
+
+        # Claim the spool by renaming it so concurrent workers never replay the same records
+        claimed_path = f"{self.spool_path}.{os.getpid()}.replay"
+        try:
+            with self._spool_lock:
+                os.replace(self.spool_path, claimed_path)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"⚠️  Could not claim audit spool: {e}")
+            return
+
+        try:
+            with open(claimed_path, 'r', encoding='utf-8') as f:
+                records = [json.loads(line) for line in f if line.strip()]
+        except Exception as e:
+            print(f"❌ Unreadable audit spool left at {claimed_path}: {e}")
+            return
+
+        for start in range(0, len(records), self.batch_size):
+            failed = self._insert(records[start:start + self.batch_size])
+            if failed:
+                remaining = failed + records[start + self.batch_size:]
+                print(f"⚠️  Audit spool replay stopped, keeping {len(remaining)} records")
+                self._spool(remaining)
+                self._retry_spool_at = time.monotonic() + self.retry_interval
+                break
+        else:
+            print(f"📝 Replayed {len(records)} spooled audit records")
+
+        os.remove(claimed_path)
+
+    def _adopt_orphaned_replays(self) -> None:
+        """Put back claimed spools left behind by processes that died mid-replay"""
+        for orphan_path in glob.glob(f"{glob.escape(self.spool_path)}.*.replay"):
+            owner = orphan_path[len(self.spool_path) + 1:-len('.replay')]
+            # This process hasn't replayed yet, so a file with its own pid is from an earlier process
+            if not owner.isdigit() or (int(owner) != os.getpid() and pid_alive(int(owner))):
+                continue
+
+            # Claim it first so two processes starting together don't both adopt it
+            adopted_path = f"{orphan_path}.{os.getpid()}.adopted"
+            try:
+                os.replace(orphan_path, adopted_path)
+                with open(adopted_path, 'r', encoding='utf-8') as f:
+                    records = [json.loads(line) for line in f if line.strip()]
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                print(f"❌ Unreadable audit spool left at {orphan_path}: {e}")
+                continue
+
+            self._spool(records)
+            os.remove(adopted_path)
+            print(f"📝 Recovered {len(records)} audit records from {os.path.basename(orphan_path)}")
@@ -209,8 +209,9 @@ def change_password():
             flash('All fields are required', 'error')
             return render_template('auth/change_password.html')
         
-        # Verify current password
-        if not current_user.check_password(current_password):
+        # Verify current password (the session user comes from the user cache, which holds no password hash)
+        user_data = db.get_user_by_id(current_user.id)
+        if not user_data or not User.verify_password(current_password, user_data.get('password_hash')):
             flash('Current password is incorrect', 'error')
             return render_template('auth/change_password.html')
         
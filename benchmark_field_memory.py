@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark memory held by cached fields: per-field dicts vs. packed PDFField objects
+
+Usage: python benchmark_field_memory.py [field_count | path/to/form.pdf]
+"""
+
+import copy
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from field_model import pack_fields, unpack_fields
+
+def synthetic_fields(count):
+    """Fields shaped like extract_widget_info_enhanced and extract_widget_info_detailed output"""
+    fields = []
+    for i in range(count):
+        page = i // 40
+        x, y = 50.0 + (i % 4) * 120.5, 700.0 - (i % 40) * 16.25
+        if i % 2:
+            fields.append({
+                'id': f"Text{i}_{page}_{i % 40}",
+                'name': f"Field {i}",
+                'pdf_field_name': f"Text{i}",
+                'type': 'text',
+                'value': '',
+                'position': {'x': x, 'y': y, 'width': 110.0, 'height': 14.0},
+                'assigned_to': 'user1' if i % 3 else 'user2',
+                'page': page,
+                'source': 'pymupdf_widget'
+            })
+        else:
+            fields.append({
+                'id': f"{i:032x}",
+                'name': f"Field {i}",
+                'pdf_field_name': f"Check{i}",
+                'type': 'checkbox',
+                'value': False,
+                'position': {'x': x, 'y': y, 'width': 12.0, 'height': 12.0, 'page': page + 1,
+                             'page_width': 612.0, 'page_height': 792.0,
+                             'relative_x': x / 612.0, 'relative_y': y / 792.0,
+                             'relative_width': 12.0 / 612.0, 'relative_height': 12.0 / 792.0},
+                'styling': {'font_size': 10, 'text_color': [0, 0, 0], 'border_width': 1},
+                'required': False,
+                'assigned_to': 'user2',
+                'widget_index': i % 40,
+                'page': page + 1,
+                'created_at': datetime.utcnow().isoformat(),
+                'metadata': {'field_flags': 0, 'field_type_code': 2, 'field_type_string': 'CheckBox', 'max_length': None}
+            })
+    return fields
+
+def pdf_fields(pdf_path):
+    """Fields extracted from a real form"""
+    from pdf_processor import PDFProcessor
+    result = PDFProcessor().extract_fields_with_pymupdf(pdf_path, use_cache=False)
+    if 'error' in result:
+        print(f"❌ Extraction failed: {result['error']}")
+        sys.exit(1)
+    return result['fields']
+
+def measure(build):
+    """Bytes still allocated by whatever build() returns"""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    value = build()
+    allocated = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return value, allocated
+
+def benchmark(source):
+    fields = source()
+    count = len(fields)
+    print(f"🔍 Benchmarking {count} fields")
+
+    # Measure each representation as its own fresh copy, the way a cache holds it
+    _, dict_bytes = measure(lambda: copy.deepcopy(fields))
+    packed, packed_bytes = measure(lambda: pack_fields(fields))
+
+    assert unpack_fields(packed) == fields, "packed fields do not round-trip"
+
+    start = time.perf_counter()
+    copy.deepcopy(fields)
+    deepcopy_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    unpack_fields(packed)
+    unpack_ms = (time.perf_counter() - start) * 1000
+
+    print(f"📊 Dicts:    {dict_bytes / 1024:.1f} KiB ({dict_bytes / count:.0f} B/field)")
+    print(f"📊 PDFField: {packed_bytes / 1024:.1f} KiB ({packed_bytes / count:.0f} B/field)")
+    if packed_bytes > 0:
+        print(f"✅ Memory: {dict_bytes / packed_bytes:.2f}x smaller")
+    print(f"📊 Cache read - deepcopy of dicts: {deepcopy_ms:.1f} ms, unpack: {unpack_ms:.1f} ms")
+
+if __name__ == "__main__":
+    argument = sys.argv[1] if len(sys.argv) > 1 else '5000'
+
+    if argument.isdigit():
+        benchmark(lambda: synthetic_fields(int(argument)))
+    elif os.path.exists(argument):
+        benchmark(lambda: pdf_fields(argument))
+    else:
+        print(f"❌ PDF file not found: {argument}")
+        sys.exit(1)
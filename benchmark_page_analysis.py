@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-page text extraction cost: repeated get_text() calls vs. a single PageAnalysis pass
+
+Usage: python benchmark_page_analysis.py [path/to/form.pdf] [iterations]
+"""
+
+import os
+import sys
+import time
+
+import fitz  # PyMuPDF
+
+from page_analysis import PageAnalysis
+
+def legacy_page_pass(page):
+    """What extraction used to do per page: two dict extractions plus a plain-text pass"""
+    page.get_text("dict")          # label lookup in extract_fields_with_pymupdf
+    list(page.widgets())
+    list(page.annots())
+    page.get_text("dict")          # detect_text_based_fields
+    page.get_text()                # create_intelligent_fields
+
+def analysis_page_pass(page, page_num):
+    """Single shared extraction used by all detectors"""
+    PageAnalysis(page, page_num)
+
+def benchmark(pdf_path, iterations):
+    doc = fitz.open(pdf_path)
+    page_count = len(doc)
+
+    print(f"🔍 Benchmarking {pdf_path} ({page_count} pages, {iterations} iterations)")
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for page_num in range(page_count):
+            legacy_page_pass(doc[page_num])
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for page_num in range(page_count):
+            analysis_page_pass(doc[page_num], page_num)
+    analysis_seconds = time.perf_counter() - start
+
+    doc.close()
+
+    pages_processed = page_count * iterations
+    legacy_ms = legacy_seconds * 1000 / pages_processed
+    analysis_ms = analysis_seconds * 1000 / pages_processed
+
+    print(f"📊 Before (repeated get_text): {legacy_ms:.2f} ms/page")
+    print(f"📊 After  (PageAnalysis):      {analysis_ms:.2f} ms/page")
+    if analysis_ms > 0:
+        print(f"✅ Speedup: {legacy_ms / analysis_ms:.2f}x")
+
+if __name__ == "__main__":
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.getcwd(), 'homworks.pdf')
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    if not os.path.exists(pdf_path):
+        print(f"❌ PDF file not found: {pdf_path}")
+        sys.exit(1)
+
+    benchmark(pdf_path, iterations)
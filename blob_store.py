@@ -0,0 +1,272 @@
+"""
+Content-addressed blob storage (local filesystem or Supabase Storage) with a local read-through cache
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from typing import BinaryIO, Iterator, Optional
+
+from file_security import get_file_hash
+
+# Streaming copies move this much at a time, so memory use doesn't grow with blob size
+BLOB_CHUNK_SIZE = 1024 * 1024
+
+
+def blob_relpath(key: str) -> str:
+    """Fan keys out over two directory levels so no directory gets huge"""
+    return os.path.join(key[:2], key[2:4], key)
+
+def is_blob_key(key: str) -> bool:
+    return bool(key) and len(key) == 64 and all(c in '0123456789abcdef' for c in key)
+
+def iter_file_range(file_path: str, start: int = 0, end: int = None,
+                    chunk_size: int = BLOB_CHUNK_SIZE) -> Iterator[bytes]:
+    """Stream bytes [start, end] (inclusive, like an HTTP Range) of a file"""
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        remaining = None if end is None else end - start + 1
+        while remaining is None or remaining > 0:
+            chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+
+class LocalBlobBackend:
+    """Blobs as files under a directory (already local, so reads need no cache)"""
+
+    is_local = True
+
+    def __init__(self, root: str = None):
+        self.root = root or os.getenv('BLOB_STORE_DIR', os.path.join('storage', 'blobs'))
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, blob_relpath(key))
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def put_file(self, key: str, file_path: str) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            shutil.copyfile(file_path, temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def iter_chunks(self, key: str, start: int = 0, end: int = None,
+                    chunk_size: int = BLOB_CHUNK_SIZE) -> Iterator[bytes]:
+        """Stream bytes [start, end] (inclusive, like an HTTP Range) of a blob"""
+        return iter_file_range(self.path(key), start, end, chunk_size)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+
+class SupabaseBlobBackend:
+    """Blobs as objects in a Supabase Storage bucket, streamed over the Storage REST API"""
+
+    is_local = False
+
+    def __init__(self, url: str = None, key: str = None, bucket: str = None):
+        import httpx
+
+        url = url or os.getenv('SUPABASE_URL')
+        # Uploads need a key allowed to write the bucket; the anon key only works with a permissive policy
+        key = key or os.getenv('BLOB_STORE_SUPABASE_KEY') or os.getenv('SUPABASE_ANON_KEY')
+        if not url or not key:
+            raise ValueError("SUPABASE_URL and a storage key must be set for the supabase blob backend")
+
+        self.bucket = bucket or os.getenv('BLOB_STORE_BUCKET', 'blobs')
+        self.client = httpx.Client(
+            base_url=f"{url.rstrip('/')}/storage/v1",
+            headers={'Authorization': f"Bearer {key}", 'apikey': key},
+            timeout=httpx.Timeout(float(os.getenv('BLOB_STORE_TIMEOUT_SECONDS', '60')), connect=10.0)
+        )
+
+    def _object_url(self, key: str) -> str:
+        return f"/object/{self.bucket}/{blob_relpath(key)}"
+
+    def exists(self, key: str) -> bool:
+        response = self.client.head(self._object_url(key))
+        return response.status_code == 200
+
+    def put_file(self, key: str, file_path: str) -> None:
+        with open(file_path, 'rb') as f:
+            # httpx streams file bodies, so the upload isn't buffered in memory
+            response = self.client.post(
+                self._object_url(key),
+                content=f,
+                headers={'Content-Type': 'application/octet-stream', 'x-upsert': 'true'}
+            )
+        response.raise_for_status()
+
+    def iter_chunks(self, key: str, start: int = 0, end: int = None,
+                    chunk_size: int = BLOB_CHUNK_SIZE) -> Iterator[bytes]:
+        """Stream bytes [start, end] (inclusive, like an HTTP Range) of a blob"""
+        headers = {}
+        if start or end is not None:
+            headers['Range'] = f"bytes={start}-{'' if end is None else end}"
+
+        with self.client.stream('GET', self._object_url(key), headers=headers) as response:
+            if response.status_code == 404:
+                raise FileNotFoundError(f"Blob not found: {key}")
+            response.raise_for_status()
+            yield from response.iter_bytes(chunk_size)
+
+    def delete(self, key: str) -> None:
+        self.client.request('DELETE', f"/object/{self.bucket}", json={'prefixes': [blob_relpath(key)]})
+
+
+# Backends selectable with BLOB_STORE_BACKEND
+BLOB_BACKENDS = {
+    'local': LocalBlobBackend,
+    'supabase': SupabaseBlobBackend,
+}
+
+
+class BlobStore:
+    """Content-addressed blobs (key = SHA-256 of the bytes) with a size-bounded local read-through cache"""
+
+    def __init__(self, backend=None, cache_dir: str = None, cache_max_bytes: int = None):
+        self._backend = backend
+        self.cache_dir = cache_dir or os.getenv('BLOB_CACHE_DIR', os.path.join('cache', 'blobs'))
+        self.cache_max_bytes = cache_max_bytes or int(os.getenv('BLOB_CACHE_MAX_BYTES', str(1024 * 1024 * 1024)))
+
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @property
+    def backend(self):
+        # Created on first use so importing this module never needs storage credentials
+        if self._backend is None:
+            self._backend = BLOB_BACKENDS[os.getenv('BLOB_STORE_BACKEND', 'local')]()
+        return self._backend
+
+    def put_file(self, file_path: str) -> str:
+        """Store a file and return its key; storing the same bytes twice is a no-op"""
+        key = get_file_hash(file_path)
+        if not key:
+            raise OSError(f"Could not read {file_path}")
+        if not self.backend.exists(key):
+            self.backend.put_file(key, file_path)
+            print(f"📦 Stored blob {key[:12]} ({os.path.getsize(file_path)} bytes)")
+        return key
+
+    def put_bytes(self, data: bytes) -> str:
+        """Store in-memory bytes (for migrating legacy rows); prefer put_file for anything large"""
+        temp_path = os.path.join(self.cache_dir, f"upload-{os.getpid()}-{uuid.uuid4().hex}.tmp")
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            return self.put_file(temp_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def local_path(self, key: str) -> Optional[str]:
+        """A local file holding the blob - the stored file itself, or a verified copy in the read-through cache"""
+        if not is_blob_key(key):
+            return None
+
+        if self.backend.is_local:
+            return self.backend.path(key) if self.backend.exists(key) else None
+
+        path = os.path.join(self.cache_dir, blob_relpath(key))
+        if os.path.exists(path):
+            # Touch so eviction drops the least recently used blobs first
+            os.utime(path)
+            return path
+
+        return self._fetch(key, path)
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """Open a blob for streaming reads"""
+        path = self.local_path(key)
+        return open(path, 'rb') if path else None
+
+    def iter_range(self, key: str, start: int = 0, end: int = None,
+                   chunk_size: int = BLOB_CHUNK_SIZE) -> Iterator[bytes]:
+        """Stream a byte range, from the cache when the blob is there, otherwise straight from the backend"""
+        if not self.backend.is_local:
+            cached_path = os.path.join(self.cache_dir, blob_relpath(key))
+            if os.path.exists(cached_path):
+                yield from iter_file_range(cached_path, start, end, chunk_size)
+                return
+        yield from self.backend.iter_chunks(key, start, end, chunk_size)
+
+    def read_range(self, key: str, start: int, length: int) -> bytes:
+        return b''.join(self.iter_range(key, start, start + length - 1))
+
+    def _fetch(self, key: str, path: str) -> Optional[str]:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+        hash_sha256 = hashlib.sha256()
+
+        try:
+            with open(temp_path, 'wb') as f:
+                for chunk in self.backend.iter_chunks(key):
+                    hash_sha256.update(chunk)
+                    f.write(chunk)
+
+            if hash_sha256.hexdigest() != key:
+                raise ValueError('content does not match its key')
+
+            os.replace(temp_path, path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"❌ Error fetching blob {key[:12]}: {e}")
+            return None
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        self._evict()
+        return path
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            total = 0
+            for directory, _, filenames in os.walk(self.cache_dir):
+                for filename in filenames:
+                    if not is_blob_key(filename):
+                        continue
+                    path = os.path.join(directory, filename)
+                    try:
+                        stat_info = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat_info.st_mtime, stat_info.st_size, path))
+                    total += stat_info.st_size
+
+            # Least recently used first
+            for _, size, path in sorted(entries):
+                if total <= self.cache_max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+
+# Global instance
+blob_store = BlobStore()
+
+def get_blob_store() -> BlobStore:
+    """Get the global blob store instance"""
+    return blob_store
@@ -0,0 +1,270 @@
+"""
+Real-time collaboration server (Socket.IO) for realtime-pdf-editor.js
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from flask import request
+from flask_login import current_user
+from flask_socketio import SocketIO, emit, join_room, leave_room
+
+# Client field properties (as sent by realtime-pdf-editor.js) -> pdf_fields columns
+FIELD_PROPERTY_COLUMNS = {
+    'name': 'field_name',
+    'type': 'field_type',
+    'value': 'field_value',
+    'required': 'is_required',
+    'assigned_to': 'assigned_to',
+    'page': 'page_number',
+}
+
+# 'position' arrives as one object and is stored across four columns
+POSITION_COLUMNS = {'x': 'position_x', 'y': 'position_y', 'width': 'width', 'height': 'height'}
+
+
+def socketio_cors_origins() -> Optional[List[str]]:
+    """Origins allowed to open sockets; None means same-origin only (sockets carry the session cookie)"""
+    origins = [origin.strip() for origin in os.getenv('SOCKETIO_CORS_ORIGINS', '').split(',') if origin.strip()]
+    return origins or None
+
+
+# A Redis/RabbitMQ URL here lets several nodes share rooms; async mode defaults to whatever is installed
+socketio = SocketIO(
+    cors_allowed_origins=socketio_cors_origins(),
+    message_queue=os.getenv('SOCKETIO_MESSAGE_QUEUE') or None,
+    async_mode=os.getenv('SOCKETIO_ASYNC_MODE') or None
+)
+
+
+class CollaborationHub:
+    """Room membership plus coalesced broadcast and persistence of field updates"""
+
+    def __init__(self, broadcast_interval: float = None, persist_interval: float = None):
+        self.broadcast_interval = broadcast_interval or float(os.getenv('COLLAB_BROADCAST_INTERVAL_SECONDS', '0.05'))
+        self.persist_interval = persist_interval or float(os.getenv('COLLAB_PERSIST_INTERVAL_SECONDS', '1.0'))
+        self.db = None
+
+        # document_id -> {sid: presence info}
+        self.rooms: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # sid -> document_id
+        self.sessions: Dict[str, str] = {}
+        # document_id -> {(field_id, property): delta} waiting to be broadcast; later updates overwrite earlier ones
+        self.pending_broadcasts: Dict[str, Dict[tuple, Dict[str, Any]]] = {}
+        # document_id -> {field_id: {column: value}} waiting to be written to the database
+        self.pending_writes: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # document_id -> ids of its stored fields (edits can only be persisted for those)
+        self.known_fields: Dict[str, set] = {}
+
+        self._lock = threading.Lock()
+        self._flusher_started = False
+
+    def start(self, db) -> None:
+        """Attach the database and start the background flush loop (once per process)"""
+        self.db = db
+        with self._lock:
+            if self._flusher_started:
+                return
+            self._flusher_started = True
+        socketio.start_background_task(self._flush_loop)
+
+    def join(self, sid: str, document_id: str, presence: Dict[str, Any]) -> List[Dict[str, Any]]:
+        with self._lock:
+            self.rooms.setdefault(document_id, {})[sid] = presence
+            self.sessions[sid] = document_id
+            return list(self.rooms[document_id].values())
+
+    def leave(self, sid: str) -> Optional[tuple]:
+        """Remove a connection; returns (document_id, presence, remaining users, room now empty)"""
+        with self._lock:
+            document_id = self.sessions.pop(sid, None)
+            if document_id is None:
+                return None
+            members = self.rooms.get(document_id, {})
+            presence = members.pop(sid, None)
+            if not members:
+                self.rooms.pop(document_id, None)
+                self.known_fields.pop(document_id, None)
+            return document_id, presence, list(members.values()), not members
+
+    def document_for(self, sid: str) -> Optional[str]:
+        with self._lock:
+            return self.sessions.get(sid)
+
+    def field_exists(self, document_id: str, field_id: str) -> bool:
+        """True if the field is stored for the document (fields saved since the last check are picked up)"""
+        if not self.db:
+            # Nothing is persisted without a database, so edits are only relayed
+            return True
+        with self._lock:
+            known = self.known_fields.get(document_id)
+            if known is not None and field_id in known:
+                return True
+
+        known = {field['id'] for field in self.db.get_document_fields(document_id)}
+        with self._lock:
+            self.known_fields[document_id] = known
+        return field_id in known
+
+    def queue_update(self, document_id: str, field_id: str, prop: str, value: Any, session_id: str) -> None:
+        """Record a field change for the next broadcast and the next database write"""
+        columns = self._columns_for(prop, value)
+        with self._lock:
+            self.pending_broadcasts.setdefault(document_id, {})[(field_id, prop)] = {
+                'fieldId': field_id,
+                'property': prop,
+                'value': value,
+                'sessionId': session_id
+            }
+            self.pending_writes.setdefault(document_id, {}).setdefault(field_id, {}).update(columns)
+
+    def flush_broadcasts(self) -> None:
+        with self._lock:
+            pending, self.pending_broadcasts = self.pending_broadcasts, {}
+
+        for document_id, deltas in pending.items():
+            for delta in deltas.values():
+                socketio.emit('field_updated', delta, to=document_id)
+
+    def flush_writes(self, document_id: str = None) -> None:
+        with self._lock:
+            if document_id is None:
+                pending, self.pending_writes = self.pending_writes, {}
+            else:
+                pending = {document_id: self.pending_writes.pop(document_id, {})}
+
+        if not self.db:
+            return
+
+        for doc_id, updates in pending.items():
+            if not updates:
+                continue
+            try:
+                self.db.update_fields_batch(doc_id, updates)
+            except Exception as e:
+                print(f"⚠️  Failed to persist {len(updates)} collaborative field updates for {doc_id}: {e}")
+                # Put them back underneath anything that arrived since, so newer values still win
+                with self._lock:
+                    current = self.pending_writes.setdefault(doc_id, {})
+                    for field_id, columns in updates.items():
+                        current[field_id] = {**columns, **current.get(field_id, {})}
+
+    def _flush_loop(self) -> None:
+        next_persist = time.monotonic() + self.persist_interval
+        while True:
+            socketio.sleep(self.broadcast_interval)
+            try:
+                self.flush_broadcasts()
+                if time.monotonic() >= next_persist:
+                    self.flush_writes()
+                    next_persist = time.monotonic() + self.persist_interval
+            except Exception as e:
+                print(f"❌ Collaboration flush error: {e}")
+
+    def _columns_for(self, prop: str, value: Any) -> Dict[str, Any]:
+        if prop == 'position':
+            columns = {column: value[key] for key, column in POSITION_COLUMNS.items() if key in value}
+            page = value.get('page')
+            if isinstance(page, int) and not isinstance(page, bool) and page >= 1:
+                columns['page_number'] = page - 1
+            return columns
+        if prop == 'page':
+            # The editor numbers pages from 1, pdf_fields from 0 (as documents_api.to_stored_fields converts)
+            return {'page_number': value - 1}
+        return {FIELD_PROPERTY_COLUMNS[prop]: value}
+
+
+# Global instance
+collaboration_hub = CollaborationHub()
+
+def get_collaboration_hub() -> CollaborationHub:
+    """Get the global collaboration hub instance"""
+    return collaboration_hub
+
+def init_collaboration(app, db):
+    """Attach the Socket.IO server to the Flask app"""
+    socketio.init_app(app)
+    collaboration_hub.start(db)
+    return socketio
+
+
+def _presence() -> Dict[str, Any]:
+    return {
+        'sessionId': request.args.get('sessionId') or request.sid,
+        'userId': current_user.id,
+        'userName': current_user.name or current_user.email
+    }
+
+@socketio.on('connect')
+def handle_connect(auth=None):
+    """Join the document room named in the handshake query"""
+    document_id = request.args.get('documentId')
+    if not current_user.is_authenticated or not document_id:
+        return False
+
+    from app import db
+    if not current_user.can_access_document(document_id, db):
+        return False
+
+    presence = _presence()
+    users = collaboration_hub.join(request.sid, document_id, presence)
+    join_room(document_id)
+    emit('user_joined', {**presence, 'users': users}, to=document_id)
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    left = collaboration_hub.leave(request.sid)
+    if not left:
+        return
+
+    document_id, presence, users, room_empty = left
+    leave_room(document_id)
+    emit('user_left', {**(presence or {}), 'users': users}, to=document_id)
+
+    # Last editor gone - write their changes now rather than waiting for the next tick
+    if room_empty:
+        collaboration_hub.flush_writes(document_id)
+
+@socketio.on('field_update')
+def handle_field_update(data):
+    """Queue a field change; it is broadcast to the room and persisted on the next flush"""
+    document_id = collaboration_hub.document_for(request.sid)
+    if not document_id or not isinstance(data, dict):
+        return
+
+    field_id = data.get('fieldId')
+    prop = data.get('property')
+    value = data.get('value')
+    if not field_id or (prop not in FIELD_PROPERTY_COLUMNS and not (prop == 'position' and isinstance(value, dict))):
+        emit('error', {'error': f'Unsupported field property: {prop}'})
+        return
+    if prop == 'page' and (not isinstance(value, int) or isinstance(value, bool) or value < 1):
+        emit('error', {'error': f'Invalid page number: {value}'})
+        return
+
+    from app import db
+    if not current_user.can_edit_document(document_id, db):
+        emit('error', {'error': 'You do not have permission to edit this document'})
+        return
+
+    # Edits to detected-but-unsaved fields would be broadcast but never stored
+    if not collaboration_hub.field_exists(document_id, field_id):
+        emit('error', {'error': 'Save the document before editing this field collaboratively', 'fieldId': field_id})
+        return
+
+    collaboration_hub.queue_update(document_id, field_id, prop, value, data.get('sessionId') or request.sid)
+
+@socketio.on('field_focus')
+def handle_field_focus(data):
+    """Relay focus/blur immediately to everyone else in the room"""
+    document_id = collaboration_hub.document_for(request.sid)
+    if not document_id or not isinstance(data, dict):
+        return
+
+    emit('field_focus', {
+        'fieldId': data.get('fieldId'),
+        'sessionId': data.get('sessionId') or request.sid,
+        'action': data.get('action', 'focus')
+    }, to=document_id, include_self=False)
@@ -165,14 +165,7 @@ def check_document_ownership(document_id):
     
     try:
         from app import db
-        user_docs = db.get_user_documents(current_user.id)
-        
-        for doc in user_docs:
-            if doc['id'] == document_id:
-                user_doc_info = doc.get('user_documents', {})
-                return user_doc_info.get('role') == 'owner'
-        
-        return False
+        return current_user.get_role_in_document(document_id, db) == 'owner'
     except Exception as e:
         print(f"Error checking document ownership: {e}")
         return False
@@ -0,0 +1,275 @@
+"""
+REST API for the real-time PDF editor (static/js/realtime-pdf-editor.js)
+"""
+
+import hashlib
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from flask import Blueprint, current_app, jsonify, request, send_file
+from flask_login import current_user, login_required
+from urllib.parse import unquote
+from werkzeug.utils import secure_filename
+
+from decorators import api_document_access_required
+from file_security import remember_file_hash
+from realtime_pdf_processor import get_realtime_pdf_processor
+from render_cache import get_render_cache
+
+documents_api_bp = Blueprint('documents_api', __name__)
+
+# Upload bodies are copied to disk in chunks of this size, never held in memory as a whole
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+def init_documents_api(app, db_manager):
+    """Initialize the documents API with the app"""
+    global db
+    db = db_manager
+
+def stream_to_disk(source, file_path: str, chunk_size: int = UPLOAD_CHUNK_SIZE) -> Dict[str, Any]:
+    """Copy a readable stream to file_path chunk by chunk, hashing on the fly"""
+    hash_sha256 = hashlib.sha256()
+    size = 0
+    temp_path = f"{file_path}.part"
+
+    try:
+        with open(temp_path, 'wb') as f:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                if size == 0 and not chunk.startswith(b'%PDF-'):
+                    raise ValueError('File is not a PDF')
+                hash_sha256.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+
+        if size == 0:
+            raise ValueError('Empty upload')
+
+        os.replace(temp_path, file_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    file_hash = hash_sha256.hexdigest()
+    # Later cache lookups (extraction, previews) can skip re-reading the file
+    remember_file_hash(file_path, file_hash)
+    return {'size': size, 'sha256': file_hash}
+
+def get_api_document(document_id: str) -> Optional[Dict[str, Any]]:
+    """Document metadata without its fields"""
+    if db:
+        return db.get_document(document_id, include_fields=False)
+
+    from app import MOCK_DOCUMENTS
+    return next((doc for doc in MOCK_DOCUMENTS if doc['id'] == document_id), None)
+
+# The editor numbers pages from 1; stored page numbers are 0-indexed like the rest of the app
+# (PDFProcessor extraction and the fill pipeline), so the API converts at the boundary
+
+def get_stored_fields(document_id: str, page_num: int = None) -> List[Dict[str, Any]]:
+    """Fields saved for a document (optionally one 1-indexed page), in the shape the realtime editor uses"""
+    stored_page = page_num - 1 if page_num is not None else None
+    if db:
+        fields = db.get_document_fields(document_id, page_number=stored_page)
+    else:
+        document = get_api_document(document_id) or {}
+        # Copies, so the page conversion below never touches the mock document itself
+        fields = [dict(field, position=dict(field.get('position') or {}))
+                  for field in document.get('pdf_fields', [])
+                  if stored_page is None or (field.get('page') or 0) == stored_page]
+
+    for field in fields:
+        field['page'] = (field.get('page') or 0) + 1
+        field['position'] = dict(field.get('position') or {}, page=field['page'])
+        field.setdefault('required', field.get('is_required', False))
+    return fields
+
+def to_stored_fields(fields: List[Dict[str, Any]], pages: Optional[List[int]]) -> tuple:
+    """Convert the editor's fields and loaded pages (1-indexed) to stored, 0-indexed page numbers"""
+    for field in fields:
+        # The realtime editor keeps the page inside position and uses 'required'
+        field['page'] = (field.get('page') or field.get('position', {}).get('page') or 1) - 1
+        field.setdefault('is_required', field.get('required', False))
+    return fields, [page - 1 for page in pages] if pages else None
+
+def document_pdf_path(document: Optional[Dict[str, Any]]) -> Optional[str]:
+    if not document or not document.get('file_path') or not os.path.exists(document['file_path']):
+        return None
+    return document['file_path']
+
+@documents_api_bp.route('/upload', methods=['POST'])
+@login_required
+def upload_document():
+    """Upload a PDF, either as a raw application/pdf body (streamed) or as multipart field 'pdf'"""
+    if request.mimetype == 'application/pdf':
+        filename = unquote(request.headers.get('X-Filename', 'document.pdf'))
+        source = request.stream
+    elif 'pdf' in request.files:
+        upload = request.files['pdf']
+        filename = upload.filename
+        source = upload.stream
+    else:
+        return jsonify({'success': False, 'message': 'No PDF file provided'}), 400
+
+    filename = secure_filename(os.path.basename(filename)) or 'document.pdf'
+    if not filename.lower().endswith('.pdf'):
+        return jsonify({'success': False, 'message': 'Please select a PDF file'}), 400
+
+    document_id = str(uuid.uuid4())
+    file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], f"{document_id}_{filename}")
+
+    try:
+        upload_info = stream_to_disk(source, file_path)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    name = os.path.splitext(filename)[0]
+    if db:
+        db.create_document(document_id, name, file_path, current_user.id)
+    else:
+        from app import MOCK_DOCUMENTS
+        MOCK_DOCUMENTS.append({
+            'id': document_id,
+            'name': name,
+            'status': 'pending',
+            'file_path': file_path,
+            'lastUpdated': 'Just now',
+            'created_at': datetime.now().isoformat(),
+            'pdf_fields': []
+        })
+
+    print(f"📤 Uploaded {filename} ({upload_info['size']} bytes) as document {document_id}")
+
+    return jsonify({
+        'success': True,
+        'document': {
+            'id': document_id,
+            'name': name,
+            'size': upload_info['size'],
+            'sha256': upload_info['sha256'],
+            'page_count': get_realtime_pdf_processor().get_page_count(file_path)
+        }
+    })
+
+@documents_api_bp.route('/<document_id>')
+@login_required
+@api_document_access_required
+def get_document_summary(document_id):
+    """Document metadata and page count - no field detection happens here"""
+    document = get_api_document(document_id)
+    if not document:
+        return jsonify({'error': 'Document not found'}), 404
+
+    pdf_path = document_pdf_path(document)
+    return jsonify({
+        'id': document['id'],
+        'name': document.get('name'),
+        'status': document.get('status'),
+        'created_at': document.get('created_at'),
+        'updated_at': document.get('updated_at'),
+        'page_count': get_realtime_pdf_processor().get_page_count(pdf_path) if pdf_path else 0
+    })
+
+@documents_api_bp.route('/<document_id>/fields')
+@login_required
+@api_document_access_required
+def get_document_fields(document_id):
+    """Fields of one page (?page=N, 1-indexed; defaults to 1) - saved fields if the page has any, else detected on demand"""
+    document = get_api_document(document_id)
+    pdf_path = document_pdf_path(document)
+    if not pdf_path:
+        return jsonify({'error': 'Document not found'}), 404
+
+    page_num = request.args.get('page', 1, type=int)
+
+    fields = get_stored_fields(document_id, page_num)
+    if not fields:
+        # Only this page is analyzed, so a 200-page document costs one page per request. Ids are
+        # scoped to the document, so documents made from the same PDF never share field rows
+        fields = get_realtime_pdf_processor().detect_page_fields(pdf_path, page_num, id_scope=document_id)
+
+    return jsonify(fields)
+
+@documents_api_bp.route('/<document_id>/preview')
+@login_required
+@api_document_access_required
+def get_document_pdf(document_id):
+    """The PDF itself, with range request support so PDF.js can fetch pages incrementally"""
+    pdf_path = document_pdf_path(get_api_document(document_id))
+    if not pdf_path:
+        return jsonify({'error': 'Document not found'}), 404
+
+    return send_file(pdf_path, mimetype='application/pdf', conditional=True)
+
+@documents_api_bp.route('/<document_id>/pages/<int:page_num>/preview')
+@login_required
+@api_document_access_required
+def get_document_page_preview(document_id, page_num):
+    """Rendered image of one page (1-indexed), cached and served with HTTP caching headers"""
+    pdf_path = document_pdf_path(get_api_document(document_id))
+    if not pdf_path:
+        return jsonify({'error': 'Document not found'}), 404
+
+    from app import page_image_response
+    return page_image_response(pdf_path, page_num - 1)
+
+@documents_api_bp.route('/<document_id>/save', methods=['POST'])
+@login_required
+@api_document_access_required
+def save_document_fields(document_id):
+    """Save the editor's fields; with 'pages' only those pages are replaced (the editor loads pages lazily)"""
+    if not current_user.can_edit_document(document_id, db):
+        return jsonify({'success': False, 'message': 'You do not have permission to edit this document'}), 403
+
+    data = request.get_json(silent=True) or {}
+    fields, pages = to_stored_fields(data.get('fields', []), data.get('pages') or None)
+
+    if db:
+        changes = db.save_pdf_fields(document_id, fields, pages=pages)
+        return jsonify({'success': True, 'changes': changes})
+
+    document = get_api_document(document_id)
+    if not document:
+        return jsonify({'success': False, 'message': 'Document not found'}), 404
+    if pages:
+        fields = [field for field in document.get('pdf_fields', []) if field.get('page') not in pages] + fields
+    document['pdf_fields'] = fields
+    get_render_cache().invalidate_document(document_id)
+    return jsonify({'success': True})
+
+@documents_api_bp.route('/<document_id>/download')
+@login_required
+@api_document_access_required
+def download_document(document_id):
+    """Fill the PDF with the saved field values and return it"""
+    document = get_api_document(document_id)
+    pdf_path = document_pdf_path(document)
+    if not pdf_path:
+        return jsonify({'error': 'Document not found'}), 404
+
+    field_values = {field['id']: field for field in get_stored_fields(document_id)}
+
+    # One output file per request, so concurrent downloads of a document never overwrite each other
+    output_path = os.path.join(current_app.config['UPLOAD_FOLDER'], f"realtime_{document_id}_{uuid.uuid4().hex}.pdf")
+    if not get_realtime_pdf_processor().fill_pdf_realtime(pdf_path, field_values, output_path):
+        remove_output(output_path)
+        return jsonify({'error': 'Failed to generate PDF'}), 500
+
+    response = send_file(output_path, mimetype='application/pdf', as_attachment=True,
+                         download_name=f"{document.get('name') or document_id}.pdf")
+    response.call_on_close(lambda: remove_output(output_path))
+    return response
+
+def remove_output(path: str) -> None:
+    """Delete a per-request output file once it has been sent"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"⚠️  Error removing {path}: {e}")
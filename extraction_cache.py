@@ -0,0 +1,132 @@
+"""
+Content-addressed cache for PDF field extraction results
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from field_model import pack_fields, unpack_fields
+from file_security import get_file_hash
+
+
+class ExtractionCache:
+    """Two-tier (in-process LRU + on-disk JSON) cache of extracted fields keyed by file hash"""
+
+    def __init__(self, cache_dir: str = None, max_entries: int = None):
+        self.cache_dir = cache_dir or os.getenv('EXTRACTION_CACHE_DIR', os.path.join('cache', 'extraction'))
+        self.max_entries = max_entries or int(os.getenv('EXTRACTION_CACHE_MAX_ENTRIES', '256'))
+        self.enabled = os.getenv('EXTRACTION_CACHE_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+
+        self._entries: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, file_hash: str, extractor_version: str) -> str:
+        """Build the cache key for a file hash and extractor version"""
+        return f"{file_hash}-v{extractor_version}"
+
+    def key_for_file(self, pdf_path: str, extractor_version: str) -> Optional[str]:
+        """Build the cache key for a file on disk, or None if it can't be hashed"""
+        file_hash = get_file_hash(pdf_path)
+        if not file_hash:
+            return None
+        return self.make_key(file_hash, extractor_version)
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Return a private copy of the cached fields for a key, checking memory then disk"""
+        if not self.enabled or not key:
+            return None
+
+        with self._lock:
+            packed = self._entries.get(key)
+            if packed is not None:
+                self._entries.move_to_end(key)
+        if packed is not None:
+            # Callers mutate the returned fields (values, assignments), so they get fresh dicts
+            return unpack_fields(packed)
+
+        fields = self._read_from_disk(key)
+        if fields is None:
+            return None
+
+        self._remember(key, fields)
+        return fields
+
+    def put(self, key: str, fields: List[Dict[str, Any]]) -> None:
+        """Store extracted fields in both tiers"""
+        if not self.enabled or not key:
+            return
+
+        self._remember(key, fields)
+        self._write_to_disk(key, fields)
+
+    def invalidate(self, key: str) -> None:
+        """Drop a key from both tiers"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+        try:
+            os.remove(self._disk_path(key))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️  Error removing cached extraction {key}: {e}")
+
+    def clear(self) -> None:
+        """Empty the in-process tier (the disk tier is left for other workers)"""
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key: str, fields: List[Dict[str, Any]]) -> None:
+        # Held as slotted PDFField objects - a fraction of the memory of the dicts (and a private copy)
+        packed = pack_fields(fields)
+        with self._lock:
+            self._entries[key] = packed
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_from_disk(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            return entry['fields']
+        except Exception as e:
+            print(f"⚠️  Discarding unreadable extraction cache entry {key}: {e}")
+            self.invalidate(key)
+            return None
+
+    def _write_to_disk(self, key: str, fields: List[Dict[str, Any]]) -> None:
+        path = self._disk_path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'fields': fields}, f)
+            # Atomic rename so concurrent workers never read a half-written entry
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"⚠️  Could not persist extraction cache entry {key}: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+# Global instance
+extraction_cache = ExtractionCache()
+
+def get_extraction_cache() -> ExtractionCache:
+    """Get the global extraction cache instance"""
+    return extraction_cache
@@ -0,0 +1,127 @@
+"""
+Process-pool engine that shards per-page field extraction across CPU cores
+"""
+
+import importlib
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+# Per-page extractors that can run inside a worker process: mode -> (module, class, method).
+# Each method has the signature (doc, page_num, **options) -> dict with at least a 'page' key.
+PAGE_EXTRACTORS = {
+    'pymupdf': ('pdf_processor', 'PDFProcessor', 'extract_page_fields'),
+    'realtime': ('realtime_pdf_processor', 'RealtimePDFProcessor', 'extract_page_fields'),
+}
+
+# Processor instances created inside each worker process, one per mode
+_worker_processors: Dict[str, Any] = {}
+
+def _get_worker_processor(mode: str):
+    processor = _worker_processors.get(mode)
+    if processor is None:
+        module_name, class_name, _ = PAGE_EXTRACTORS[mode]
+        processor_class = getattr(importlib.import_module(module_name), class_name)
+        processor = processor_class()
+        _worker_processors[mode] = processor
+    return processor
+
+def _extract_page_shard(mode: str, pdf_path: str, page_numbers: List[int],
+                        options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Worker entry point: open the document by path and extract a contiguous run of pages"""
+    import fitz  # PyMuPDF
+
+    processor = _get_worker_processor(mode)
+    extract_page = getattr(processor, PAGE_EXTRACTORS[mode][2])
+
+    doc = fitz.open(pdf_path)
+    try:
+        return [extract_page(doc, page_num, **options) for page_num in page_numbers]
+    finally:
+        doc.close()
+
+
+class ExtractionEngine:
+    """Runs page extraction serially for small documents and on a process pool for large ones"""
+
+    def __init__(self, max_workers: int = None, min_parallel_pages: int = None):
+        self.max_workers = max_workers or int(os.getenv('EXTRACTION_WORKERS', str(os.cpu_count() or 1)))
+        self.min_parallel_pages = min_parallel_pages or int(os.getenv('EXTRACTION_PARALLEL_MIN_PAGES', '16'))
+        self.start_method = os.getenv('EXTRACTION_START_METHOD', 'spawn')
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def should_parallelize(self, page_count: int) -> bool:
+        """Pool overhead (pickling, re-opening the PDF per worker) only pays off on larger documents"""
+        return self.max_workers > 1 and page_count >= self.min_parallel_pages
+
+    def extract_pages(self, mode: str, pdf_path: str, page_count: int,
+                      serial_extractor: Callable[[int], Dict[str, Any]],
+                      options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Extract every page and return the per-page results in page order
+
+        options are passed to the worker's per-page method; serial_extractor must apply the same ones.
+        """
+        if not self.should_parallelize(page_count):
+            return [serial_extractor(page_num) for page_num in range(page_count)]
+
+        try:
+            return self._extract_parallel(mode, pdf_path, page_count, options or {})
+        except Exception as e:
+            print(f"⚠️  Parallel extraction failed ({e}), falling back to serial mode")
+            self._reset_executor()
+            return [serial_extractor(page_num) for page_num in range(page_count)]
+
+    def _extract_parallel(self, mode: str, pdf_path: str, page_count: int,
+                          options: Dict[str, Any]) -> List[Dict[str, Any]]:
+        executor = self._get_executor()
+
+        # Contiguous shards keep each worker's page access sequential within the file
+        shard_count = min(self.max_workers, page_count)
+        shard_size = math.ceil(page_count / shard_count)
+        shards = [list(range(start, min(start + shard_size, page_count)))
+                  for start in range(0, page_count, shard_size)]
+
+        print(f"⚙️  Extracting {page_count} pages across {len(shards)} worker processes")
+
+        pdf_path = os.path.abspath(pdf_path)
+        futures = [executor.submit(_extract_page_shard, mode, pdf_path, shard, options) for shard in shards]
+
+        page_results = []
+        for future in futures:
+            page_results.extend(future.result())
+
+        page_results.sort(key=lambda result: result['page'])
+        return page_results
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                context = multiprocessing.get_context(self.start_method)
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+            return self._executor
+
+    def _reset_executor(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+# Global instance
+extraction_engine = ExtractionEngine()
+
+def get_extraction_engine() -> ExtractionEngine:
+    """Get the global extraction engine instance"""
+    return extraction_engine
@@ -0,0 +1,217 @@
+"""
+Compact in-memory representation of PDF fields (slotted objects instead of per-field dicts)
+
+Fields still travel through the API, templates and the fill pipeline as dicts; long-lived copies
+(extraction and template caches) are packed into PDFField objects and unpacked into fresh dicts
+on the way out, which also replaces the defensive deepcopy those caches used to make.
+"""
+
+import copy
+import json
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+class FieldType(str, Enum):
+    """Field types produced by the extractors (other strings are kept as-is)"""
+    TEXT = 'text'
+    TEXTAREA = 'textarea'
+    CHECKBOX = 'checkbox'
+    RADIO = 'radio'
+    SELECT = 'select'
+    SIGNATURE = 'signature'
+    BUTTON = 'button'
+    DATE = 'date'
+    EMAIL = 'email'
+    NUMBER = 'number'
+
+    @classmethod
+    def coerce(cls, value: Any) -> Any:
+        try:
+            return cls(value)
+        except ValueError:
+            return value
+
+
+class Rect:
+    """Field position and size in PDF points"""
+
+    __slots__ = ('x', 'y', 'width', 'height')
+
+    def __init__(self, x: float = 0, y: float = 0, width: float = 0, height: float = 0):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    def to_dict(self) -> Dict[str, float]:
+        return {'x': self.x, 'y': self.y, 'width': self.width, 'height': self.height}
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Rect) and (self.x, self.y, self.width, self.height) == \
+            (other.x, other.y, other.width, other.height)
+
+    def __repr__(self) -> str:
+        return f"Rect({self.x}, {self.y}, {self.width}, {self.height})"
+
+
+# Marks a key the original dict didn't have, so unpacking gives back exactly the same keys
+_MISSING = object()
+
+RECT_KEYS = ('x', 'y', 'width', 'height')
+
+# Keys every extractor produces; anything else (styling, metadata, ...) goes to PDFField.extra
+FIELD_KEYS = ('id', 'name', 'pdf_field_name', 'type', 'value', 'assigned_to', 'page', 'source')
+
+# extra key holding position entries beyond x/y/width/height (page size, relative coordinates)
+_POSITION_EXTRA = '_position'
+
+# Key tuples shared by every compacted dict with the same keys (extractors emit only a few shapes)
+_KEY_LAYOUTS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+MAX_KEY_LAYOUTS = 1024
+
+
+class CompactRecord:
+    """A dict stored as a shared key layout plus a tuple of values"""
+
+    __slots__ = ('keys', 'values')
+
+    def __init__(self, keys: Tuple[str, ...], values: Tuple[Any, ...]):
+        self.keys = keys
+        self.values = values
+
+
+class CompactList(tuple):
+    """A list stored as a tuple (so it expands back into a list, not a tuple)"""
+
+    __slots__ = ()
+
+
+class CompactTuple(tuple):
+    """A tuple whose items were compacted (expands into a tuple of fresh items)"""
+
+    __slots__ = ()
+
+
+def compact(value: Any) -> Any:
+    """Immutable compact copy of JSON-like data"""
+    if isinstance(value, dict):
+        keys = tuple(value)
+        layout = _KEY_LAYOUTS.get(keys)
+        if layout is None:
+            layout = keys
+            if len(_KEY_LAYOUTS) < MAX_KEY_LAYOUTS:
+                _KEY_LAYOUTS[keys] = keys
+        return CompactRecord(layout, tuple(compact(item) for item in value.values()))
+    if isinstance(value, list):
+        return CompactList(compact(item) for item in value)
+    if type(value) is tuple:
+        # Tuples can hold lists and dicts, so they are rebuilt rather than shared
+        return CompactTuple(compact(item) for item in value)
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return copy.deepcopy(value)
+
+def expand(value: Any) -> Any:
+    """Fresh JSON-like data from compact()"""
+    if isinstance(value, CompactRecord):
+        return {key: expand(item) for key, item in zip(value.keys, value.values)}
+    if isinstance(value, CompactList):
+        return [expand(item) for item in value]
+    if isinstance(value, CompactTuple):
+        return tuple(expand(item) for item in value)
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return copy.deepcopy(value)
+
+
+class PDFField:
+    """One form field; converts losslessly to and from the API dict shape"""
+
+    __slots__ = FIELD_KEYS + ('position', 'extra')
+
+    def __init__(self, id: str, name: Any = _MISSING, pdf_field_name: Any = _MISSING,
+                 type: Any = _MISSING, value: Any = _MISSING, assigned_to: Any = _MISSING,
+                 page: Any = _MISSING, source: Any = _MISSING, position: Any = _MISSING,
+                 extra: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self.name = name
+        self.pdf_field_name = pdf_field_name
+        self.type = FieldType.coerce(type) if type is not _MISSING else type
+        self.value = value
+        self.assigned_to = assigned_to
+        self.page = page
+        self.source = source
+        self.position = position
+        # Rarely used keys (styling, metadata, timestamps) kept compact rather than as nested dicts
+        self.extra = compact(extra) if extra else None
+
+    @classmethod
+    def from_dict(cls, field: Dict[str, Any]) -> 'PDFField':
+        """Pack an API/extractor field dict (nothing is shared with the original)"""
+        extra = {key: value for key, value in field.items() if key not in FIELD_KEYS and key != 'position'}
+
+        position = field.get('position', _MISSING)
+        if isinstance(position, dict) and all(key in position for key in RECT_KEYS):
+            position_extra = {key: value for key, value in position.items() if key not in RECT_KEYS}
+            if position_extra:
+                extra[_POSITION_EXTRA] = position_extra
+            position = Rect(position['x'], position['y'], position['width'], position['height'])
+        elif position is not _MISSING:
+            position = compact(position)
+
+        values = {key: field.get(key, _MISSING) for key in FIELD_KEYS}
+        if values['value'] is not _MISSING:
+            values['value'] = compact(values['value'])
+        return cls(position=position, extra=extra, **values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """A fresh API dict (safe for the caller to mutate)"""
+        field = {}
+        for key in FIELD_KEYS:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                # FieldType is a str subclass, but json and templates should see plain strings
+                field[key] = value.value if isinstance(value, FieldType) else value
+        if 'value' in field:
+            field['value'] = expand(field['value'])
+
+        extra = expand(self.extra) if self.extra is not None else {}
+        position_extra = extra.pop(_POSITION_EXTRA, None)
+        if isinstance(self.position, Rect):
+            field['position'] = self.position.to_dict()
+            if position_extra:
+                field['position'].update(position_extra)
+        elif self.position is not _MISSING:
+            field['position'] = expand(self.position)
+
+        field.update(extra)
+        return field
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), separators=(',', ':'))
+
+    def __repr__(self) -> str:
+        return f"PDFField({self.id!r}, {self.name!r}, type={self.type!r}, page={self.page!r})"
+
+
+def is_field_dict(item: Any) -> bool:
+    """True for extractor/API field dicts (widget index entries and other cached lists are left alone)"""
+    return isinstance(item, dict) and 'id' in item and 'type' in item
+
+def pack_fields(items: Iterable[Any]) -> List[Any]:
+    """Compact a list for long-term caching: field dicts become PDFField, anything else is copied"""
+    return [PDFField.from_dict(item) if is_field_dict(item) else copy.deepcopy(item) for item in items]
+
+def unpack_fields(items: Iterable[Any]) -> List[Any]:
+    """Fresh dicts from a packed list (the cached objects are never handed out)"""
+    return [item.to_dict() if isinstance(item, PDFField) else copy.deepcopy(item) for item in items]
+
+def iter_fields_json(fields: Iterable[Union[PDFField, Dict[str, Any]]]) -> Iterator[str]:
+    """Serialize a field list as a JSON array one field at a time, without materializing the whole list"""
+    yield '['
+    for index, field in enumerate(fields):
+        if index:
+            yield ','
+        yield field.to_json() if isinstance(field, PDFField) else json.dumps(field, separators=(',', ':'))
+    yield ']'
@@ -7,6 +7,52 @@ import magic
 import uuid
 from typing import Optional, Tuple, Dict, Any
 
+# Memoized hashes keyed by (absolute path, size, mtime) so hot paths can
+# look up a file's content hash without re-reading it on every request
+_file_hash_memo: Dict[Tuple[str, int, int], str] = {}
+
+def calculate_file_hash(file_path: str) -> str:
+    """Calculate SHA-256 hash of file for integrity checking"""
+    hash_sha256 = hashlib.sha256()
+    try:
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                hash_sha256.update(chunk)
+        return hash_sha256.hexdigest()
+    except Exception as e:
+        print(f"Error calculating file hash: {e}")
+        return ""
+
+def get_file_hash(file_path: str) -> str:
+    """Return the SHA-256 of a file, reusing the last result while the file is unchanged"""
+    try:
+        stat_info = os.stat(file_path)
+    except OSError as e:
+        print(f"Error calculating file hash: {e}")
+        return ""
+    
+    memo_key = (os.path.abspath(file_path), stat_info.st_size, stat_info.st_mtime_ns)
+    file_hash = _file_hash_memo.get(memo_key)
+    if file_hash is None:
+        file_hash = calculate_file_hash(file_path)
+        if file_hash:
+            # Keep the memo bounded - it only needs to cover the working set
+            if len(_file_hash_memo) >= 4096:
+                _file_hash_memo.clear()
+            _file_hash_memo[memo_key] = file_hash
+    return file_hash
+
+def remember_file_hash(file_path: str, file_hash: str) -> None:
+    """Seed the hash memo for a file whose hash was computed while writing it"""
+    try:
+        stat_info = os.stat(file_path)
+    except OSError:
+        return
+    
+    if len(_file_hash_memo) >= 4096:
+        _file_hash_memo.clear()
+    _file_hash_memo[(os.path.abspath(file_path), stat_info.st_size, stat_info.st_mtime_ns)] = file_hash
+
 class FileSecurityManager:
     def __init__(self, upload_folder: str = "uploads", max_file_size: int = 16 * 1024 * 1024):
         self.upload_folder = upload_folder
@@ -153,15 +199,7 @@ class FileSecurityManager:
     
     def calculate_file_hash(self, file_path: str) -> str:
         """Calculate SHA-256 hash of file for integrity checking"""
-        hash_sha256 = hashlib.sha256()
-        try:
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_sha256.update(chunk)
-            return hash_sha256.hexdigest()
-        except Exception as e:
-            print(f"Error calculating file hash: {e}")
-            return ""
+        return calculate_file_hash(file_path)
     
     def get_mime_type(self, file_path: str) -> str:
         """Get MIME type of saved file"""
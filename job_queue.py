@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Background job queue with local worker processes and a pluggable broker (SQLite by default)
+
+Run dedicated workers with: python job_queue.py [worker_count]
+"""
+
+import importlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+import uuid
+from typing import Any, Dict, List, Optional
+
+# Job types -> (module, function). Handlers take the job payload and return a JSON-serializable result.
+JOB_HANDLERS = {
+    'render_completed_pdf': ('pdf_renderer', 'render_completed_pdf_job'),
+}
+
+
+class SQLiteJobBroker:
+    """Job storage in a local SQLite database shared by the web and worker processes"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.getenv('JOB_QUEUE_DB', os.path.join('cache', 'jobs.sqlite3'))
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    job_type TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    dedupe_key TEXT,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker_pid INTEGER,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs(dedupe_key, status)')
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread (and per process - connections must not cross a fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def enqueue(self, job_type: str, payload: Dict[str, Any], dedupe_key: str = None) -> Dict[str, Any]:
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if dedupe_key:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE dedupe_key = ? AND status IN ('queued', 'running') ORDER BY created_at DESC LIMIT 1",
+                    (dedupe_key,)
+                ).fetchone()
+                if row:
+                    conn.execute('COMMIT')
+                    return self._row_to_job(row)
+
+            job_id = str(uuid.uuid4())
+            conn.execute(
+                'INSERT INTO jobs (id, job_type, payload, dedupe_key, status, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (job_id, job_type, json.dumps(payload), dedupe_key, 'queued', time.time())
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return self.get(job_id)
+
+    def claim(self, worker_pid: int, stale_after: float, max_attempts: int) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest queued job (re-queuing jobs whose worker died)"""
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = 'queued' WHERE status = 'running' AND started_at < ? AND attempts < ?",
+                (now - stale_after, max_attempts)
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Worker timed out', finished_at = ? "
+                "WHERE status = 'running' AND started_at < ? AND attempts >= ?",
+                (now, now - stale_after, max_attempts)
+            )
+
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, worker_pid = ?, attempts = attempts + 1 WHERE id = ?",
+                (now, worker_pid, row['id'])
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return self.get(row['id'])
+
+    def complete(self, job_id: str, result: Any) -> None:
+        self._connect().execute(
+            "UPDATE jobs SET status = 'done', result = ?, error = NULL, finished_at = ? WHERE id = ?",
+            (json.dumps(result), time.time(), job_id)
+        )
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._connect().execute(
+            "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+            (error, time.time(), job_id)
+        )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished jobs older than the given age in seconds"""
+        cursor = self._connect().execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+            (time.time() - older_than,)
+        )
+        return cursor.rowcount
+
+    def _row_to_job(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job['payload'] = json.loads(job['payload']) if job['payload'] else {}
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+
+# Broker backends selectable with JOB_QUEUE_BROKER ('sqlite' or 'module:Class')
+BROKERS = {
+    'sqlite': SQLiteJobBroker,
+}
+
+def create_broker():
+    broker_name = os.getenv('JOB_QUEUE_BROKER', 'sqlite')
+    if broker_name in BROKERS:
+        return BROKERS[broker_name]()
+
+    module_name, class_name = broker_name.split(':', 1)
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def run_job(broker, job: Dict[str, Any]) -> None:
+    """Execute one claimed job and record its outcome"""
+    try:
+        module_name, function_name = JOB_HANDLERS[job['job_type']]
+        handler = getattr(importlib.import_module(module_name), function_name)
+        result = handler(job['payload'])
+        broker.complete(job['id'], result)
+        print(f"✅ Job {job['id']} ({job['job_type']}) finished")
+    except Exception as e:
+        traceback.print_exc()
+        broker.fail(job['id'], str(e))
+        print(f"❌ Job {job['id']} ({job['job_type']}) failed: {e}")
+
+def worker_main(poll_interval: float = None) -> None:
+    """Worker process loop: claim, run, repeat"""
+    poll_interval = poll_interval or float(os.getenv('JOB_QUEUE_POLL_INTERVAL', '0.5'))
+    stale_after = float(os.getenv('JOB_QUEUE_JOB_TIMEOUT', '300'))
+    max_attempts = int(os.getenv('JOB_QUEUE_MAX_ATTEMPTS', '2'))
+
+    broker = create_broker()
+    print(f"⚙️  Job worker {os.getpid()} started")
+
+    try:
+        broker.purge(float(os.getenv('JOB_QUEUE_RETENTION_SECONDS', str(24 * 3600))))
+    except Exception as e:
+        print(f"⚠️  Could not purge old jobs: {e}")
+
+    while True:
+        try:
+            job = broker.claim(os.getpid(), stale_after, max_attempts)
+        except Exception as e:
+            print(f"⚠️  Job worker {os.getpid()} could not claim a job: {e}")
+            job = None
+
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        run_job(broker, job)
+
+
+class JobQueue:
+    """Enqueue jobs from the web process and, optionally, run local worker processes for them"""
+
+    def __init__(self):
+        self.enabled = os.getenv('JOB_QUEUE_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+        self.embedded_workers = int(os.getenv('JOB_QUEUE_EMBEDDED_WORKERS', '2'))
+        self.start_method = os.getenv('JOB_QUEUE_START_METHOD', 'spawn')
+
+        self._broker = None
+        self._workers: List[multiprocessing.Process] = []
+        self._lock = threading.Lock()
+
+    @property
+    def broker(self):
+        if self._broker is None:
+            self._broker = create_broker()
+        return self._broker
+
+    def enqueue(self, job_type: str, payload: Dict[str, Any], dedupe_key: str = None) -> Dict[str, Any]:
+        """Queue a job (or return the identical job still pending) and make sure workers are running"""
+        if job_type not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job type: {job_type}")
+
+        job = self.broker.enqueue(job_type, payload, dedupe_key)
+        self.ensure_workers()
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.broker.get(job_id)
+
+    def ensure_workers(self) -> None:
+        """Start (or restart) the embedded worker processes of this web process"""
+        if self.embedded_workers <= 0:
+            return
+
+        with self._lock:
+            self._workers = [worker for worker in self._workers if worker.is_alive()]
+            context = multiprocessing.get_context(self.start_method)
+            while len(self._workers) < self.embedded_workers:
+                worker = context.Process(target=worker_main, name='job-worker', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+
+# Global instance
+job_queue = JobQueue()
+
+def get_job_queue() -> JobQueue:
+    """Get the global job queue instance"""
+    return job_queue
+
+
+if __name__ == "__main__":
+    worker_count = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    print(f"🚀 Starting {worker_count} job workers")
+
+    processes = [multiprocessing.Process(target=worker_main, name='job-worker') for _ in range(worker_count)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
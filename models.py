@@ -6,6 +6,8 @@ from flask_login import UserMixin
 from datetime import datetime
 import bcrypt
 
+from permission_cache import get_permission_cache
+
 class User(UserMixin):
     """User model for Flask-Login"""
     
@@ -27,10 +29,13 @@ class User(UserMixin):
         """Return user ID as string for Flask-Login"""
         return str(self.id)
     
+    # Properties, as Flask-Login reads them (a bound method is always truthy)
+    @property
     def is_authenticated(self):
         """Return True if user is authenticated"""
         return True
     
+    @property
     def is_anonymous(self):
         """Return False as this is not an anonymous user"""
         return False
@@ -41,11 +46,16 @@ class User(UserMixin):
     
     def check_password(self, password):
         """Check if provided password matches stored hash"""
-        if not self._password_hash:
+        return User.verify_password(password, self._password_hash)
+    
+    @staticmethod
+    def verify_password(password, password_hash):
+        """Check a password against a bcrypt hash"""
+        if not password_hash:
             return False
         
         try:
-            return bcrypt.checkpw(password.encode('utf-8'), self._password_hash.encode('utf-8'))
+            return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
         except Exception as e:
             print(f"Error checking password: {e}")
             return False
@@ -76,13 +86,7 @@ class User(UserMixin):
                 return True
             
             # Check if user is owner or has access through user_documents
-            user_docs = db_manager.get_user_documents(self.id)
-            
-            for doc in user_docs:
-                if doc['id'] == document_id:
-                    return True
-            
-            return False
+            return get_permission_cache().get_permission(db_manager, self.id, document_id) is not None
             
         except Exception as e:
             print(f"Error checking document access: {e}")
@@ -96,14 +100,9 @@ class User(UserMixin):
                 return True
             
             # Check if user has edit permissions
-            user_docs = db_manager.get_user_documents(self.id)
-            
-            for doc in user_docs:
-                if doc['id'] == document_id:
-                    user_doc_info = doc.get('user_documents', {})
-                    return user_doc_info.get('can_edit', False)
+            permission = get_permission_cache().get_permission(db_manager, self.id, document_id)
             
-            return False
+            return bool(permission and permission.get('can_edit', False))
             
         except Exception as e:
             print(f"Error checking document edit permissions: {e}")
@@ -112,14 +111,11 @@ class User(UserMixin):
     def get_role_in_document(self, document_id, db_manager):
         """Get user's role in a specific document"""
         try:
-            user_docs = db_manager.get_user_documents(self.id)
+            permission = get_permission_cache().get_permission(db_manager, self.id, document_id)
             
-            for doc in user_docs:
-                if doc['id'] == document_id:
-                    user_doc_info = doc.get('user_documents', {})
-                    return user_doc_info.get('role', 'viewer')
-            
-            return None
+            if permission is None:
+                return None
+            return permission.get('role') or 'viewer'
             
         except Exception as e:
             print(f"Error getting document role: {e}")
@@ -152,9 +148,12 @@ class AnonymousUser:
         self.role = None
         self.is_active = False
     
+    # Properties, as Flask-Login reads them - as methods, login_required let anonymous requests through
+    @property
     def is_authenticated(self):
         return False
     
+    @property
     def is_anonymous(self):
         return True
     
@@ -0,0 +1,97 @@
+"""
+Single-pass page analysis shared by the PDF field detectors
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+BBox = Tuple[float, float, float, float]
+
+# Spans whose stripped text length falls in this range are treated as candidate field labels
+LABEL_MIN_LENGTH = 3
+LABEL_MAX_LENGTH = 29
+
+
+class SpanIndex:
+    """Uniform grid over span origins answering "closest text within radius" queries"""
+
+    def __init__(self, entries: Iterable[Tuple[str, float, float]], cell_size: float = 100.0):
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], List[Tuple[float, float, int, str]]] = {}
+
+        for order, (text, x, y) in enumerate(entries):
+            cell = (math.floor(x / cell_size), math.floor(y / cell_size))
+            self._cells.setdefault(cell, []).append((x, y, order, text))
+
+    def nearest(self, x: float, y: float, radius: float) -> Optional[str]:
+        """Return the text whose origin is closest to (x, y) within radius, or None"""
+        reach = math.ceil(radius / self.cell_size)
+        cell_x = math.floor(x / self.cell_size)
+        cell_y = math.floor(y / self.cell_size)
+        radius_squared = radius * radius
+
+        best = None
+        for grid_x in range(cell_x - reach, cell_x + reach + 1):
+            for grid_y in range(cell_y - reach, cell_y + reach + 1):
+                for span_x, span_y, order, text in self._cells.get((grid_x, grid_y), ()):
+                    distance_squared = (span_x - x) ** 2 + (span_y - y) ** 2
+                    if distance_squared > radius_squared:
+                        continue
+                    # Ties go to the span that comes first in reading order
+                    if best is None or (distance_squared, order) < best[:2]:
+                        best = (distance_squared, order, text)
+
+        return best[2] if best else None
+
+
+class PageAnalysis:
+    """Text, spans, widgets and annotations of one page, extracted exactly once"""
+
+    def __init__(self, page, page_num: int):
+        self.page_num = page_num
+        self.width = page.rect.width
+        self.height = page.rect.height
+
+        # The only text extraction for this page - everything below is derived from it
+        self.text_dict: Dict[str, Any] = page.get_text("dict")
+        self.widgets = list(page.widgets())
+        self.annotations = list(page.annots())
+
+        # (text, bbox) for every span, in reading order
+        self.spans: List[Tuple[str, BBox]] = []
+        # (combined line text, bbox of the first span) for every text line
+        self.lines: List[Tuple[str, BBox]] = []
+
+        for block in self.text_dict.get("blocks", []):
+            if "lines" not in block:
+                continue
+            for line in block["lines"]:
+                line_text = ""
+                line_bbox = None
+                for span in line.get("spans", []):
+                    span_text = span.get("text", "")
+                    span_bbox = tuple(span.get("bbox", (0, 0, 0, 0)))
+                    self.spans.append((span_text, span_bbox))
+                    line_text += span_text
+                    if line_bbox is None:
+                        line_bbox = span_bbox
+                self.lines.append((line_text, line_bbox))
+
+        self.text = "\n".join(line_text for line_text, _ in self.lines)
+        self._label_index: Optional[SpanIndex] = None
+
+    @property
+    def label_index(self) -> SpanIndex:
+        """Spatial index of short spans that could label a nearby field, built on first use"""
+        if self._label_index is None:
+            candidates = []
+            for span_text, span_bbox in self.spans:
+                text = span_text.strip()
+                if LABEL_MIN_LENGTH <= len(text) <= LABEL_MAX_LENGTH:
+                    candidates.append((text, span_bbox[0], span_bbox[1]))
+            self._label_index = SpanIndex(candidates)
+        return self._label_index
+
+    def find_label(self, x: float, y: float, radius: float = 100) -> str:
+        """Closest candidate label to a point, or an empty string"""
+        return self.label_index.nearest(x, y, radius) or ""
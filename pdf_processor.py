@@ -6,6 +6,91 @@ from PIL import Image, ImageDraw
 import base64
 from io import BytesIO
 import uuid
+import re
+
+from extraction_cache import get_extraction_cache
+from extraction_engine import get_extraction_engine
+from preview_cache import get_preview_cache, tile_grid
+from widget_index import get_widget_index, iter_fill_widgets
+from page_analysis import PageAnalysis
+
+# Bump whenever extraction output changes so stale cache entries are ignored
+EXTRACTOR_VERSION = "1"
+
+# Common patterns that indicate form fields (compiled once, matched per text line)
+TEXT_FIELD_PATTERNS = [
+    # Text patterns with underscores or dashes (signature lines)
+    {"pattern": r"_{5,}", "type": "text", "name": "Text Field"},
+    {"pattern": r"-{5,}", "type": "text", "name": "Text Field"},
+    
+    # Date patterns
+    {"pattern": r"date[:\s]*_{3,}", "type": "date", "name": "Date"},
+    {"pattern": r"_{2,}/_{2,}/_{2,}", "type": "date", "name": "Date"},
+    
+    # Signature patterns
+    {"pattern": r"signature[:\s]*_{5,}", "type": "signature", "name": "Signature"},
+    {"pattern": r"sign[:\s]*_{5,}", "type": "signature", "name": "Signature"},
+    
+    # Name patterns
+    {"pattern": r"name[:\s]*_{3,}", "type": "text", "name": "Name"},
+    
+    # Address patterns
+    {"pattern": r"address[:\s]*_{3,}", "type": "text", "name": "Address"},
+]
+for _pattern_info in TEXT_FIELD_PATTERNS:
+    _pattern_info["regex"] = re.compile(_pattern_info["pattern"], re.IGNORECASE)
+
+# Section 5 (zero income affidavit) widgets added to the default template, positioned on page 5
+SECTION5_WIDGETS = [
+    {
+        'name': 'Account Holder Name (Affidavit)',
+        'pdf_field_name': 'account_holder_name_affidavit',
+        'type': 'text',
+        'assigned_to': 'user2',
+        'page': 4,  # Page 5 (0-indexed)
+        'position': {'x': 145, 'y': 135, 'width': 250, 'height': 25}  # Final position: right (X=145) and adjusted down (Y=135)
+    },
+    {
+        'name': 'Household Member Names (No Income)', 
+        'pdf_field_name': 'household_member_names_no_income',
+        'type': 'textarea',
+        'assigned_to': 'user2',
+        'page': 4,  # Page 5 (0-indexed)
+        'position': {'x': 35, 'y': 255, 'width': 450, 'height': 80}
+    },
+    {
+        'name': 'Affidavit Signature',
+        'pdf_field_name': 'affidavit_signature', 
+        'type': 'signature',
+        'assigned_to': 'user2',
+        'page': 4,  # Page 5 (0-indexed)
+        'position': {'x': 40, 'y': 470, 'width': 200, 'height': 30}
+    },
+    {
+        'name': 'Printed Name (Affidavit)',
+        'pdf_field_name': 'printed_name_affidavit',
+        'type': 'text',
+        'assigned_to': 'user2',
+        'page': 4,  # Page 5 (0-indexed)
+        'position': {'x': 305, 'y': 480, 'width': 230, 'height': 25}
+    },
+    {
+        'name': 'Date (Affidavit)',
+        'pdf_field_name': 'date_affidavit',
+        'type': 'date',
+        'assigned_to': 'user2',
+        'page': 4,  # Page 5 (0-indexed)
+        'position': {'x': 40, 'y': 525, 'width': 150, 'height': 25}
+    },
+    {
+        'name': 'Telephone (Affidavit)',
+        'pdf_field_name': 'telephone_affidavit',
+        'type': 'tel', 
+        'assigned_to': 'user2',
+        'page': 4,  # Page 5 (0-indexed)
+        'position': {'x': 305, 'y': 525, 'width': 150, 'height': 25}
+    }
+]
 
 class PDFProcessor:
     def __init__(self):
@@ -16,61 +101,61 @@ class PDFProcessor:
             '/Sig': 'signature'
         }
     
-    def extract_fields_with_pymupdf(self, pdf_path: str) -> Dict[str, Any]:
+    def extract_fields_with_pymupdf(self, pdf_path: str, use_cache: bool = True) -> Dict[str, Any]:
         """Enhanced PDF field extraction using PyMuPDF for better accuracy"""
+        if not os.path.exists(pdf_path):
+            return {"error": f"PDF file not found: {pdf_path}"}
+        
+        cache = get_extraction_cache()
+        cache_key = cache.key_for_file(pdf_path, EXTRACTOR_VERSION) if use_cache else None
+        
+        if cache_key:
+            cached_fields = cache.get(cache_key)
+            if cached_fields is not None:
+                print(f"⚡ Extraction cache hit for {pdf_path} ({len(cached_fields)} fields)")
+                return {"success": True, "fields": cached_fields}
+        
+        result = self._extract_fields_uncached(pdf_path)
+        
+        if cache_key and result.get("success"):
+            cache.put(cache_key, result["fields"])
+        
+        return result
+    
+    def _extract_fields_uncached(self, pdf_path: str) -> Dict[str, Any]:
+        """Run the full PyMuPDF extraction pass without consulting the cache"""
         try:
-            if not os.path.exists(pdf_path):
-                return {"error": f"PDF file not found: {pdf_path}"}
-            
             doc = fitz.open(pdf_path)
             fields = []
             
             print(f"🔍 Analyzing PDF with PyMuPDF: {pdf_path}")
             print(f"📄 PDF has {len(doc)} pages")
             
+            # Large documents are sharded across worker processes; results come back in page order
+            page_results = get_extraction_engine().extract_pages(
+                'pymupdf', pdf_path, len(doc),
+                lambda page_num: self.extract_page_fields(doc, page_num)
+            )
+            
             total_widgets = 0
             total_annotations = 0
+            page_texts = []
             
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                
-                # Get page text for context analysis
-                page_text_dict = page.get_text("dict")
-                
-                # Method 1: Extract form fields (widgets) from the page
-                widgets = list(page.widgets())  # Convert generator to list
-                total_widgets += len(widgets)
-                
-                print(f"📋 Page {page_num + 1}: Found {len(widgets)} form widgets")
-                
-                for i, widget in enumerate(widgets):
-                    field_info = self.extract_widget_info_enhanced(widget, page_num, i, page_text_dict)
-                    if field_info:
-                        fields.append(field_info)
-                        print(f"   ✅ Widget: {field_info['name']} ({field_info['type']}) at ({field_info['position']['x']:.1f}, {field_info['position']['y']:.1f})")
-                
-                # Method 2: Extract text annotations that might be fillable
-                annotations = list(page.annots())  # Convert generator to list
-                for annot in annotations:
-                    if annot.type[1] in ['FreeText', 'Text', 'Square', 'Circle']:
-                        field_info = self.extract_annotation_info(annot, page_num)
-                        if field_info:
-                            fields.append(field_info)
-                            total_annotations += 1
-                            print(f"   📝 Annotation: {field_info['name']} at ({field_info['position']['x']:.1f}, {field_info['position']['y']:.1f})")
-                
-                # Method 3: Try to detect potential form areas by text analysis
-                text_fields = self.detect_text_based_fields(page, page_num)
-                for field_info in text_fields:
-                    fields.append(field_info)
-                    print(f"   🔍 Text-based: {field_info['name']} at ({field_info['position']['x']:.1f}, {field_info['position']['y']:.1f})")
+            for page_result in page_results:
+                fields.extend(page_result['fields'])
+                total_widgets += page_result['widget_count']
+                total_annotations += page_result['annotation_count']
+                page_texts.append(page_result['text'])
             
             print(f"📊 Summary: {total_widgets} widgets, {total_annotations} annotations, {len(fields)} total fields")
             
+            # Index the widgets while the template is open so filling it later never scans every page
+            get_widget_index(pdf_path, self.get_widget_type, 'pymupdf', doc)
+            
             # If still no form fields found, create intelligent defaults based on document analysis
             if not fields:
                 print("📝 No form fields detected, creating intelligent defaults based on document content...")
-                fields = self.create_intelligent_fields(doc)
+                fields = self.create_intelligent_fields(page_texts)
             
             doc.close()
             
@@ -83,7 +168,49 @@ class PDFProcessor:
             traceback.print_exc()
             return {"error": f"Failed to process PDF with PyMuPDF: {str(e)}"}
     
-    def extract_widget_info_enhanced(self, widget, page_num: int, widget_index: int, page_text_dict: dict) -> Optional[Dict[str, Any]]:
+    def extract_page_fields(self, doc, page_num: int) -> Dict[str, Any]:
+        """Extract all fields from a single page (runs in-process or inside an extraction worker)"""
+        fields = []
+        annotation_count = 0
+        
+        # Extract text, spans, widgets and annotations once for all detectors
+        analysis = PageAnalysis(doc[page_num], page_num)
+        
+        # Method 1: Extract form fields (widgets) from the page
+        widgets = analysis.widgets
+        
+        print(f"📋 Page {page_num + 1}: Found {len(widgets)} form widgets")
+        
+        for i, widget in enumerate(widgets):
+            field_info = self.extract_widget_info_enhanced(widget, page_num, i, analysis)
+            if field_info:
+                fields.append(field_info)
+                print(f"   ✅ Widget: {field_info['name']} ({field_info['type']}) at ({field_info['position']['x']:.1f}, {field_info['position']['y']:.1f})")
+        
+        # Method 2: Extract text annotations that might be fillable
+        for annot in analysis.annotations:
+            if annot.type[1] in ['FreeText', 'Text', 'Square', 'Circle']:
+                field_info = self.extract_annotation_info(annot, page_num)
+                if field_info:
+                    fields.append(field_info)
+                    annotation_count += 1
+                    print(f"   📝 Annotation: {field_info['name']} at ({field_info['position']['x']:.1f}, {field_info['position']['y']:.1f})")
+        
+        # Method 3: Try to detect potential form areas by text analysis
+        text_fields = self.detect_text_based_fields(analysis)
+        for field_info in text_fields:
+            fields.append(field_info)
+            print(f"   🔍 Text-based: {field_info['name']} at ({field_info['position']['x']:.1f}, {field_info['position']['y']:.1f})")
+        
+        return {
+            'page': page_num,
+            'fields': fields,
+            'widget_count': len(widgets),
+            'annotation_count': annotation_count,
+            'text': analysis.text
+        }
+    
+    def extract_widget_info_enhanced(self, widget, page_num: int, widget_index: int, analysis: PageAnalysis) -> Optional[Dict[str, Any]]:
         """Enhanced widget information extraction with better field type detection"""
         try:
             # Get field name - try multiple approaches to get the real name
@@ -122,7 +249,7 @@ class PDFProcessor:
             assigned_to = self.determine_field_assignment(field_name, field_type)
             
             # Create a more descriptive field name by analyzing surrounding text
-            display_name = self.create_display_name(field_name, field_type, position, page_text_dict, page_num)
+            display_name = self.create_display_name(field_name, field_type, position, analysis)
             
             field_info = {
                 'id': f"{field_name}_{page_num}_{widget_index}",
@@ -142,7 +269,7 @@ class PDFProcessor:
             print(f"⚠️  Error extracting widget info: {e}")
             return None
     
-    def create_display_name(self, field_name: str, field_type: str, position: dict, page_text_dict: dict, page_num: int) -> str:
+    def create_display_name(self, field_name: str, field_type: str, position: dict, analysis: PageAnalysis) -> str:
         """Create a user-friendly display name for the field"""
         try:
             # Special handling for specific signature fields
@@ -193,7 +320,7 @@ class PDFProcessor:
             
             # If no specific mapping found, try to find nearby text labels
             if display_name == field_name.replace('_', ' ').title():
-                nearby_text = self.find_nearby_text(position, page_text_dict)
+                nearby_text = self.find_nearby_text(position, analysis)
                 if nearby_text and len(nearby_text) < 50:  # Reasonable label length
                     display_name = nearby_text
             
@@ -211,38 +338,12 @@ class PDFProcessor:
             print(f"⚠️  Error creating display name: {e}")
             return field_name.replace('_', ' ').title()
     
-    def find_nearby_text(self, position: dict, page_text_dict: dict) -> str:
+    def find_nearby_text(self, position: dict, analysis: PageAnalysis) -> str:
         """Find text near the field position that might be a label"""
         try:
-            field_x = position['x']
-            field_y = position['y']
-            
-            # Look for text within a reasonable distance from the field
+            # Look for text within a reasonable distance from the field using the page's span index
             search_radius = 100  # pixels
-            potential_labels = []
-            
-            for block in page_text_dict.get("blocks", []):
-                if "lines" in block:
-                    for line in block["lines"]:
-                        for span in line.get("spans", []):
-                            span_bbox = span.get("bbox", [0, 0, 0, 0])
-                            span_x = span_bbox[0]
-                            span_y = span_bbox[1]
-                            
-                            # Calculate distance from field
-                            distance = ((span_x - field_x) ** 2 + (span_y - field_y) ** 2) ** 0.5
-                            
-                            if distance <= search_radius:
-                                text = span.get("text", "").strip()
-                                if text and len(text) > 2 and len(text) < 30:
-                                    potential_labels.append((distance, text))
-            
-            # Sort by distance and return the closest meaningful text
-            if potential_labels:
-                potential_labels.sort(key=lambda x: x[0])
-                return potential_labels[0][1]
-            
-            return ""
+            return analysis.find_label(position['x'], position['y'], search_radius)
             
         except Exception as e:
             print(f"⚠️  Error finding nearby text: {e}")
@@ -291,70 +392,38 @@ class PDFProcessor:
             print(f"⚠️  Error extracting annotation info: {e}")
             return None
     
-    def detect_text_based_fields(self, page, page_num: int) -> List[Dict[str, Any]]:
+    def detect_text_based_fields(self, analysis: PageAnalysis) -> List[Dict[str, Any]]:
         """Detect potential form fields based on text patterns"""
         try:
-            text_dict = page.get_text("dict")
+            page_num = analysis.page_num
             fields = []
             
-            # Common patterns that indicate form fields
-            field_patterns = [
-                # Text patterns with underscores or dashes (signature lines)
-                {"pattern": r"_{5,}", "type": "text", "name": "Text Field"},
-                {"pattern": r"-{5,}", "type": "text", "name": "Text Field"},
-                
-                # Date patterns
-                {"pattern": r"date[:\s]*_{3,}", "type": "date", "name": "Date"},
-                {"pattern": r"_{2,}/_{2,}/_{2,}", "type": "date", "name": "Date"},
-                
-                # Signature patterns
-                {"pattern": r"signature[:\s]*_{5,}", "type": "signature", "name": "Signature"},
-                {"pattern": r"sign[:\s]*_{5,}", "type": "signature", "name": "Signature"},
-                
-                # Name patterns
-                {"pattern": r"name[:\s]*_{3,}", "type": "text", "name": "Name"},
-                
-                # Address patterns
-                {"pattern": r"address[:\s]*_{3,}", "type": "text", "name": "Address"},
-            ]
-            
-            for block in text_dict.get("blocks", []):
-                if "lines" in block:
-                    for line in block["lines"]:
-                        line_text = ""
-                        line_bbox = None
-                        
-                        # Combine all spans in the line
-                        for span in line.get("spans", []):
-                            line_text += span.get("text", "")
-                            if line_bbox is None:
-                                line_bbox = span.get("bbox", [0, 0, 0, 0])
-                        
-                        # Check against patterns
-                        import re
-                        for pattern_info in field_patterns:
-                            if re.search(pattern_info["pattern"], line_text, re.IGNORECASE):
-                                if line_bbox:
-                                    position = {
-                                        'x': line_bbox[0],
-                                        'y': line_bbox[1],
-                                        'width': line_bbox[2] - line_bbox[0],
-                                        'height': line_bbox[3] - line_bbox[1]
-                                    }
-                                    
-                                    field_name = f"text_field_{page_num}_{len(fields)}"
-                                    
-                                    fields.append({
-                                        'id': f"text_{field_name}",
-                                        'name': pattern_info["name"],
-                                        'pdf_field_name': field_name,
-                                        'type': pattern_info["type"],
-                                        'value': '',
-                                        'position': position,
-                                        'assigned_to': self.determine_field_assignment(field_name, pattern_info["type"]),
-                                        'page': page_num,
-                                        'source': 'text_analysis'
-                                    })
+            # Lines are already combined from their spans by the page analysis
+            for line_text, line_bbox in analysis.lines:
+                # Check against patterns
+                for pattern_info in TEXT_FIELD_PATTERNS:
+                    if pattern_info["regex"].search(line_text):
+                        if line_bbox:
+                            position = {
+                                'x': line_bbox[0],
+                                'y': line_bbox[1],
+                                'width': line_bbox[2] - line_bbox[0],
+                                'height': line_bbox[3] - line_bbox[1]
+                            }
+                            
+                            field_name = f"text_field_{page_num}_{len(fields)}"
+                            
+                            fields.append({
+                                'id': f"text_{field_name}",
+                                'name': pattern_info["name"],
+                                'pdf_field_name': field_name,
+                                'type': pattern_info["type"],
+                                'value': '',
+                                'position': position,
+                                'assigned_to': self.determine_field_assignment(field_name, pattern_info["type"]),
+                                'page': page_num,
+                                'source': 'text_analysis'
+                            })
             
             # Remove duplicate fields that are too close to each other
             unique_fields = []
@@ -540,106 +609,101 @@ class PDFProcessor:
             print(f"📋 Created field mapping with {len(field_mapping)} entries")
             print(f"🖋️  Found {len(signature_fields)} signature fields")
             
-            # Fill regular form fields first
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                widgets = list(page.widgets())
-                
-                for widget in widgets:
-                    field_name = widget.field_name
-                    if field_name and field_name in field_mapping:
-                        # Handle signature fields with cursive font overlay
-                        if field_name in signature_fields:
+            # Fill regular form fields first - the widget index jumps straight to the pages that have values
+            widget_index = get_widget_index(pdf_path, self.get_widget_type, 'pymupdf')
+            for page, widget, widget_type in iter_fill_widgets(doc, field_mapping, widget_index, self.get_widget_type):
+                field_name = widget.field_name
+                # Handle signature fields with cursive font overlay
+                if field_name in signature_fields:
+                    try:
+                        signature_text = signature_fields[field_name]['value']
+                        # Remove "typed:" prefix if present
+                        if signature_text.startswith('typed:'):
+                            signature_text = signature_text[6:].strip()
+                        
+                        # Clear the form field and add cursive text overlay
+                        widget.field_value = ""  # Clear form field
+                        widget.update()
+                        
+                        # Add cursive signature overlay
+                        rect = widget.rect
+                        signature_x = rect.x0 + 3
+                        signature_y = rect.y0 + rect.height - 3
+                        signature_font_size = max(10, min(rect.height - 2, 14))
+                        
+                        # Enhanced cursive font cascade for signatures
+                        cursive_fonts = [
+                            ("tiri", "Times Roman Italic - Cursive Style"),
+                            ("helv-oblique", "Helvetica Oblique - Cursive Style"),
+                            ("heli", "Helvetica Italic - Cursive Style"),
+                            ("coi", "Courier Italic - Cursive Style"),
+                            ("times-italic", "Times Italic - Cursive Style")
+                        ]
+                        
+                        signature_added = False
+                        for font_name, font_description in cursive_fonts:
                             try:
-                                signature_text = signature_fields[field_name]['value']
-                                # Remove "typed:" prefix if present
-                                if signature_text.startswith('typed:'):
-                                    signature_text = signature_text[6:].strip()
-                                
-                                # Clear the form field and add cursive text overlay
-                                widget.field_value = ""  # Clear form field
-                                widget.update()
-                                
-                                # Add cursive signature overlay
-                                rect = widget.rect
-                                signature_x = rect.x0 + 3
-                                signature_y = rect.y0 + rect.height - 3
-                                signature_font_size = max(10, min(rect.height - 2, 14))
-                                
-                                # Enhanced cursive font cascade for signatures
-                                cursive_fonts = [
-                                    ("tiri", "Times Roman Italic - Cursive Style"),
-                                    ("helv-oblique", "Helvetica Oblique - Cursive Style"),
-                                    ("heli", "Helvetica Italic - Cursive Style"),
-                                    ("coi", "Courier Italic - Cursive Style"),
-                                    ("times-italic", "Times Italic - Cursive Style")
-                                ]
-                                
-                                signature_added = False
-                                for font_name, font_description in cursive_fonts:
-                                    try:
-                                        page.insert_text(
-                                            (signature_x, signature_y),
-                                            signature_text,
-                                            fontsize=signature_font_size,
-                                            color=(0, 0, 0.9),  # Deeper blue for cursive signatures
-                                            fontname=font_name
-                                        )
-                                        print(f"✅ Added cursive signature '{signature_text}' for '{field_name}' ({font_description})")
-                                        signature_added = True
-                                        break
-                                    except Exception:
-                                        continue
-                                
-                                # Final fallback if no cursive fonts work
-                                if not signature_added:
-                                    page.insert_text(
-                                        (signature_x, signature_y),
-                                        signature_text,
-                                        fontsize=signature_font_size,
-                                        color=(0, 0, 0.9),  # Keep deeper blue even for fallback
-                                        render_mode=1  # Use text rendering mode 1 for slight italicization
-                                    )
-                                    print(f"✅ Added signature '{signature_text}' for '{field_name}' (fallback with text rendering)")
-                                
-                                filled_count += 1
-                                continue
-                            except Exception as e:
-                                print(f"⚠️  Could not fill signature field '{field_name}': {e}")
+                                page.insert_text(
+                                    (signature_x, signature_y),
+                                    signature_text,
+                                    fontsize=signature_font_size,
+                                    color=(0, 0, 0.9),  # Deeper blue for cursive signatures
+                                    fontname=font_name
+                                )
+                                print(f"✅ Added cursive signature '{signature_text}' for '{field_name}' ({font_description})")
+                                signature_added = True
+                                break
+                            except Exception:
                                 continue
-                            
-                        try:
-                            field_value = field_mapping[field_name]
-                            
-                            # Special handling for radio buttons and checkboxes
-                            widget_type = self.get_widget_type(widget)
-                            if widget_type == 'radio':
-                                if str(field_value).lower() in ['yes', 'true', '1']:
-                                    widget.field_value = True
-                                    widget.update()
-                                    filled_count += 1
-                                    print(f"✅ Filled radio field '{field_name}' with True")
-                                else:
-                                    # Leave blank for "no" or "false"
-                                    pass
-                            elif widget_type == 'checkbox':
-                                if str(field_value).lower() in ['true', 'yes', '1', 'checked']:
-                                    widget.field_value = True
-                                    widget.update()
-                                    filled_count += 1
-                                    print(f"✅ Filled checkbox field '{field_name}' with True")
-                                else:
-                                    widget.field_value = False
-                                    widget.update()
-                            else:
-                                # Handle other field types normally
-                                widget.field_value = str(field_value)
-                                widget.update()
-                                filled_count += 1
-                                print(f"✅ Filled field '{field_name}' with '{field_value}'")
-                        except Exception as e:
-                            print(f"⚠️  Could not fill field '{field_name}': {e}")
-            
+                        
+                        # Final fallback if no cursive fonts work
+                        if not signature_added:
+                            page.insert_text(
+                                (signature_x, signature_y),
+                                signature_text,
+                                fontsize=signature_font_size,
+                                color=(0, 0, 0.9),  # Keep deeper blue even for fallback
+                                render_mode=1  # Use text rendering mode 1 for slight italicization
+                            )
+                            print(f"✅ Added signature '{signature_text}' for '{field_name}' (fallback with text rendering)")
+                        
+                        filled_count += 1
+                        continue
+                    except Exception as e:
+                        print(f"⚠️  Could not fill signature field '{field_name}': {e}")
+                        continue
+                    
+                try:
+                    field_value = field_mapping[field_name]
+                    
+                    # Special handling for radio buttons and checkboxes (type comes precomputed from the widget index)
+                    if widget_type == 'radio':
+                        if str(field_value).lower() in ['yes', 'true', '1']:
+                            widget.field_value = True
+                            widget.update()
+                            filled_count += 1
+                            print(f"✅ Filled radio field '{field_name}' with True")
+                        else:
+                            # Leave blank for "no" or "false"
+                            pass
+                    elif widget_type == 'checkbox':
+                        if str(field_value).lower() in ['true', 'yes', '1', 'checked']:
+                            widget.field_value = True
+                            widget.update()
+                            filled_count += 1
+                            print(f"✅ Filled checkbox field '{field_name}' with True")
+                        else:
+                            widget.field_value = False
+                            widget.update()
+                    else:
+                        # Handle other field types normally
+                        widget.field_value = str(field_value)
+                        widget.update()
+                        filled_count += 1
+                        print(f"✅ Filled field '{field_name}' with '{field_value}'")
+                except Exception as e:
+                    print(f"⚠️  Could not fill field '{field_name}': {e}")
+    
             # Signature fields are now handled directly in the form field loop above
             print(f"📋 Signature fields filled directly in text boxes (no separate insertion needed)")
             
@@ -799,30 +863,55 @@ class PDFProcessor:
         except Exception as e:
             print(f"⚠️  Error inserting signature text: {e}")
     
-    def convert_pdf_to_image(self, pdf_path: str, page_num: int = 0) -> str:
-        """Convert PDF page to base64 image for preview"""
+    def render_page_image(self, pdf_path: str, page_num: int = 0, scale: float = 2.0, image_format: str = 'png') -> Optional[bytes]:
+        """Render a PDF page to image bytes, served from the preview cache when possible"""
+        return get_preview_cache().get_or_render_page(pdf_path, page_num, scale, image_format)
+    
+    def render_page_tile(self, pdf_path: str, page_num: int, column: int, row: int, scale: float = 2.0,
+                         tile_size: int = 512, image_format: str = 'png') -> Optional[bytes]:
+        """Render one tile_size x tile_size pixel tile of a page at the given zoom"""
+        return get_preview_cache().get_or_render_tile(pdf_path, page_num, column, row, scale, tile_size, image_format)
+    
+    def get_page_tile_layout(self, pdf_path: str, page_num: int = 0, scale: float = 2.0,
+                             tile_size: int = 512) -> Optional[Dict[str, Any]]:
+        """Describe the tile grid of a page rendered at the given zoom"""
         try:
             import fitz
             doc = fitz.open(pdf_path)
+            try:
+                if page_num < 0 or page_num >= len(doc):
+                    return None
+                page_rect = doc[page_num].rect
+            finally:
+                doc.close()
             
-            if page_num >= len(doc):
-                page_num = 0
-                
-            page = doc[page_num]
-            
-            # Convert page to image
-            mat = fitz.Matrix(2, 2)  # 2x zoom for better quality
-            pix = page.get_pixmap(matrix=mat)
+            columns, rows = tile_grid(page_rect.width, page_rect.height, scale, tile_size)
+            return {
+                'page_width': page_rect.width,
+                'page_height': page_rect.height,
+                'width': round(page_rect.width * scale),
+                'height': round(page_rect.height * scale),
+                'scale': scale,
+                'tile_size': tile_size,
+                'columns': columns,
+                'rows': rows
+            }
             
-            # Convert to PNG bytes
-            img_data = pix.tobytes("png")
+        except Exception as e:
+            print(f"❌ Error getting tile layout: {e}")
+            return None
+    
+    def convert_pdf_to_image(self, pdf_path: str, page_num: int = 0) -> str:
+        """Convert PDF page to base64 image for preview"""
+        try:
+            # 2x zoom for better quality; repeated views of the same page come from the cache
+            img_data = self.render_page_image(pdf_path, page_num, 2.0, 'png')
+            if img_data is None:
+                raise ValueError(f"could not render {pdf_path}")
             
             # Convert to base64 for web display
-            import base64
             img_base64 = base64.b64encode(img_data).decode()
             
-            doc.close()
-            
             # Return as data URL
             return f"data:image/png;base64,{img_base64}"
             
@@ -850,16 +939,12 @@ class PDFProcessor:
             print(f"❌ Error getting PDF info: {e}")
             return {'page_count': 1, 'width': 612, 'height': 792, 'file_size': 0}
 
-    def create_intelligent_fields(self, doc) -> List[Dict[str, Any]]:
+    def create_intelligent_fields(self, page_texts: List[str]) -> List[Dict[str, Any]]:
         """Create intelligent field suggestions based on document text analysis"""
         fields = []
         
-        # Analyze document text to suggest common fields
-        text_content = ""
-        for page in doc:
-            text_content += page.get_text()
-        
-        text_lower = text_content.lower()
+        # Analyze document text (already extracted per page) to suggest common fields
+        text_lower = "\n".join(page_texts).lower()
         
         # Common field patterns and their likely positions
         field_patterns = [
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Completed-PDF rendering, kept apart from the Flask app so job workers can import it cheaply
+"""
+
+import os
+import PyPDF2
+
+from supabase_client import create_database_manager
+from pdf_processor import PDFProcessor
+from render_cache import get_render_cache
+from file_security import get_file_hash
+
+# Where uploads live and completed/summary PDFs are written
+UPLOAD_FOLDER = 'uploads'
+
+_pdf_processor = None
+_render_db = None
+
+
+def get_pdf_processor():
+    """Get the global PDF processor instance"""
+    global _pdf_processor
+    if _pdf_processor is None:
+        _pdf_processor = PDFProcessor()
+    return _pdf_processor
+
+
+def get_render_db():
+    """Database manager for job workers (created on first use, once per worker process)"""
+    global _render_db
+    if _render_db is None:
+        _render_db = create_database_manager()
+    return _render_db
+
+
+def completed_pdf_source_path(document):
+    """The PDF a document is filled from - the Section 5 enhanced copy if one exists"""
+    enhanced_pdf_path = document['file_path'].replace('.pdf', '_enhanced.pdf')
+    if os.path.exists(enhanced_pdf_path):
+        return enhanced_pdf_path
+    return document['file_path']
+
+def completed_pdf_cache_key(document):
+    """Render cache key (and download ETag) of a document's completed PDF, or None if its PDF is missing"""
+    if not document.get('file_path') or not os.path.exists(document['file_path']):
+        return None
+    source_hash = get_file_hash(completed_pdf_source_path(document))
+    if not source_hash:
+        return None
+    return get_render_cache().make_key(source_hash, document.get('pdf_fields', []))
+
+def generate_completed_pdf(document):
+    """Generate a completed PDF with all field values filled"""
+    try:
+        print(f"🎯 Generating completed PDF for document: {document['name']}")
+        print(f"📊 Document has keys: {list(document.keys())}")
+        
+        # Debug: print document data
+        if 'pdf_fields' in document:
+            print(f"📋 PDF fields count: {len(document['pdf_fields'])}")
+            for field in document['pdf_fields'][:3]:  # Show first 3 fields
+                print(f"   - {field.get('name', 'unnamed')}: '{field.get('value', '')}' → {field.get('assigned_to', 'unassigned')}")
+        
+        if 'user1_data' in document:
+            print(f"👤 User 1 data: {list(document['user1_data'].keys())}")
+            
+        if 'user2_data' in document:
+            print(f"👥 User 2 data: {list(document['user2_data'].keys())}")
+        
+        # Check if we have the original PDF file
+        if 'file_path' not in document or not os.path.exists(document['file_path']):
+            print("❌ Original PDF file not found, generating summary PDF")
+            return generate_summary_pdf(document)
+        
+        print(f"📄 Original PDF found: {document['file_path']}")
+        
+        # Check if we need to use enhanced PDF with Section 5 widgets
+        source_pdf_path = completed_pdf_source_path(document)
+        if source_pdf_path != document['file_path']:
+            print(f"🛠️  Using enhanced PDF with Section 5 widgets: {source_pdf_path}")
+        else:
+            print(f"📄 Using original PDF: {document['file_path']}")
+        
+        # Same source file and same field values -> same output, so serve the earlier render
+        cache_key = completed_pdf_cache_key(document)
+        cached_path = get_render_cache().get(document['id'], cache_key)
+        if cached_path:
+            print(f"♻️  Serving cached completed PDF: {cached_path}")
+            return cached_path
+        
+        # Create output path
+        output_filename = f"completed_{document['id']}_{document['name']}"
+        output_path = os.path.join(UPLOAD_FOLDER, output_filename)
+        print(f"📁 Output path: {output_path}")
+        
+        # Try PyMuPDF first for better accuracy
+        print("🔧 Attempting to fill PDF with PyMuPDF...")
+        if get_pdf_processor().fill_pdf_with_pymupdf(source_pdf_path, document, output_path):
+            print(f"✅ Successfully filled PDF with PyMuPDF: {output_path}")
+            return get_render_cache().put(document['id'], cache_key, output_path)
+        
+        # Fallback to advanced filling
+        print("🔧 Attempting to fill with legacy method...")
+        if fill_pdf_fields_advanced(document['file_path'], document, output_path):
+            print(f"✅ Successfully filled original PDF: {output_path}")
+            return get_render_cache().put(document['id'], cache_key, output_path)
+        
+        # Final fallback: create overlay PDF
+        print("🔧 Attempting to create overlay PDF...")
+        if get_pdf_processor().create_overlay_pdf(document['file_path'], document.get('pdf_fields', []), output_path):
+            print(f"✅ Successfully created overlay PDF: {output_path}")
+            return get_render_cache().put(document['id'], cache_key, output_path)
+        else:
+            print("⚠️  Could not fill original PDF, generating summary PDF instead")
+            return generate_summary_pdf(document)
+            
+    except Exception as e:
+        print(f"❌ Error generating completed PDF: {e}")
+        import traceback
+        traceback.print_exc()
+        print("🔄 Falling back to summary PDF generation...")
+        return generate_summary_pdf(document)
+
+def fill_pdf_fields_advanced(pdf_path, document, output_path):
+    """Advanced PDF field filling with better field matching"""
+    try:
+        with open(pdf_path, 'rb') as input_file:
+            pdf_reader = PyPDF2.PdfReader(input_file)
+            pdf_writer = PyPDF2.PdfWriter()
+            
+            print(f"📄 Processing PDF with {len(pdf_reader.pages)} pages")
+            
+            # Create a mapping of field names to values from our extracted fields
+            field_mapping = {}
+            
+            # Map PDF field values using the original field names/IDs from extraction
+            if 'pdf_fields' in document:
+                for field in document['pdf_fields']:
+                    if field.get('value'):
+                        # Use the original field name from the PDF extraction
+                        original_name = field['name']
+                        field_id = field.get('id', '')
+                        field_value = field['value']
+                        pdf_field_name = field.get('pdf_field_name', original_name)
+                        
+                        # Map using exact field names first (highest priority)
+                        field_mapping[pdf_field_name] = field_value
+                        field_mapping[original_name] = field_value
+                        field_mapping[field_id] = field_value
+                        
+                        # Also map lowercase versions for fallback
+                        field_mapping[pdf_field_name.lower()] = field_value
+                        field_mapping[original_name.lower()] = field_value
+                        
+                        print(f"📝 Mapping field: '{pdf_field_name}' = '{field_value}'")
+            
+            print(f"📋 Created {len(field_mapping)} field mappings")
+            filled_count = 0
+            
+            # Method 1: Try to fill using AcroForm fields directly
+            if '/AcroForm' in pdf_reader.trailer.get('/Root', {}):
+                acro_form = pdf_reader.trailer['/Root']['/AcroForm']
+                print("✅ Found AcroForm in PDF")
+                
+                if '/Fields' in acro_form:
+                    form_fields = acro_form['/Fields']
+                    print(f"📋 Found {len(form_fields)} form fields in AcroForm")
+                    
+                    for i, field_ref in enumerate(form_fields):
+                        try:
+                            field_obj = field_ref.get_object()
+                            if '/T' in field_obj:
+                                field_name = str(field_obj['/T'])
+                                print(f"🔍 Processing form field: '{field_name}'")
+                                
+                                # Look for a matching value in our mapping
+                                field_value = None
+                                
+                                # Try exact match first
+                                if field_name in field_mapping:
+                                    field_value = field_mapping[field_name]
+                                # Try lowercase match
+                                elif field_name.lower() in field_mapping:
+                                    field_value = field_mapping[field_name.lower()]
+                                # Try partial matches
+                                else:
+                                    for mapped_name, mapped_value in field_mapping.items():
+                                        if (mapped_name.lower() in field_name.lower() or 
+                                            field_name.lower() in mapped_name.lower()):
+                                            field_value = mapped_value
+                                            break
+                                
+                                if field_value:
+                                    try:
+                                        # Fill the field value
+                                        field_obj.update({
+                                            PyPDF2.generic.NameObject('/V'): 
+                                            PyPDF2.generic.TextStringObject(str(field_value))
+                                        })
+                                        filled_count += 1
+                                        print(f"✅ Filled field '{field_name}' with '{field_value}'")
+                                    except Exception as e:
+                                        print(f"⚠️  Could not fill field '{field_name}': {e}")
+                                else:
+                                    print(f"⭕ No value found for field '{field_name}'")
+                        except Exception as e:
+                            print(f"⚠️  Error processing field {i}: {e}")
+            
+            # Method 2: Also try annotation-based approach for additional coverage
+            for page_num in range(len(pdf_reader.pages)):
+                page = pdf_reader.pages[page_num]
+                
+                if '/Annots' in page:
+                    annotations = page['/Annots']
+                    for annotation in annotations:
+                        try:
+                            annotation_obj = annotation.get_object()
+                            if '/T' in annotation_obj and '/Subtype' in annotation_obj:
+                                subtype = annotation_obj['/Subtype']
+                                if subtype == '/Widget':  # Form field widget
+                                    field_name = str(annotation_obj['/T'])
+                                    
+                                    # Skip if we already filled this field
+                                    if any(field_name in str(filled) for filled in range(filled_count)):
+                                        continue
+                                    
+                                    # Look for value
+                                    field_value = None
+                                    if field_name in field_mapping:
+                                        field_value = field_mapping[field_name]
+                                    elif field_name.lower() in field_mapping:
+                                        field_value = field_mapping[field_name.lower()]
+                                    
+                                    if field_value:
+                                        try:
+                                            annotation_obj.update({
+                                                PyPDF2.generic.NameObject('/V'): 
+                                                PyPDF2.generic.TextStringObject(str(field_value))
+                                            })
+                                            filled_count += 1
+                                            print(f"✅ Filled annotation field '{field_name}' with '{field_value}'")
+                                        except Exception as e:
+                                            print(f"⚠️  Could not fill annotation field '{field_name}': {e}")
+                        except Exception as e:
+                            continue
+                
+                pdf_writer.add_page(page)
+            
+            # Write the filled PDF
+            with open(output_path, 'wb') as output_file:
+                pdf_writer.write(output_file)
+            
+            print(f"✅ Successfully filled {filled_count} fields in original PDF")
+            
+            # Only consider it successful if we actually filled some fields
+            if filled_count > 0:
+                return True
+            else:
+                print("⚠️  No fields were actually filled in original PDF")
+                return False
+                
+    except Exception as e:
+        print(f"❌ Error in fill_pdf_fields_advanced: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def generate_summary_pdf(document):
+    """Generate a summary PDF when original PDF filling fails"""
+    try:
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib import colors
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import inch
+        
+        output_filename = f"summary_{document['id']}_{document['name']}"
+        output_path = os.path.join(UPLOAD_FOLDER, output_filename)
+        
+        # Create PDF document
+        doc = SimpleDocTemplate(output_path, pagesize=letter)
+        styles = getSampleStyleSheet()
+        story = []
+        
+        # Title
+        title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Title'],
+            fontSize=18,
+            textColor=colors.darkblue,
+            spaceAfter=20
+        )
+        story.append(Paragraph(f"Completed Document: {document['name']}", title_style))
+        story.append(Spacer(1, 20))
+        
+        # Document info
+        info_data = [
+            ['Document ID:', document['id']],
+            ['Status:', document.get('status', 'Completed')],
+            ['Completed:', document.get('completed_at', 'Recently')[:10] if document.get('completed_at') else 'Recently']
+        ]
+        
+        info_table = Table(info_data, colWidths=[2*inch, 4*inch])
+        info_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        story.append(info_table)
+        story.append(Spacer(1, 20))
+        
+        # User 1 Information
+        if document.get('user1_data'):
+            story.append(Paragraph("User 1 Information", styles['Heading2']))
+            user1_data = []
+            for key, value in document['user1_data'].items():
+                if value:
+                    user1_data.append([key.replace('_', ' ').title(), str(value)])
+            
+            if user1_data:
+                user1_table = Table(user1_data, colWidths=[2*inch, 4*inch])
+                user1_table.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (0, -1), colors.lightblue),
+                    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, -1), 10),
+                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+                ]))
+                story.append(user1_table)
+                story.append(Spacer(1, 20))
+        
+        # PDF Fields
+        if document.get('pdf_fields'):
+            story.append(Paragraph("Completed Form Fields", styles['Heading2']))
+            
+            # Add header row
+            field_data = [['Field Name', 'Value', 'Completed By']]
+            
+            for field in document['pdf_fields']:
+                if field.get('value'):
+                    user_label = "User 1" if field['assigned_to'] == 'user1' else "User 2"
+                    field_data.append([
+                        field['name'],
+                        field['value'],
+                        user_label
+                    ])
+            
+            if len(field_data) > 1:  # More than just header
+                field_table = Table(field_data, colWidths=[2.5*inch, 3*inch, 1*inch])
+                field_table.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+                    ('FONTSIZE', (0, 0), (-1, -1), 10),
+                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+                ]))
+                story.append(field_table)
+                story.append(Spacer(1, 20))
+            else:
+                story.append(Paragraph("No field values were provided.", styles['Normal']))
+                story.append(Spacer(1, 20))
+        
+        # User 2 Information
+        if document.get('user2_data'):
+            story.append(Paragraph("User 2 Information", styles['Heading2']))
+            user2_data = []
+            for key, value in document['user2_data'].items():
+                if value and key != 'signature':
+                    user2_data.append([key.replace('_', ' ').title(), str(value)])
+            
+            if user2_data:
+                user2_table = Table(user2_data, colWidths=[2*inch, 4*inch])
+                user2_table.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (0, -1), colors.orange),
+                    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, -1), 10),
+                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+                ]))
+                story.append(user2_table)
+        
+        # Build PDF
+        doc.build(story)
+        print(f"✅ Generated summary PDF: {output_path}")
+        return output_path
+        
+    except Exception as e:
+        print(f"❌ Error generating summary PDF: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+def render_completed_pdf_job(payload):
+    """Job handler (runs in a job worker process): render the completed PDF for a document"""
+    document = get_render_db().load_document(payload['document_id'], 'download')
+    if not document:
+        raise ValueError(f"Document not found: {payload['document_id']}")
+    
+    output_path = generate_completed_pdf(document)
+    if not output_path or not os.path.exists(output_path):
+        raise RuntimeError('PDF generation produced no output')
+    
+    with open(output_path, 'rb') as f:
+        header = f.read(10)
+    if not header.startswith(b'%PDF'):
+        raise RuntimeError(f'Generated PDF appears to be corrupted (header {header!r})')
+    
+    cache_key = completed_pdf_cache_key(document)
+    return {
+        'output_path': output_path,
+        'download_name': f"completed_{document['name']}",
+        'file_size': os.path.getsize(output_path),
+        'cache_key': cache_key if get_render_cache().holds(output_path) else None
+    }
@@ -0,0 +1,82 @@
+"""
+Request-scoped and short-TTL caching of per-document user permissions
+"""
+
+import os
+from typing import Any, Dict, Optional
+
+from flask import g, has_request_context
+
+from ttl_cache import TTLCache
+
+
+class PermissionCache:
+    """Caches user_documents rows (role, can_edit, can_share) per request (flask g) and per user (short TTL)"""
+
+    def __init__(self, ttl_seconds: float = None, max_users: int = None):
+        ttl_seconds = ttl_seconds or float(os.getenv('PERMISSION_CACHE_TTL_SECONDS', '30'))
+        max_users = max_users or int(os.getenv('PERMISSION_CACHE_MAX_USERS', '10000'))
+
+        # user_id -> {document_id: permission row, or None when the user has no access}.
+        # Invalidation only reaches this process; other workers catch up when their entries expire.
+        self._users = TTLCache(max_entries=max_users, ttl_seconds=ttl_seconds)
+
+    def get_permission(self, db_manager, user_id: str, document_id: str) -> Optional[Dict[str, Any]]:
+        """Return the user's permission row for a document, or None if they have no access"""
+        key = (user_id, document_id)
+
+        request_cache = self._request_cache()
+        if request_cache is not None and key in request_cache:
+            return request_cache[key]
+
+        permissions = self._users.get(user_id)
+        if permissions is not None and document_id in permissions:
+            permission = permissions[document_id]
+        else:
+            # A database error propagates before anything is stored, so a failed lookup is never cached as "no access"
+            permission = db_manager.get_document_permission(document_id, user_id)
+            if permissions is None:
+                permissions = {}
+                self._users.put(user_id, permissions)
+            permissions[document_id] = permission
+
+        if request_cache is not None:
+            request_cache[key] = permission
+        return permission
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Forget everything cached for a user"""
+        self._users.invalidate(user_id)
+
+        request_cache = self._request_cache()
+        if request_cache is not None:
+            for key in [key for key in request_cache if key[0] == user_id]:
+                del request_cache[key]
+
+    def invalidate_document(self, document_id: str) -> None:
+        """Forget every user's cached permission on a document"""
+        self._users.invalidate_where(lambda _, permissions: document_id in permissions)
+
+        request_cache = self._request_cache()
+        if request_cache is not None:
+            for key in [key for key in request_cache if key[1] == document_id]:
+                del request_cache[key]
+
+    def clear(self) -> None:
+        """Drop the process-wide cache"""
+        self._users.clear()
+
+    def _request_cache(self) -> Optional[Dict[tuple, Optional[Dict[str, Any]]]]:
+        if not has_request_context():
+            return None
+        if not hasattr(g, 'document_permissions'):
+            g.document_permissions = {}
+        return g.document_permissions
+
+
+# Global instance
+permission_cache = PermissionCache()
+
+def get_permission_cache() -> PermissionCache:
+    """Get the global permission cache instance"""
+    return permission_cache
@@ -0,0 +1,276 @@
+"""
+Cache of rendered PDF page images and tiles with a byte-budgeted memory tier and a disk spill directory
+"""
+
+import math
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from file_security import get_file_hash
+
+# Output formats we can encode a rendered page into, mapped to their MIME types
+IMAGE_MIME_TYPES = {
+    'png': 'image/png',
+    'jpeg': 'image/jpeg',
+    'webp': 'image/webp',
+}
+
+
+def encode_pixmap(pix, image_format: str) -> bytes:
+    """Encode a rendered pixmap as PNG, JPEG or WebP"""
+    if image_format == 'png':
+        return pix.tobytes("png")
+
+    # JPEG/WebP go through Pillow, which needs an RGB buffer
+    if pix.alpha:
+        pix = fitz.Pixmap(pix, 0)
+    img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    buffer = BytesIO()
+    if image_format == 'jpeg':
+        img.save(buffer, format='JPEG', quality=85)
+    else:
+        img.save(buffer, format='WEBP', quality=85)
+    return buffer.getvalue()
+
+
+def tile_grid(page_width: float, page_height: float, scale: float, tile_size: int) -> Tuple[int, int]:
+    """Number of (columns, rows) of tile_size pixel tiles covering a page rendered at scale"""
+    return (max(1, math.ceil(page_width * scale / tile_size)),
+            max(1, math.ceil(page_height * scale / tile_size)))
+
+
+def tile_clip_rect(page_rect, column: int, row: int, scale: float, tile_size: int):
+    """Page-space clip rectangle for one tile, or None if the tile lies outside the page"""
+    columns, rows = tile_grid(page_rect.width, page_rect.height, scale, tile_size)
+    if column < 0 or row < 0 or column >= columns or row >= rows:
+        return None
+
+    # Tiles are tile_size pixels square in the rendered image, i.e. tile_size / scale points on the page
+    step = tile_size / scale
+    x0 = page_rect.x0 + column * step
+    y0 = page_rect.y0 + row * step
+    return fitz.Rect(x0, y0, min(x0 + step, page_rect.x1), min(y0 + step, page_rect.y1))
+
+
+class PreviewCache:
+    """LRU of rendered page images keyed by (file hash, page, scale, format)"""
+
+    def __init__(self, cache_dir: str = None, max_memory_bytes: int = None, max_disk_bytes: int = None):
+        self.cache_dir = cache_dir or os.getenv('PREVIEW_CACHE_DIR', os.path.join('cache', 'previews'))
+        self.max_memory_bytes = max_memory_bytes or int(os.getenv('PREVIEW_CACHE_MEMORY_BYTES', str(64 * 1024 * 1024)))
+        self.max_disk_bytes = max_disk_bytes or int(os.getenv('PREVIEW_CACHE_DISK_BYTES', str(1024 * 1024 * 1024)))
+
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._writes_since_prune = 0
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, file_hash: str, page_index: int, scale: float, image_format: str) -> str:
+        """Build the cache key for one rendering of one page"""
+        return f"{file_hash}-p{page_index}-s{scale:g}.{image_format}"
+
+    def make_tile_key(self, file_hash: str, page_index: int, scale: float, tile_size: int,
+                      column: int, row: int, image_format: str) -> str:
+        """Build the cache key for one tile of one page rendering"""
+        return f"{file_hash}-p{page_index}-s{scale:g}-t{tile_size}-{column}x{row}.{image_format}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached image bytes, checking memory then disk"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return data
+
+        data = self._read_from_disk(key)
+        if data is not None:
+            with self._lock:
+                self.disk_hits += 1
+            self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store image bytes in memory and spill them to disk for other workers"""
+        self._remember(key, data)
+        self._write_to_disk(key, data)
+
+    def get_or_render_page(self, pdf_path: str, page_index: int, scale: float = 2.0,
+                           image_format: str = 'png') -> Optional[bytes]:
+        """Return the rendered page image, rasterizing only on a cache miss"""
+        file_hash = get_file_hash(pdf_path)
+        if not file_hash:
+            return None
+
+        key = self.make_key(file_hash, page_index, scale, image_format)
+        return self._get_or_render(key, lambda: self.render_page(pdf_path, page_index, scale, image_format))
+
+    def get_or_render_tile(self, pdf_path: str, page_index: int, column: int, row: int,
+                           scale: float = 2.0, tile_size: int = 512,
+                           image_format: str = 'png') -> Optional[bytes]:
+        """Return one tile of a page rendering, rasterizing only that clip on a cache miss"""
+        file_hash = get_file_hash(pdf_path)
+        if not file_hash:
+            return None
+
+        key = self.make_tile_key(file_hash, page_index, scale, tile_size, column, row, image_format)
+        return self._get_or_render(
+            key, lambda: self.render_tile(pdf_path, page_index, column, row, scale, tile_size, image_format))
+
+    def render_page(self, pdf_path: str, page_index: int, scale: float, image_format: str) -> Optional[bytes]:
+        """Rasterize one page (None if the page is out of range)"""
+        doc = fitz.open(pdf_path)
+        try:
+            if page_index < 0 or page_index >= len(doc):
+                return None
+            pix = doc[page_index].get_pixmap(matrix=fitz.Matrix(scale, scale))
+            return encode_pixmap(pix, image_format)
+        finally:
+            doc.close()
+
+    def render_tile(self, pdf_path: str, page_index: int, column: int, row: int,
+                    scale: float, tile_size: int, image_format: str) -> Optional[bytes]:
+        """Rasterize the clip rectangle of one tile (None if the tile lies outside the page)"""
+        doc = fitz.open(pdf_path)
+        try:
+            if page_index < 0 or page_index >= len(doc):
+                return None
+            page = doc[page_index]
+            clip = tile_clip_rect(page.rect, column, row, scale, tile_size)
+            if clip is None:
+                return None
+            pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), clip=clip)
+            return encode_pixmap(pix, image_format)
+        finally:
+            doc.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and memory usage"""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                'memory_entries': len(self._entries),
+                'memory_bytes': self._memory_bytes,
+                'max_memory_bytes': self.max_memory_bytes
+            }
+
+    def _get_or_render(self, key: str, render: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        data = self.get(key)
+        if data is not None:
+            return data
+
+        with self._lock:
+            self.misses += 1
+
+        data = render()
+        if data is not None:
+            self.put(key, data)
+        return data
+
+    def _remember(self, key: str, data: bytes) -> None:
+        # Single images bigger than the whole budget are only kept on disk
+        if len(data) > self.max_memory_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+
+            self._entries[key] = data
+            self._memory_bytes += len(data)
+
+            while self._memory_bytes > self.max_memory_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def _read_from_disk(self, key: str) -> Optional[bytes]:
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Touch the file so disk pruning evicts least recently used images first
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️  Error reading cached preview {key}: {e}")
+            return None
+
+    def _write_to_disk(self, key: str, data: bytes) -> None:
+        path = self._disk_path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"⚠️  Could not spill preview {key} to disk: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._writes_since_prune += 1
+            should_prune = self._writes_since_prune >= 50
+            if should_prune:
+                self._writes_since_prune = 0
+        if should_prune:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Delete least recently used spilled images until the directory fits its budget"""
+        try:
+            entries = []
+            total_bytes = 0
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    stat_info = entry.stat()
+                    entries.append((stat_info.st_mtime, stat_info.st_size, entry.path))
+                    total_bytes += stat_info.st_size
+
+            if total_bytes <= self.max_disk_bytes:
+                return
+
+            entries.sort()
+            for _, size, path in entries:
+                if total_bytes <= self.max_disk_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total_bytes -= size
+                except OSError:
+                    pass
+        except Exception as e:
+            print(f"⚠️  Error pruning preview cache: {e}")
+
+
+# Global instance
+preview_cache = PreviewCache()
+
+def get_preview_cache() -> PreviewCache:
+    """Get the global preview cache instance"""
+    return preview_cache
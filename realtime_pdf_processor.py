@@ -13,6 +13,19 @@ import base64
 from io import BytesIO
 from PIL import Image
 
+from page_analysis import PageAnalysis
+from extraction_engine import get_extraction_engine
+from preview_cache import get_preview_cache
+from extraction_cache import get_extraction_cache
+from file_security import get_file_hash
+from widget_index import get_widget_index, iter_fill_widgets
+
+# Namespace for deterministic field IDs derived from (id scope, page, widget)
+FIELD_ID_NAMESPACE = uuid.UUID('6f1c8a52-3d4e-4b8a-9a2f-5c7e1d9b0a34')
+
+# Bump when per-page detection output changes so cached pages are not reused
+REALTIME_EXTRACTOR_VERSION = "1"
+
 class RealtimePDFProcessor:
     """Enhanced PDF processor for real-time editing with accurate field detection"""
     
@@ -61,9 +74,10 @@ class RealtimePDFProcessor:
             print(f"❌ Error extracting PDF info: {e}")
             return {'error': str(e)}
     
-    def detect_fields_with_positions(self, pdf_path: str) -> Dict[str, Any]:
-        """Detect all form fields with accurate positions and metadata"""
+    def detect_fields_with_positions(self, pdf_path: str, id_scope: str = None) -> Dict[str, Any]:
+        """Detect all form fields with accurate positions and metadata (ids scoped as in make_field_id)"""
         try:
+            id_scope = id_scope or self.default_id_scope(pdf_path)
             doc = fitz.open(pdf_path)
             fields = []
             field_mapping = {}
@@ -71,33 +85,20 @@ class RealtimePDFProcessor:
             print(f"🔍 Analyzing PDF: {pdf_path}")
             print(f"📄 PDF has {len(doc)} pages")
             
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                page_info = {
-                    'width': page.rect.width,
-                    'height': page.rect.height
-                }
-                
-                # Extract form widgets
-                widgets = list(page.widgets())
-                print(f"📋 Page {page_num + 1}: Found {len(widgets)} form widgets")
-                
-                for widget_index, widget in enumerate(widgets):
-                    field_info = self.extract_widget_info_detailed(
-                        widget, page_num, widget_index, page_info
-                    )
-                    
-                    if field_info:
-                        fields.append(field_info)
-                        field_mapping[field_info['pdf_field_name']] = field_info['id']
-                        print(f"   ✅ {field_info['type'].upper()}: {field_info['name']}")
-                
-                # Detect text-based signature areas
-                signature_areas = self.detect_signature_areas(page, page_num)
-                for sig_area in signature_areas:
-                    fields.append(sig_area)
-                    field_mapping[sig_area['pdf_field_name']] = sig_area['id']
-                    print(f"   ✍️  SIGNATURE AREA: {sig_area['name']}")
+            # Large documents are sharded across worker processes; results come back in page order
+            page_results = get_extraction_engine().extract_pages(
+                'realtime', pdf_path, len(doc),
+                lambda page_num: self.extract_page_fields(doc, page_num, id_scope=id_scope),
+                {'id_scope': id_scope}
+            )
+            
+            for page_result in page_results:
+                for field_info in page_result['fields']:
+                    fields.append(field_info)
+                    field_mapping[field_info['pdf_field_name']] = field_info['id']
+            
+            # Index the widgets while the template is open so filling it later never scans every page
+            get_widget_index(pdf_path, self.get_widget_type_detailed, 'realtime', doc)
             
             doc.close()
             
@@ -117,7 +118,85 @@ class RealtimePDFProcessor:
             traceback.print_exc()
             return {'error': str(e)}
     
-    def extract_widget_info_detailed(self, widget, page_num: int, widget_index: int, page_info: dict) -> Optional[Dict[str, Any]]:
+    def extract_page_fields(self, doc, page_num: int, id_scope: str = None) -> Dict[str, Any]:
+        """Detect widgets and signature areas on a single page (runs in-process or inside an extraction worker)"""
+        fields = []
+        id_scope = id_scope or self.default_id_scope(doc.name)
+        
+        analysis = PageAnalysis(doc[page_num], page_num)
+        page_info = {
+            'width': analysis.width,
+            'height': analysis.height,
+            'id_scope': id_scope
+        }
+        
+        # Extract form widgets
+        widgets = analysis.widgets
+        print(f"📋 Page {page_num + 1}: Found {len(widgets)} form widgets")
+        
+        for widget_index, widget in enumerate(widgets):
+            field_info = self.extract_widget_info_detailed(
+                widget, page_num, widget_index, page_info, analysis
+            )
+            
+            if field_info:
+                fields.append(field_info)
+                print(f"   ✅ {field_info['type'].upper()}: {field_info['name']}")
+        
+        # Detect text-based signature areas
+        signature_areas = self.detect_signature_areas(analysis, id_scope)
+        for sig_area in signature_areas:
+            fields.append(sig_area)
+            print(f"   ✍️  SIGNATURE AREA: {sig_area['name']}")
+        
+        return {'page': page_num, 'fields': fields}
+    
+    def detect_page_fields(self, pdf_path: str, page_num: int, use_cache: bool = True,
+                           id_scope: str = None) -> List[Dict[str, Any]]:
+        """Detect the fields of a single page (1-indexed), cached per file hash, id scope and page"""
+        id_scope = id_scope or self.default_id_scope(pdf_path)
+        cache = get_extraction_cache()
+        cache_key = None
+        if use_cache:
+            # Field ids embed the id scope, so it is part of the key along with the content hash
+            base_key = cache.key_for_file(pdf_path, REALTIME_EXTRACTOR_VERSION)
+            if base_key:
+                scope_digest = uuid.uuid5(FIELD_ID_NAMESPACE, id_scope).hex[:12]
+                cache_key = f"{base_key}-realtime-{scope_digest}-p{page_num}"
+                cached_fields = cache.get(cache_key)
+                if cached_fields is not None:
+                    return cached_fields
+        
+        doc = fitz.open(pdf_path)
+        try:
+            if page_num < 1 or page_num > len(doc):
+                return []
+            fields = self.extract_page_fields(doc, page_num - 1, id_scope=id_scope)['fields']
+        finally:
+            doc.close()
+        
+        if cache_key:
+            cache.put(cache_key, fields)
+        return fields
+    
+    def get_page_count(self, pdf_path: str) -> int:
+        """Number of pages in a PDF"""
+        doc = fitz.open(pdf_path)
+        try:
+            return len(doc)
+        finally:
+            doc.close()
+    
+    def default_id_scope(self, pdf_path: str) -> str:
+        """Id scope when the caller has no document: the file's content hash, however the path is spelled"""
+        return get_file_hash(pdf_path) or os.path.abspath(pdf_path)
+    
+    def make_field_id(self, id_scope: str, page_num: int, key: str) -> str:
+        """Deterministic field ID within a scope (a document id, or the file hash), so serial and
+        parallel extraction agree and documents sharing a template PDF never share ids"""
+        return str(uuid.uuid5(FIELD_ID_NAMESPACE, f"{id_scope}:{page_num}:{key}"))
+    
+    def extract_widget_info_detailed(self, widget, page_num: int, widget_index: int, page_info: dict, analysis: Optional[PageAnalysis] = None) -> Optional[Dict[str, Any]]:
         """Extract detailed widget information with accurate positioning"""
         try:
             # Get field name
@@ -148,8 +227,8 @@ class RealtimePDFProcessor:
             # Determine field assignment based on name/position
             assigned_to = self.determine_field_assignment(field_name, position)
             
-            # Generate unique field ID
-            field_id = str(uuid.uuid4())
+            # Generate unique, stable field ID
+            field_id = self.make_field_id(page_info.get('id_scope', ''), page_num, f"widget:{widget_index}:{field_name}")
             
             # Check if this should be treated as a signature field based on name
             if widget_type == 'text' and any(keyword in field_name.lower() for keyword in ['signature', 'sig']):
@@ -159,9 +238,14 @@ class RealtimePDFProcessor:
             # Get styling information
             styling = self.extract_field_styling(widget)
             
+            # Unnamed widgets get their display name from the closest text label on the page
+            display_name = None
+            if not widget.field_name and analysis is not None:
+                display_name = analysis.find_label(rect.x0, rect.y0)
+            
             field_info = {
                 'id': field_id,
-                'name': self.generate_field_name(field_name, widget_type),
+                'name': display_name or self.generate_field_name(field_name, widget_type),
                 'pdf_field_name': field_name,
                 'type': widget_type,
                 'value': field_value,
@@ -359,62 +443,58 @@ class RealtimePDFProcessor:
         
         return name
     
-    def detect_signature_areas(self, page, page_num: int) -> List[Dict[str, Any]]:
+    def detect_signature_areas(self, analysis: PageAnalysis, id_scope: str = '') -> List[Dict[str, Any]]:
         """Detect potential signature areas based on text and lines"""
         signature_areas = []
+        page_num = analysis.page_num
+        page_width = analysis.width
+        page_height = analysis.height
         
         try:
-            # Look for signature-related text
-            text_dict = page.get_text("dict")
-            
-            for block in text_dict.get("blocks", []):
-                if "lines" in block:
-                    for line in block["lines"]:
-                        for span in line.get("spans", []):
-                            text = span.get("text", "").lower()
-                            if any(keyword in text for keyword in ["signature", "sign here", "signed"]):
-                                bbox = span.get("bbox", [0, 0, 0, 0])
-                                
-                                # Create signature field
-                                field_id = str(uuid.uuid4())
-                                signature_area = {
-                                    'id': field_id,
-                                    'name': f'Signature Area (Page {page_num + 1})',
-                                    'pdf_field_name': f'signature_area_{page_num + 1}_{len(signature_areas) + 1}',
-                                    'type': 'signature',
-                                    'value': '',
-                                    'position': {
-                                        'x': bbox[0],
-                                        'y': bbox[1] + 20,  # Place signature below text
-                                        'width': max(200, bbox[2] - bbox[0]),
-                                        'height': 30,
-                                        'page': page_num + 1,
-                                        'page_width': page.rect.width,
-                                        'page_height': page.rect.height,
-                                        'relative_x': bbox[0] / page.rect.width,
-                                        'relative_y': (bbox[1] + 20) / page.rect.height,
-                                        'relative_width': max(200, bbox[2] - bbox[0]) / page.rect.width,
-                                        'relative_height': 30 / page.rect.height
-                                    },
-                                    'styling': {
-                                        'font_size': 14,
-                                        'font_family': 'Arial',
-                                        'color': '#000080',
-                                        'background_color': '#fffacd',
-                                        'border_color': '#cccccc',
-                                        'border_width': 1,
-                                        'text_align': 'left'
-                                    },
-                                    'required': True,
-                                    'assigned_to': 'user2',
-                                    'page': page_num + 1,
-                                    'created_at': datetime.utcnow().isoformat(),
-                                    'metadata': {
-                                        'detected_from': 'text_analysis',
-                                        'trigger_text': text
-                                    }
-                                }
-                                signature_areas.append(signature_area)
+            # Look for signature-related text in the spans extracted by the page analysis
+            for span_text, bbox in analysis.spans:
+                text = span_text.lower()
+                if any(keyword in text for keyword in ["signature", "sign here", "signed"]):
+                    # Create signature field
+                    field_id = self.make_field_id(id_scope, page_num, f"signature_area:{len(signature_areas) + 1}")
+                    signature_area = {
+                        'id': field_id,
+                        'name': f'Signature Area (Page {page_num + 1})',
+                        'pdf_field_name': f'signature_area_{page_num + 1}_{len(signature_areas) + 1}',
+                        'type': 'signature',
+                        'value': '',
+                        'position': {
+                            'x': bbox[0],
+                            'y': bbox[1] + 20,  # Place signature below text
+                            'width': max(200, bbox[2] - bbox[0]),
+                            'height': 30,
+                            'page': page_num + 1,
+                            'page_width': page_width,
+                            'page_height': page_height,
+                            'relative_x': bbox[0] / page_width,
+                            'relative_y': (bbox[1] + 20) / page_height,
+                            'relative_width': max(200, bbox[2] - bbox[0]) / page_width,
+                            'relative_height': 30 / page_height
+                        },
+                        'styling': {
+                            'font_size': 14,
+                            'font_family': 'Arial',
+                            'color': '#000080',
+                            'background_color': '#fffacd',
+                            'border_color': '#cccccc',
+                            'border_width': 1,
+                            'text_align': 'left'
+                        },
+                        'required': True,
+                        'assigned_to': 'user2',
+                        'page': page_num + 1,
+                        'created_at': datetime.utcnow().isoformat(),
+                        'metadata': {
+                            'detected_from': 'text_analysis',
+                            'trigger_text': text
+                        }
+                    }
+                    signature_areas.append(signature_area)
         
         except Exception as e:
             print(f"⚠️  Error detecting signature areas: {e}")
@@ -425,26 +505,12 @@ class RealtimePDFProcessor:
     def generate_pdf_preview(self, pdf_path: str, page_num: int = 1, scale: float = 1.0) -> Optional[str]:
         """Generate base64 encoded preview image of PDF page"""
         try:
-            doc = fitz.open(pdf_path)
+            # Shared with PDFProcessor previews; out-of-range pages have no preview
+            img_data = get_preview_cache().get_or_render_page(pdf_path, page_num - 1, scale, 'png')
+            if img_data is None:
+                return None
             
-            if page_num > len(doc):
-                page_num = 1
-            
-            page = doc[page_num - 1]
-            mat = fitz.Matrix(scale, scale)
-            pix = page.get_pixmap(matrix=mat)
-            
-            # Convert to PIL Image
-            img_data = pix.tobytes("png")
-            img = Image.open(BytesIO(img_data))
-            
-            # Convert to base64
-            buffer = BytesIO()
-            img.save(buffer, format='PNG')
-            img_base64 = base64.b64encode(buffer.getvalue()).decode()
-            
-            doc.close()
-            return img_base64
+            return base64.b64encode(img_data).decode()
             
         except Exception as e:
             print(f"❌ Error generating preview: {e}")
@@ -466,85 +532,80 @@ class RealtimePDFProcessor:
             
             print(f"📋 Processing {len(field_mapping)} field values")
             
-            # Fill form fields
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                widgets = list(page.widgets())
-                
-                for widget in widgets:
-                    field_name = widget.field_name
-                    if field_name and field_name in field_mapping:
+            # Fill form fields - the widget index jumps straight to the pages that have values
+            widget_index = get_widget_index(pdf_path, self.get_widget_type_detailed, 'realtime')
+            for page, widget, widget_type in iter_fill_widgets(doc, field_mapping, widget_index, self.get_widget_type_detailed):
+                field_name = widget.field_name
+                try:
+                    value = field_mapping[field_name]
+                    
+                    if widget_type in ['checkbox', 'radio']:
+                        widget.field_value = value.lower() in ['true', '1', 'yes', 'on']
+                    elif widget_type == 'signature':
+                        # For signature fields, clear form field and add cursive text overlay
+                        widget.field_value = ""  # Clear form field
+                        widget.update()
+                        
+                        # Add cursive signature overlay
+                        rect = widget.rect
+                        signature_x = rect.x0 + 3
+                        signature_y = rect.y0 + rect.height - 3
+                        signature_font_size = max(10, min(rect.height - 2, 14))
+                        
                         try:
-                            value = field_mapping[field_name]
-                            widget_type = self.get_widget_type_detailed(widget)
-                            
-                            if widget_type in ['checkbox', 'radio']:
-                                widget.field_value = value.lower() in ['true', '1', 'yes', 'on']
-                            elif widget_type == 'signature':
-                                # For signature fields, clear form field and add cursive text overlay
-                                widget.field_value = ""  # Clear form field
-                                widget.update()
-                                
-                                # Add cursive signature overlay
-                                rect = widget.rect
-                                signature_x = rect.x0 + 3
-                                signature_y = rect.y0 + rect.height - 3
-                                signature_font_size = max(10, min(rect.height - 2, 14))
-                                
+                            # Try Times Roman Italic (most commonly available cursive-like font)
+                            page.insert_text(
+                                (signature_x, signature_y),
+                                str(value),
+                                fontsize=signature_font_size,
+                                color=(0, 0, 0.8),  # Dark blue for signatures
+                                fontname="tiri"  # Times Roman Italic
+                            )
+                            print(f"✅ Added cursive signature '{value}' for '{field_name}' (Times Italic)")
+                        except Exception as font_error:
+                            # Fallback to Helvetica Italic
+                            try:
+                                page.insert_text(
+                                    (signature_x, signature_y),
+                                    str(value),
+                                    fontsize=signature_font_size,
+                                    color=(0, 0, 0.8),
+                                    fontname="heli"  # Helvetica Italic
+                                )
+                                print(f"✅ Added cursive signature '{value}' for '{field_name}' (Helvetica Italic)")
+                            except Exception as fallback_error:
+                                # Try Courier Italic as final cursive attempt
                                 try:
-                                    # Try Times Roman Italic (most commonly available cursive-like font)
                                     page.insert_text(
                                         (signature_x, signature_y),
                                         str(value),
                                         fontsize=signature_font_size,
-                                        color=(0, 0, 0.8),  # Dark blue for signatures
-                                        fontname="tiri"  # Times Roman Italic
+                                        color=(0, 0, 0.8),
+                                        fontname="coi"  # Courier Italic
                                     )
-                                    print(f"✅ Added cursive signature '{value}' for '{field_name}' (Times Italic)")
-                                except Exception as font_error:
-                                    # Fallback to Helvetica Italic
-                                    try:
-                                        page.insert_text(
-                                            (signature_x, signature_y),
-                                            str(value),
-                                            fontsize=signature_font_size,
-                                            color=(0, 0, 0.8),
-                                            fontname="heli"  # Helvetica Italic
-                                        )
-                                        print(f"✅ Added cursive signature '{value}' for '{field_name}' (Helvetica Italic)")
-                                    except Exception as fallback_error:
-                                        # Try Courier Italic as final cursive attempt
-                                        try:
-                                            page.insert_text(
-                                                (signature_x, signature_y),
-                                                str(value),
-                                                fontsize=signature_font_size,
-                                                color=(0, 0, 0.8),
-                                                fontname="coi"  # Courier Italic
-                                            )
-                                            print(f"✅ Added cursive signature '{value}' for '{field_name}' (Courier Italic)")
-                                        except Exception as final_error:
-                                            # Final fallback to regular font
-                                            page.insert_text(
-                                                (signature_x, signature_y),
-                                                str(value),
-                                                fontsize=signature_font_size,
-                                                color=(0, 0, 0.8)
-                                            )
-                                            print(f"✅ Added signature '{value}' for '{field_name}' (regular font)")
-                            else:
-                                widget.field_value = str(value)
-                            
-                            if widget_type != 'signature':  # Signature already updated above
-                                widget.update()
-                            filled_count += 1
-                            
-                            if widget_type != 'signature':
-                                print(f"✅ Filled {widget_type} field '{field_name}' with '{value}'")
-                            
-                        except Exception as e:
-                            print(f"⚠️  Could not fill field '{field_name}': {e}")
-            
+                                    print(f"✅ Added cursive signature '{value}' for '{field_name}' (Courier Italic)")
+                                except Exception as final_error:
+                                    # Final fallback to regular font
+                                    page.insert_text(
+                                        (signature_x, signature_y),
+                                        str(value),
+                                        fontsize=signature_font_size,
+                                        color=(0, 0, 0.8)
+                                    )
+                                    print(f"✅ Added signature '{value}' for '{field_name}' (regular font)")
+                    else:
+                        widget.field_value = str(value)
+                    
+                    if widget_type != 'signature':  # Signature already updated above
+                        widget.update()
+                    filled_count += 1
+                    
+                    if widget_type != 'signature':
+                        print(f"✅ Filled {widget_type} field '{field_name}' with '{value}'")
+                    
+                except Exception as e:
+                    print(f"⚠️  Could not fill field '{field_name}': {e}")
+    
             # All fields are now filled directly in form fields - no text overlays needed
             print(f"📋 All fields filled directly in PDF form fields (no overlay duplicates)")
             
@@ -0,0 +1,133 @@
+"""
+Cache of completed (filled) PDFs keyed by source file hash and field values
+"""
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import Any, Dict, List, Optional
+
+# Bump when the fill pipeline changes output for the same inputs
+RENDER_CACHE_VERSION = "1"
+
+# Field properties that affect the filled output; everything else (assignments, timestamps) is ignored
+RENDER_FIELD_KEYS = ('id', 'name', 'pdf_field_name', 'type', 'value', 'page', 'position', 'source')
+
+
+def fields_digest(pdf_fields: List[Dict[str, Any]]) -> str:
+    """Digest of the canonicalized field values of a document"""
+    canonical = sorted(
+        ({key: field.get(key) for key in RENDER_FIELD_KEYS} for field in pdf_fields or []),
+        key=lambda field: (str(field['id']), str(field['name']))
+    )
+    payload = json.dumps(canonical, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """On-disk cache of completed PDFs, shared by web and job worker processes"""
+
+    def __init__(self, cache_dir: str = None, max_entries: int = None):
+        self.cache_dir = cache_dir or os.getenv('RENDER_CACHE_DIR', os.path.join('cache', 'rendered'))
+        self.max_entries = max_entries or int(os.getenv('RENDER_CACHE_MAX_ENTRIES', '500'))
+        self.enabled = os.getenv('RENDER_CACHE_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, source_hash: str, pdf_fields: List[Dict[str, Any]]) -> str:
+        """Build the cache key (also used as the download ETag) for a source file and its field values"""
+        return f"{source_hash[:32]}-{fields_digest(pdf_fields)[:32]}-v{RENDER_CACHE_VERSION}"
+
+    def path_for(self, document_id: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{document_id}-{key}.pdf")
+
+    def holds(self, path: str) -> bool:
+        """True if a path is one of this cache's entries (rather than an uncached fallback render)"""
+        return bool(path) and os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.cache_dir)
+
+    def get(self, document_id: str, key: str) -> Optional[str]:
+        """Path of the cached completed PDF, or None on a miss"""
+        if not self.enabled or not key:
+            return None
+
+        path = self.path_for(document_id, key)
+        with self._lock:
+            if os.path.exists(path):
+                self.hits += 1
+                return path
+            self.misses += 1
+        return None
+
+    def put(self, document_id: str, key: str, rendered_path: str) -> str:
+        """Copy a freshly rendered PDF into the cache; returns the path to serve"""
+        if not self.enabled or not key:
+            return rendered_path
+
+        path = self.path_for(document_id, key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            shutil.copyfile(rendered_path, temp_path)
+            # Atomic rename so a concurrent download never sees a half-written file
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"⚠️  Could not cache completed PDF for {document_id}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return rendered_path
+
+        # Older versions of this document can never be requested again
+        self.invalidate_document(document_id, keep=path)
+        self._evict()
+        return path
+
+    def invalidate_document(self, document_id: str, keep: str = None) -> int:
+        """Remove the cached renders of a document (called whenever its field values change)"""
+        removed = 0
+        for path in glob.glob(os.path.join(self.cache_dir, f"{glob.escape(document_id)}-*.pdf")):
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"⚠️  Error removing cached render {path}: {e}")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(glob.glob(os.path.join(self.cache_dir, '*.pdf')))
+            }
+
+    def _evict(self) -> None:
+        paths = glob.glob(os.path.join(self.cache_dir, '*.pdf'))
+        if len(paths) <= self.max_entries:
+            return
+
+        # Least recently written first
+        paths.sort(key=lambda path: os.path.getmtime(path) if os.path.exists(path) else 0)
+        for path in paths[:len(paths) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# Global instance
+render_cache = RenderCache()
+
+def get_render_cache() -> RenderCache:
+    """Get the global render cache instance"""
+    return render_cache
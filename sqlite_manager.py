@@ -0,0 +1,1109 @@
+"""
+Embedded SQLite storage backend with the same interface as SupabaseManager (DATABASE_BACKEND=sqlite)
+"""
+
+import base64
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from audit_writer import AuditWriter
+from blob_store import get_blob_store
+from permission_cache import get_permission_cache
+from render_cache import get_render_cache
+from supabase_client import (
+    DOCUMENT_SUMMARY_COLUMNS, DOCUMENT_VIEWS, FIELD_BATCH_SIZE, build_field_record, clamp_page_size,
+    decode_document_cursor, diff_field_records, encode_document_cursor, format_field_rows
+)
+from user_cache import get_user_cache
+
+# Tables and indexes mirroring supabase_schema.sql (UUIDs and timestamps as TEXT, JSONB as JSON text)
+SQLITE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    email TEXT UNIQUE NOT NULL,
+    password_hash TEXT NOT NULL,
+    name TEXT,
+    role TEXT DEFAULT 'user',
+    is_active INTEGER DEFAULT 1,
+    email_verified INTEGER DEFAULT 0,
+    created_at TEXT,
+    updated_at TEXT,
+    last_login TEXT,
+    login_attempts INTEGER DEFAULT 0,
+    locked_until TEXT
+);
+
+CREATE TABLE IF NOT EXISTS documents (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    created_at TEXT,
+    updated_at TEXT,
+    completed_at TEXT,
+    file_path TEXT,
+    original_filename TEXT,
+    file_size INTEGER,
+    user1_data TEXT DEFAULT '{}',
+    user2_data TEXT DEFAULT '{}',
+    supporting_docs TEXT DEFAULT '[]',
+    owner_id TEXT,
+    created_by TEXT,
+    updated_by TEXT
+);
+
+CREATE TABLE IF NOT EXISTS template_documents (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    file_data TEXT,
+    blob_key TEXT,
+    filename TEXT NOT NULL,
+    file_size INTEGER NOT NULL,
+    content_type TEXT DEFAULT 'application/pdf',
+    is_active INTEGER DEFAULT 1,
+    created_at TEXT,
+    updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS pdf_fields (
+    id TEXT PRIMARY KEY,
+    document_id TEXT NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    field_name TEXT NOT NULL,
+    field_type TEXT NOT NULL DEFAULT 'text',
+    field_value TEXT,
+    assigned_to TEXT NOT NULL,
+    position_x REAL DEFAULT 0,
+    position_y REAL DEFAULT 0,
+    width REAL DEFAULT 0,
+    height REAL DEFAULT 0,
+    page_number INTEGER DEFAULT 0,
+    source TEXT DEFAULT 'extracted',
+    pdf_field_name TEXT,
+    is_required INTEGER DEFAULT 0,
+    created_at TEXT,
+    updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS field_configurations (
+    id TEXT PRIMARY KEY,
+    document_id TEXT NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    field_id TEXT NOT NULL REFERENCES pdf_fields(id) ON DELETE CASCADE,
+    configuration TEXT NOT NULL,
+    created_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS document_templates (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    field_definitions TEXT NOT NULL,
+    created_at TEXT,
+    updated_at TEXT
+);
+
+-- No foreign key on document_id: deletions are logged after the document row is gone
+CREATE TABLE IF NOT EXISTS audit_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    document_id TEXT,
+    user_type TEXT,
+    action TEXT NOT NULL,
+    details TEXT,
+    timestamp TEXT,
+    user_id TEXT,
+    ip_address TEXT
+);
+
+CREATE TABLE IF NOT EXISTS user_documents (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    document_id TEXT NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    can_edit INTEGER DEFAULT 1,
+    can_share INTEGER DEFAULT 0,
+    created_at TEXT,
+    created_by TEXT REFERENCES users(id),
+    UNIQUE(user_id, document_id)
+);
+
+CREATE TABLE IF NOT EXISTS document_invitations (
+    id TEXT PRIMARY KEY,
+    document_id TEXT NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    invited_by TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    invited_email TEXT NOT NULL,
+    invited_user_id TEXT REFERENCES users(id) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    token TEXT UNIQUE NOT NULL,
+    expires_at TEXT NOT NULL,
+    accepted_at TEXT,
+    declined_at TEXT,
+    created_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_documents_status ON documents(status);
+CREATE INDEX IF NOT EXISTS idx_documents_created_at ON documents(created_at);
+CREATE INDEX IF NOT EXISTS idx_documents_created_at_id ON documents(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_template_documents_active ON template_documents(is_active, created_at);
+CREATE INDEX IF NOT EXISTS idx_pdf_fields_document_id ON pdf_fields(document_id, page_number, position_y);
+CREATE INDEX IF NOT EXISTS idx_pdf_fields_assigned_to ON pdf_fields(assigned_to);
+CREATE INDEX IF NOT EXISTS idx_pdf_fields_page ON pdf_fields(page_number);
+CREATE INDEX IF NOT EXISTS idx_field_configurations_field ON field_configurations(document_id, field_id);
+CREATE INDEX IF NOT EXISTS idx_audit_log_document_id ON audit_log(document_id);
+CREATE INDEX IF NOT EXISTS idx_audit_log_timestamp ON audit_log(timestamp);
+CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
+CREATE INDEX IF NOT EXISTS idx_users_is_active ON users(is_active);
+CREATE INDEX IF NOT EXISTS idx_user_documents_user_id ON user_documents(user_id);
+CREATE INDEX IF NOT EXISTS idx_user_documents_document_id ON user_documents(document_id);
+CREATE INDEX IF NOT EXISTS idx_user_documents_role ON user_documents(role);
+CREATE INDEX IF NOT EXISTS idx_document_invitations_document_id ON document_invitations(document_id);
+CREATE INDEX IF NOT EXISTS idx_document_invitations_invited_email ON document_invitations(invited_email);
+'''
+
+# Columns stored as JSON text and returned decoded, like JSONB through PostgREST
+JSON_COLUMNS = {
+    'documents': ('user1_data', 'user2_data', 'supporting_docs'),
+    'field_configurations': ('configuration',),
+    'document_templates': ('field_definitions',),
+}
+
+# Columns stored as 0/1 and returned as bool
+BOOLEAN_COLUMNS = {
+    'pdf_fields': ('is_required',),
+    'template_documents': ('is_active',),
+    'users': ('is_active', 'email_verified'),
+    'user_documents': ('can_edit', 'can_share'),
+}
+
+USER_SUMMARY_COLUMNS = 'id, email, name, role, is_active, created_at, last_login'
+
+
+class SQLiteManager:
+    """SupabaseManager on a local SQLite database, for single-node deployments and load tests"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.getenv('SQLITE_DATABASE_PATH', os.path.join('storage', 'pdfcollab.sqlite3'))
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._local = threading.local()
+        self._columns: Dict[str, set] = {}
+        self._connect().executescript(SQLITE_SCHEMA)
+
+        # Audit records are written in the background unless AUDIT_ASYNC_ENABLED is turned off
+        async_audit = os.getenv('AUDIT_ASYNC_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+        self.audit_writer = AuditWriter(self._insert_audit_records) if async_audit else None
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread (and per process - connections must not cross a fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _table_columns(self, table: str) -> set:
+        columns = self._columns.get(table)
+        if columns is None:
+            columns = {row['name'] for row in self._connect().execute(f'PRAGMA table_info({table})')}
+            self._columns[table] = columns
+        return columns
+
+    def _encode(self, table: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        unknown = set(record) - self._table_columns(table)
+        if unknown:
+            raise ValueError(f"Unknown {table} columns: {sorted(unknown)}")
+
+        encoded = dict(record)
+        for column in JSON_COLUMNS.get(table, ()):
+            if column in encoded and encoded[column] is not None:
+                encoded[column] = json.dumps(encoded[column])
+        for column in BOOLEAN_COLUMNS.get(table, ()):
+            if column in encoded and encoded[column] is not None:
+                encoded[column] = int(bool(encoded[column]))
+        return encoded
+
+    def _decode(self, table: str, row: sqlite3.Row) -> Dict[str, Any]:
+        record = dict(row)
+        for column in JSON_COLUMNS.get(table, ()):
+            if record.get(column) is not None:
+                record[column] = json.loads(record[column])
+        for column in BOOLEAN_COLUMNS.get(table, ()):
+            if record.get(column) is not None:
+                record[column] = bool(record[column])
+        return record
+
+    def _select(self, table: str, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        return [self._decode(table, row) for row in self._connect().execute(sql, params).fetchall()]
+
+    def _insert(self, table: str, record: Dict[str, Any], conn: sqlite3.Connection = None,
+                on_conflict: str = None) -> None:
+        encoded = self._encode(table, record)
+        columns = list(encoded)
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        if on_conflict:
+            # Update in place - INSERT OR REPLACE would delete the row and cascade to its children
+            assignments = ', '.join(f"{column} = excluded.{column}" for column in columns if column != on_conflict)
+            sql += f" ON CONFLICT({on_conflict}) DO UPDATE SET {assignments}"
+        (conn or self._connect()).execute(sql, tuple(encoded[column] for column in columns))
+
+    def _update(self, table: str, updates: Dict[str, Any], where: str, params: tuple,
+                conn: sqlite3.Connection = None) -> int:
+        encoded = self._encode(table, updates)
+        assignments = ', '.join(f"{column} = ?" for column in encoded)
+        cursor = (conn or self._connect()).execute(
+            f"UPDATE {table} SET {assignments} WHERE {where}",
+            tuple(encoded.values()) + tuple(params)
+        )
+        return cursor.rowcount
+
+    def create_document(self, document_id: str, name: str, file_path: str, owner_id: str, metadata: Dict[str, Any] = None) -> str:
+        """Create a new document record"""
+        self.insert_document(document_id, name, file_path, metadata)
+
+        # Create user-document relationship with owner role
+        self.add_user_to_document(document_id, owner_id, 'owner', created_by=owner_id)
+
+        # Log the creation
+        self.log_action(document_id, owner_id, 'document_created',
+                        f"Document '{name}' created")
+
+        return document_id
+
+    def insert_document(self, document_id: str, name: str, file_path: str, metadata: Dict[str, Any] = None) -> str:
+        """Insert just the document row (create_document also adds the owner and logs the creation)"""
+        if metadata is None:
+            metadata = {}
+
+        document_record = {
+            'id': document_id,
+            'name': name,
+            'status': 'pending',
+            'file_path': file_path,
+            'original_filename': os.path.basename(file_path),
+            'user1_data': metadata.get('user1_data', {}),
+            'user2_data': metadata.get('user2_data', {}),
+            'supporting_docs': metadata.get('supporting_docs', []),
+            'created_at': datetime.now().isoformat(),
+            'updated_at': datetime.now().isoformat()
+        }
+
+        self._insert('documents', document_record)
+
+        return document_id
+
+    def get_document(self, document_id: str, include_fields: bool = True) -> Optional[Dict[str, Any]]:
+        """Get a document by ID"""
+        if include_fields:
+            return self.load_document(document_id)
+
+        rows = self._select('documents', 'SELECT * FROM documents WHERE id = ?', (document_id,))
+
+        return rows[0] if rows else None
+
+    def load_document(self, document_id: str, view: str = 'full') -> Optional[Dict[str, Any]]:
+        """Get a document with its fields, projected for a view"""
+        document_columns, field_columns = DOCUMENT_VIEWS[view]
+
+        # One read transaction, so the row and its fields are a consistent snapshot
+        conn = self._connect()
+        conn.execute('BEGIN')
+        try:
+            rows = self._select('documents', f'SELECT {document_columns} FROM documents WHERE id = ?', (document_id,))
+            if not rows:
+                return None
+            document = rows[0]
+
+            fields = self._select('pdf_fields',
+                                  f'SELECT {field_columns} FROM pdf_fields WHERE document_id = ? '
+                                  f'ORDER BY page_number, position_y',
+                                  (document_id,))
+            document['pdf_fields'] = format_field_rows(fields)
+        finally:
+            conn.execute('COMMIT')
+
+        return document
+
+    def get_all_documents(self, include_fields: bool = True) -> List[Dict[str, Any]]:
+        """Get all documents (summary columns only when include_fields is False)"""
+        columns = '*' if include_fields else DOCUMENT_SUMMARY_COLUMNS
+        documents = self._select('documents', f'SELECT {columns} FROM documents ORDER BY created_at DESC')
+
+        if include_fields:
+            fields_by_document = self.get_documents_fields_batch([document['id'] for document in documents])
+            for document in documents:
+                document['pdf_fields'] = fields_by_document.get(document['id'], [])
+
+        return documents
+
+    def get_documents_page(self, limit: int = None, cursor: str = None, user_id: str = None) -> Dict[str, Any]:
+        """Get one page of document summaries, newest first, using keyset pagination on (created_at, id)"""
+        limit = clamp_page_size(limit)
+        columns = ', '.join(f"d.{column.strip()}" for column in DOCUMENT_SUMMARY_COLUMNS.split(','))
+
+        if user_id:
+            # Only documents the user owns or that are shared with them
+            base = 'FROM documents d JOIN user_documents ud ON ud.document_id = d.id WHERE ud.user_id = ?'
+            select = f"SELECT {columns}, ud.role, ud.can_edit, ud.can_share {base}"
+            params = (user_id,)
+        else:
+            base = 'FROM documents d WHERE 1 = 1'
+            select = f"SELECT {columns} {base}"
+            params = ()
+
+        total = self._connect().execute(f"SELECT COUNT(*) {base}", params).fetchone()[0]
+
+        position = decode_document_cursor(cursor)
+        if position:
+            created_at, document_id = position
+            select += ' AND (d.created_at < ? OR (d.created_at = ? AND d.id < ?))'
+            params += (created_at, created_at, document_id)
+
+        # Fetch one extra row to learn whether another page exists without a second query
+        rows = self._connect().execute(
+            f"{select} ORDER BY d.created_at DESC, d.id DESC LIMIT ?", params + (limit + 1,)
+        ).fetchall()
+
+        documents = []
+        for row in rows[:limit]:
+            document = dict(row)
+            if user_id:
+                # Same nested shape as the PostgREST embedded select
+                document['user_documents'] = [{
+                    'role': document.pop('role'),
+                    'can_edit': bool(document.pop('can_edit')),
+                    'can_share': bool(document.pop('can_share'))
+                }]
+            documents.append(document)
+        has_more = len(rows) > limit
+
+        return {
+            'documents': documents,
+            'next_cursor': encode_document_cursor(documents[-1]) if has_more and documents else None,
+            'total_estimate': total,
+            'limit': limit
+        }
+
+    def update_document(self, document_id: str, updates: Dict[str, Any]) -> bool:
+        """Update a document"""
+        updates['updated_at'] = datetime.now().isoformat()
+
+        updated = self._update('documents', updates, 'id = ?', (document_id,))
+
+        # Log the update
+        self.log_action(document_id, 'system', 'document_updated',
+                        f"Document updated: {list(updates.keys())}")
+
+        return updated > 0
+
+    def save_pdf_fields(self, document_id: str, fields: List[Dict[str, Any]], pages: List[int] = None) -> Dict[str, int]:
+        """Save PDF fields for a document, writing only rows that were added, changed or removed"""
+        records = [build_field_record(document_id, field) for field in fields]
+
+        # Diff and write in one transaction, so concurrent saves of the same document serialize
+        with self._transaction() as conn:
+            existing_by_id = {
+                row['id']: self._decode('pdf_fields', row)
+                for row in conn.execute('SELECT * FROM pdf_fields WHERE document_id = ?', (document_id,))
+            }
+
+            # Incoming ids that aren't this document's must not be written over another document's rows
+            unknown_ids = list({record['id'] for record in records if record['id'] not in existing_by_id})
+            taken_ids = set()
+            for start in range(0, len(unknown_ids), FIELD_BATCH_SIZE):
+                chunk = unknown_ids[start:start + FIELD_BATCH_SIZE]
+                taken_ids.update(row['id'] for row in conn.execute(
+                    f"SELECT id FROM pdf_fields WHERE id IN ({', '.join('?' for _ in chunk)})", tuple(chunk)
+                ))
+
+            inserts, updates, removed_ids, counts = diff_field_records(document_id, records, existing_by_id,
+                                                                       taken_ids, pages)
+
+            for field_record in inserts:
+                self._insert('pdf_fields', field_record, conn=conn)
+
+            for field_record in updates:
+                self._update('pdf_fields', {column: value for column, value in field_record.items() if column != 'id'},
+                             'id = ? AND document_id = ?', (field_record['id'], document_id), conn=conn)
+
+            for start in range(0, len(removed_ids), FIELD_BATCH_SIZE):
+                chunk = removed_ids[start:start + FIELD_BATCH_SIZE]
+                conn.execute(
+                    f"DELETE FROM pdf_fields WHERE document_id = ? AND id IN ({', '.join('?' for _ in chunk)})",
+                    (document_id,) + tuple(chunk)
+                )
+
+        if counts['added'] or counts['updated'] or counts['removed']:
+            get_render_cache().invalidate_document(document_id)
+
+            # Log the field save
+            self.log_action(document_id, 'system', 'fields_saved',
+                            f"Saved PDF fields: {counts['added']} added, {counts['updated']} updated, "
+                            f"{counts['removed']} removed")
+
+        return counts
+
+    def get_document_fields(self, document_id: str, page_number: int = None) -> List[Dict[str, Any]]:
+        """Get PDF fields for a document (or for one of its pages)"""
+        sql = 'SELECT * FROM pdf_fields WHERE document_id = ?'
+        params = (document_id,)
+        if page_number is not None:
+            sql += ' AND page_number = ?'
+            params += (page_number,)
+
+        rows = self._select('pdf_fields', f"{sql} ORDER BY page_number, position_y", params)
+        return format_field_rows(rows)
+
+    def get_documents_fields_batch(self, document_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get PDF fields for many documents at once, grouped by document id"""
+        fields_by_document: Dict[str, List[Dict[str, Any]]] = {document_id: [] for document_id in document_ids}
+        unique_ids = list(fields_by_document.keys())
+
+        for start in range(0, len(unique_ids), FIELD_BATCH_SIZE):
+            chunk = unique_ids[start:start + FIELD_BATCH_SIZE]
+            rows = self._select(
+                'pdf_fields',
+                f"SELECT * FROM pdf_fields WHERE document_id IN ({', '.join('?' for _ in chunk)}) "
+                f"ORDER BY document_id, page_number, position_y",
+                tuple(chunk)
+            )
+            for field in format_field_rows(rows):
+                fields_by_document[field['document_id']].append(field)
+
+        return fields_by_document
+
+    def update_fields_batch(self, document_id: str, updates: Dict[str, Dict[str, Any]]) -> int:
+        """Apply column updates to many fields of a document ({field_id: {column: value}}) in one transaction"""
+        now = datetime.now().isoformat()
+        updated = 0
+
+        with self._transaction() as conn:
+            for field_id, field_updates in updates.items():
+                updated += self._update('pdf_fields', dict(field_updates, updated_at=now),
+                                        'id = ? AND document_id = ?', (field_id, document_id), conn=conn)
+
+        if updated:
+            get_render_cache().invalidate_document(document_id)
+
+            self.log_action(document_id, 'system', 'fields_updated',
+                            f"Applied collaborative edits to {updated} fields")
+
+        return updated
+
+    def _field_document_id(self, field_id: str) -> Optional[str]:
+        row = self._connect().execute('SELECT document_id FROM pdf_fields WHERE id = ?', (field_id,)).fetchone()
+        return row['document_id'] if row else None
+
+    def update_field_value(self, field_id: str, value: str, user_type: str = 'user') -> bool:
+        """Update a field value"""
+        updated = self._update('pdf_fields', {
+            'field_value': value,
+            'updated_at': datetime.now().isoformat()
+        }, 'id = ?', (field_id,))
+
+        if updated:
+            document_id = self._field_document_id(field_id)
+            if document_id:
+                get_render_cache().invalidate_document(document_id)
+                self.log_action(document_id, user_type, 'field_updated',
+                                f"Field {field_id} updated to '{value}'")
+
+        return updated > 0
+
+    def update_field_assignment(self, field_id: str, assigned_to: str) -> bool:
+        """Update field assignment"""
+        updated = self._update('pdf_fields', {
+            'assigned_to': assigned_to,
+            'updated_at': datetime.now().isoformat()
+        }, 'id = ?', (field_id,))
+
+        if updated:
+            document_id = self._field_document_id(field_id)
+            if document_id:
+                self.log_action(document_id, 'system', 'field_reassigned',
+                                f"Field {field_id} assigned to {assigned_to}")
+
+        return updated > 0
+
+    def update_field_position(self, field_id: str, position: Dict[str, float]) -> bool:
+        """Update field position"""
+        updated = self._update('pdf_fields', {
+            'position_x': position.get('x', 0),
+            'position_y': position.get('y', 0),
+            'width': position.get('width', 0),
+            'height': position.get('height', 0),
+            'updated_at': datetime.now().isoformat()
+        }, 'id = ?', (field_id,))
+
+        return updated > 0
+
+    def save_field_configuration(self, document_id: str, field_id: str, configuration: Dict[str, Any]) -> bool:
+        """Save field configuration"""
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM field_configurations WHERE document_id = ? AND field_id = ?',
+                         (document_id, field_id))
+            self._insert('field_configurations', {
+                'id': str(uuid.uuid4()),
+                'document_id': document_id,
+                'field_id': field_id,
+                'configuration': configuration,
+                'created_at': datetime.now().isoformat()
+            }, conn=conn)
+
+        return True
+
+    def get_field_configuration(self, document_id: str, field_id: str) -> Optional[Dict[str, Any]]:
+        """Get field configuration"""
+        rows = self._select('field_configurations',
+                            'SELECT configuration FROM field_configurations WHERE document_id = ? AND field_id = ?',
+                            (document_id, field_id))
+
+        if rows:
+            return rows[0]['configuration']
+        return None
+
+    def log_action(self, document_id: str, user_type: str, action: str, details: str = None):
+        """Log an action in the audit log"""
+        log_record = {
+            'document_id': document_id,
+            'user_type': user_type,
+            'action': action,
+            'details': details,
+            'timestamp': datetime.now().isoformat()
+        }
+
+        if self.audit_writer:
+            self.audit_writer.enqueue(log_record)
+        else:
+            self._insert_audit_records([log_record])
+
+    def _insert_audit_records(self, log_records: List[Dict[str, Any]]):
+        """Bulk insert audit log records"""
+        with self._transaction() as conn:
+            for log_record in log_records:
+                self._insert('audit_log', log_record, conn=conn)
+
+    def get_audit_log(self, document_id: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get audit log entries"""
+        # Make sure records still buffered in this process show up
+        if self.audit_writer:
+            self.audit_writer.flush()
+
+        sql = 'SELECT * FROM audit_log'
+        params = ()
+        if document_id:
+            sql += ' WHERE document_id = ?'
+            params = (document_id,)
+
+        return self._select('audit_log', f"{sql} ORDER BY timestamp DESC LIMIT ?", params + (limit,))
+
+    def delete_document(self, document_id: str) -> bool:
+        """Delete a document and all related data"""
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM field_configurations WHERE document_id = ?', (document_id,))
+            conn.execute('DELETE FROM pdf_fields WHERE document_id = ?', (document_id,))
+            deleted = conn.execute('DELETE FROM documents WHERE id = ?', (document_id,)).rowcount
+        get_permission_cache().invalidate_document(document_id)
+        get_render_cache().invalidate_document(document_id)
+
+        # Log the deletion
+        self.log_action(document_id, 'system', 'document_deleted',
+                        f"Document {document_id} deleted")
+
+        return deleted > 0
+
+    def create_document_template(self, name: str, description: str, field_definitions: List[Dict[str, Any]]) -> str:
+        """Create a document template"""
+        template_id = str(uuid.uuid4())
+
+        self._insert('document_templates', {
+            'id': template_id,
+            'name': name,
+            'description': description,
+            'field_definitions': field_definitions,
+            'created_at': datetime.now().isoformat(),
+            'updated_at': datetime.now().isoformat()
+        })
+
+        return template_id
+
+    def get_document_templates(self) -> List[Dict[str, Any]]:
+        """Get all document templates"""
+        return self._select('document_templates', 'SELECT * FROM document_templates ORDER BY created_at DESC')
+
+    def get_document_template(self, template_id: str) -> Optional[Dict[str, Any]]:
+        """Get a document template by ID"""
+        rows = self._select('document_templates', 'SELECT * FROM document_templates WHERE id = ?', (template_id,))
+        return rows[0] if rows else None
+
+    # User Authentication Methods
+    def create_user(self, email: str, password_hash: str, name: str = None, role: str = 'user') -> Optional[str]:
+        """Create a new user account"""
+        try:
+            user_id = str(uuid.uuid4())
+            self._insert('users', {
+                'id': user_id,
+                'email': email.lower().strip(),
+                'password_hash': password_hash,
+                'name': name,
+                'role': role,
+                'is_active': True,
+                'email_verified': False,
+                'created_at': datetime.now().isoformat(),
+                'updated_at': datetime.now().isoformat()
+            })
+
+            self.log_action(None, 'system', 'user_created', f"User '{email}' created with role '{role}'")
+            return user_id
+
+        except Exception as e:
+            print(f"Error creating user: {e}")
+            return None
+
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Get user by email address"""
+        try:
+            rows = self._select('users', 'SELECT * FROM users WHERE email = ?', (email.lower().strip(),))
+            return rows[0] if rows else None
+
+        except Exception as e:
+            print(f"Error getting user by email: {e}")
+            return None
+
+    def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get user by ID"""
+        try:
+            rows = self._select('users', 'SELECT * FROM users WHERE id = ?', (user_id,))
+            return rows[0] if rows else None
+
+        except Exception as e:
+            print(f"Error getting user by ID: {e}")
+            return None
+
+    def update_user_login(self, user_id: str, ip_address: str = None) -> bool:
+        """Update user's last login time and reset login attempts"""
+        try:
+            updated = self._update('users', {
+                'last_login': datetime.now().isoformat(),
+                'login_attempts': 0,
+                'locked_until': None,
+                'updated_at': datetime.now().isoformat()
+            }, 'id = ?', (user_id,))
+            get_user_cache().invalidate(user_id)
+
+            # Log the login
+            self.log_action(None, user_id, 'user_login', f"User logged in from {ip_address or 'unknown IP'}")
+
+            return updated > 0
+
+        except Exception as e:
+            print(f"Error updating user login: {e}")
+            return False
+
+    def increment_login_attempts(self, user_id: str) -> bool:
+        """Increment failed login attempts and lock account if necessary"""
+        try:
+            user = self.get_user_by_id(user_id)
+            if not user:
+                return False
+
+            attempts = (user.get('login_attempts') or 0) + 1
+            update_data = {
+                'login_attempts': attempts,
+                'updated_at': datetime.now().isoformat()
+            }
+
+            # Lock account after 5 failed attempts for 15 minutes
+            if attempts >= 5:
+                from datetime import timedelta
+                locked_until = datetime.now() + timedelta(minutes=15)
+                update_data['locked_until'] = locked_until.isoformat()
+                self.log_action(None, user_id, 'user_locked', f"User account locked after {attempts} failed attempts")
+
+            updated = self._update('users', update_data, 'id = ?', (user_id,))
+            get_user_cache().invalidate(user_id)
+            return updated > 0
+
+        except Exception as e:
+            print(f"Error incrementing login attempts: {e}")
+            return False
+
+    def is_user_locked(self, user_id: str) -> bool:
+        """Check if user account is currently locked"""
+        try:
+            user = self.get_user_by_id(user_id)
+            if not user or not user.get('locked_until'):
+                return False
+
+            from dateutil.parser import parse
+            locked_until = parse(user['locked_until'])
+            return datetime.now() < locked_until.replace(tzinfo=None)
+
+        except Exception as e:
+            print(f"Error checking user lock status: {e}")
+            return False
+
+    def update_user_profile(self, user_id: str, profile_data: Dict[str, Any]) -> bool:
+        """Update user profile information"""
+        try:
+            # Only allow updating certain fields
+            allowed_fields = ['name', 'email']
+            update_data = {key: value for key, value in profile_data.items() if key in allowed_fields}
+            update_data['updated_at'] = datetime.now().isoformat()
+
+            # If email is being updated, mark as unverified
+            if 'email' in update_data:
+                update_data['email'] = update_data['email'].lower().strip()
+                update_data['email_verified'] = False
+
+            if self._update('users', update_data, 'id = ?', (user_id,)) > 0:
+                get_user_cache().invalidate(user_id)
+                self.log_action(None, user_id, 'profile_updated', "User profile updated")
+                return True
+            return False
+
+        except Exception as e:
+            print(f"Error updating user profile: {e}")
+            return False
+
+    def update_user_password(self, user_id: str, new_password_hash: str) -> bool:
+        """Update user's password hash"""
+        try:
+            updated = self._update('users', {
+                'password_hash': new_password_hash,
+                'updated_at': datetime.now().isoformat()
+            }, 'id = ?', (user_id,))
+
+            if updated > 0:
+                get_user_cache().invalidate(user_id)
+                self.log_action(None, user_id, 'password_changed', "User password changed")
+                return True
+            return False
+
+        except Exception as e:
+            print(f"Error updating user password: {e}")
+            return False
+
+    def get_all_users(self, admin_user_id: str) -> List[Dict[str, Any]]:
+        """Get all users (admin only)"""
+        try:
+            # Verify admin access
+            admin = self.get_user_by_id(admin_user_id)
+            if not admin or admin.get('role') != 'admin':
+                return []
+
+            return self._select('users', f'SELECT {USER_SUMMARY_COLUMNS} FROM users ORDER BY created_at DESC')
+
+        except Exception as e:
+            print(f"Error getting all users: {e}")
+            return []
+
+    def deactivate_user(self, admin_user_id: str, target_user_id: str) -> bool:
+        """Deactivate a user account (admin only)"""
+        try:
+            # Verify admin access
+            admin = self.get_user_by_id(admin_user_id)
+            if not admin or admin.get('role') != 'admin':
+                return False
+
+            updated = self._update('users', {
+                'is_active': False,
+                'updated_at': datetime.now().isoformat()
+            }, 'id = ?', (target_user_id,))
+
+            if updated > 0:
+                get_permission_cache().invalidate_user(target_user_id)
+                get_user_cache().invalidate(target_user_id)
+                self.log_action(None, admin_user_id, 'user_deactivated', f"Admin deactivated user {target_user_id}")
+                return True
+            return False
+
+        except Exception as e:
+            print(f"Error deactivating user: {e}")
+            return False
+
+    def get_user_documents(self, user_id: str) -> List[Dict[str, Any]]:
+        """Get all documents accessible to a user"""
+        try:
+            rows = self._connect().execute(
+                'SELECT d.*, ud.role AS ud_role, ud.can_edit AS ud_can_edit, ud.can_share AS ud_can_share '
+                'FROM documents d JOIN user_documents ud ON ud.document_id = d.id WHERE ud.user_id = ?',
+                (user_id,)
+            ).fetchall()
+
+            documents = []
+            for row in rows:
+                document = self._decode('documents', row)
+                document['user_documents'] = [{
+                    'role': document.pop('ud_role'),
+                    'can_edit': bool(document.pop('ud_can_edit')),
+                    'can_share': bool(document.pop('ud_can_share'))
+                }]
+                documents.append(document)
+            return documents
+
+        except Exception as e:
+            print(f"Error getting user documents: {e}")
+            return []
+
+    def get_document_permission(self, document_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get a user's role and permissions on one document, or None if they have no access
+
+        Database errors propagate: returning None would be cached as "no access" by the permission cache.
+        """
+        rows = self._select('user_documents',
+                            'SELECT role, can_edit, can_share FROM user_documents '
+                            'WHERE document_id = ? AND user_id = ? LIMIT 1',
+                            (document_id, user_id))
+        return rows[0] if rows else None
+
+    def add_user_to_document(self, document_id: str, user_id: str, role: str, can_edit: bool = True, can_share: bool = False, created_by: str = None) -> bool:
+        """Add a user to a document with specific role and permissions"""
+        try:
+            self._insert('user_documents', {
+                'id': str(uuid.uuid4()),
+                'user_id': user_id,
+                'document_id': document_id,
+                'role': role,
+                'can_edit': can_edit,
+                'can_share': can_share,
+                'created_by': created_by,
+                'created_at': datetime.now().isoformat()
+            })
+
+            get_permission_cache().invalidate_user(user_id)
+            self.log_action(document_id, created_by or 'system', 'user_added_to_document',
+                            f"User {user_id} added to document with role {role}")
+            return True
+
+        except Exception as e:
+            print(f"Error adding user to document: {e}")
+            return False
+
+    def create_document_invitation(self, document_id: str, invited_by: str, invited_email: str, role: str, expires_hours: int = 168) -> Optional[str]:
+        """Create an invitation for someone to access a document"""
+        try:
+            import secrets
+            from datetime import timedelta
+
+            # Generate secure token
+            token = secrets.token_urlsafe(32)
+            expires_at = datetime.now() + timedelta(hours=expires_hours)
+
+            # Check if user with this email exists
+            existing_user = self.get_user_by_email(invited_email)
+
+            self._insert('document_invitations', {
+                'id': str(uuid.uuid4()),
+                'document_id': document_id,
+                'invited_by': invited_by,
+                'invited_email': invited_email.lower().strip(),
+                'invited_user_id': existing_user['id'] if existing_user else None,
+                'role': role,
+                'token': token,
+                'expires_at': expires_at.isoformat(),
+                'created_at': datetime.now().isoformat()
+            })
+
+            self.log_action(document_id, invited_by, 'invitation_created',
+                            f"Invitation sent to {invited_email} for role {role}")
+            return token
+
+        except Exception as e:
+            print(f"Error creating document invitation: {e}")
+            return None
+
+    def get_invitation_by_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """Get invitation details by token"""
+        try:
+            row = self._connect().execute(
+                'SELECT i.*, d.name AS document_name, d.status AS document_status, '
+                'u.name AS inviter_name, u.email AS inviter_email '
+                'FROM document_invitations i '
+                'LEFT JOIN documents d ON d.id = i.document_id '
+                'LEFT JOIN users u ON u.id = i.invited_by '
+                'WHERE i.token = ?',
+                (token,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            invitation = dict(row)
+            # Same nested shape as the PostgREST embedded select
+            invitation['documents'] = {'name': invitation.pop('document_name'),
+                                       'status': invitation.pop('document_status')}
+            invitation['users'] = {'name': invitation.pop('inviter_name'),
+                                   'email': invitation.pop('inviter_email')}
+
+            # Check if invitation is expired
+            from dateutil.parser import parse
+            expires_at = parse(invitation['expires_at'])
+            if datetime.now() > expires_at.replace(tzinfo=None):
+                return None
+            return invitation
+
+        except Exception as e:
+            print(f"Error getting invitation by token: {e}")
+            return None
+
+    def accept_invitation(self, token: str, user_id: str) -> bool:
+        """Accept a document invitation"""
+        try:
+            invitation = self.get_invitation_by_token(token)
+            if not invitation or invitation.get('accepted_at'):
+                return False
+
+            # Add user to document
+            success = self.add_user_to_document(
+                invitation['document_id'],
+                user_id,
+                invitation['role'],
+                can_edit=True,
+                can_share=False,
+                created_by=invitation['invited_by']
+            )
+
+            if success:
+                # Mark invitation as accepted
+                self._update('document_invitations', {
+                    'accepted_at': datetime.now().isoformat(),
+                    'invited_user_id': user_id
+                }, 'token = ?', (token,))
+                get_permission_cache().invalidate_user(user_id)
+
+                self.log_action(invitation['document_id'], user_id, 'invitation_accepted',
+                                f"User accepted invitation for role {invitation['role']}")
+                return True
+            return False
+
+        except Exception as e:
+            print(f"Error accepting invitation: {e}")
+            return False
+
+    # Template Document Methods
+    def upload_template_document(self, name: str, description: str, file_path: str) -> Optional[str]:
+        """Upload a PDF template document to the database"""
+        try:
+            # The PDF goes to the blob store; the row only references it by content hash
+            blob_key = get_blob_store().put_file(file_path)
+            filename = os.path.basename(file_path)
+            template_id = str(uuid.uuid4())
+
+            self._insert('template_documents', {
+                'id': template_id,
+                'name': name,
+                'description': description,
+                'blob_key': blob_key,
+                'filename': filename,
+                'file_size': os.path.getsize(file_path),
+                'content_type': 'application/pdf',
+                'is_active': True,
+                'created_at': datetime.now().isoformat(),
+                'updated_at': datetime.now().isoformat()
+            })
+            print(f"✅ Template document uploaded: {name} (ID: {template_id})")
+
+            # Compile once now so documents created from it skip copying and extraction
+            try:
+                from template_compiler import get_template_compiler
+                get_template_compiler().compile(file_path, filename, template_id)
+            except Exception as e:
+                print(f"⚠️  Template {template_id} will be compiled on first use: {e}")
+            return template_id
+
+        except Exception as e:
+            print(f"Error uploading template document: {e}")
+            return None
+
+    def get_template_document(self, template_id: str) -> Optional[Dict[str, Any]]:
+        """Get a template document by ID"""
+        try:
+            rows = self._select('template_documents',
+                                'SELECT * FROM template_documents WHERE id = ? AND is_active = 1', (template_id,))
+            return rows[0] if rows else None
+
+        except Exception as e:
+            print(f"Error getting template document: {e}")
+            return None
+
+    def get_active_templates(self) -> List[Dict[str, Any]]:
+        """Get all active template documents"""
+        try:
+            return self._select('template_documents',
+                                'SELECT id, name, description, filename, file_size, blob_key, created_at '
+                                'FROM template_documents WHERE is_active = 1 ORDER BY created_at DESC')
+
+        except Exception as e:
+            print(f"Error getting template documents: {e}")
+            return []
+
+    def get_template_file_data(self, template_id: str) -> Optional[bytes]:
+        """Get the binary file data for a template document (prefer get_template_file_path for large files)"""
+        file_path = self.get_template_file_path(template_id)
+        if not file_path:
+            return None
+
+        with open(file_path, 'rb') as f:
+            return f.read()
+
+    def get_template_file_path(self, template_id: str) -> Optional[str]:
+        """Local path of a template's PDF, streamed into the blob cache on first use"""
+        try:
+            row = self._connect().execute(
+                'SELECT blob_key FROM template_documents WHERE id = ? AND is_active = 1', (template_id,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            blob_key = row['blob_key']
+            file_path = get_blob_store().local_path(blob_key) if blob_key else None
+            if file_path is None:
+                # Legacy row, or a blob on another node's local store: fall back to the bytes kept in file_data
+                blob_key = self._migrate_template_file_data(template_id)
+                file_path = get_blob_store().local_path(blob_key) if blob_key else None
+            return file_path
+
+        except Exception as e:
+            print(f"Error getting template file: {e}")
+            return None
+
+    def _migrate_template_file_data(self, template_id: str) -> Optional[str]:
+        """Copy a template's base64 file_data into the blob store, clearing the column once the blob is shared"""
+        row = self._connect().execute(
+            'SELECT file_data FROM template_documents WHERE id = ?', (template_id,)
+        ).fetchone()
+        if row is None or not row['file_data']:
+            return None
+
+        blob_store = get_blob_store()
+        blob_key = blob_store.put_bytes(base64.b64decode(row['file_data']))
+        updates = {'blob_key': blob_key, 'updated_at': datetime.now().isoformat()}
+        # A local blob store is one node's disk: other nodes (and the next deploy) still need the column
+        if not blob_store.backend.is_local:
+            updates['file_data'] = None
+        self._update('template_documents', updates, 'id = ?', (template_id,))
+
+        print(f"📦 Copied template {template_id} file data to blob {blob_key[:12]}")
+        return blob_key
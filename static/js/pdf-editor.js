@@ -209,6 +209,65 @@ class PDFEditor {
     }
     
     async loadPDFPreview() {
+        try {
+            // Progressive rendering: small preview first, then full-resolution tiles
+            const response = await fetch(`/api/document-page-tiles/${this.options.documentId}/1`);
+            const layout = await response.json();
+            
+            if (response.ok && layout.tile_url_template) {
+                this.renderTiledPage(layout);
+                return;
+            }
+        } catch (error) {
+            console.error('Error loading tile manifest:', error);
+        }
+        
+        await this.loadSinglePreview();
+    }
+    
+    renderTiledPage(layout) {
+        const viewer = document.getElementById('pdf-viewer');
+        viewer.innerHTML = `
+            <div class="pdf-tiled-page" style="width: ${layout.width}px; height: ${layout.height}px;">
+                <img src="${layout.preview_url}" alt="PDF Preview" class="pdf-tile-preview">
+            </div>
+        `;
+        
+        // Page size is known up front, so fields can be placed before any pixels arrive
+        this.setupOverlay(layout.width, layout.height);
+        
+        const page = viewer.querySelector('.pdf-tiled-page');
+        const preview = page.querySelector('.pdf-tile-preview');
+        const addTiles = () => {
+            for (let row = 0; row < layout.rows; row++) {
+                for (let column = 0; column < layout.columns; column++) {
+                    const tile = document.createElement('img');
+                    tile.className = 'pdf-tile';
+                    tile.alt = '';
+                    // Off-screen tiles are only fetched once they scroll into view
+                    tile.loading = 'lazy';
+                    tile.style.left = `${column * layout.tile_size}px`;
+                    tile.style.top = `${row * layout.tile_size}px`;
+                    tile.style.width = `${Math.min(layout.tile_size, layout.width - column * layout.tile_size)}px`;
+                    tile.style.height = `${Math.min(layout.tile_size, layout.height - row * layout.tile_size)}px`;
+                    tile.onload = () => tile.classList.add('loaded');
+                    tile.src = layout.tile_url_template
+                        .replace('{column}', column)
+                        .replace('{row}', row);
+                    page.appendChild(tile);
+                }
+            }
+        };
+        
+        if (preview.complete) {
+            addTiles();
+        } else {
+            preview.onload = addTiles;
+            preview.onerror = addTiles;
+        }
+    }
+    
+    async loadSinglePreview() {
         try {
             const response = await fetch(`/api/pdf-preview/${this.options.documentId}`);
             const data = await response.json();
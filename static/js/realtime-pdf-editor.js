@@ -15,6 +15,7 @@ class RealtimePDFEditor {
         this.zoomLevel = 1.0;
         this.pdfDocument = null;
         this.fields = new Map();
+        this.loadedFieldPages = new Set();
         this.selectedField = null;
         this.isConnected = false;
         this.sessionId = this.generateSessionId();
@@ -162,13 +163,14 @@ class RealtimePDFEditor {
             
             this.elements.documentName.textContent = document.name;
             
+            // Fields are detected per page on the server, so start fresh and load them as pages are shown
+            this.fields.clear();
+            this.loadedFieldPages.clear();
+            
             // Load PDF from preview endpoint
             const pdfUrl = `${this.apiBaseUrl}/documents/${this.documentId}/preview`;
             await this.loadPDF(pdfUrl);
             
-            // Load fields
-            await this.loadFields();
-            
         } catch (error) {
             console.error('Error loading document:', error);
             this.showError('Failed to load document');
@@ -232,22 +234,34 @@ class RealtimePDFEditor {
             
             await page.render(renderContext).promise;
             
-            // Update field overlay
-            this.updateFieldOverlay();
+            // Fetch this page's fields on first view (also refreshes the overlay)
+            await this.loadFields(pageNumber);
             
         } catch (error) {
             console.error('Error rendering page:', error);
         }
     }
     
-    async loadFields() {
+    async loadFields(pageNumber = this.currentPage) {
+        if (this.loadedFieldPages.has(pageNumber)) {
+            this.updateFieldOverlay();
+            return;
+        }
+        
         try {
-            const response = await fetch(`${this.apiBaseUrl}/documents/${this.documentId}/fields`);
+            const response = await fetch(`${this.apiBaseUrl}/documents/${this.documentId}/fields?page=${pageNumber}`);
             const fields = await response.json();
             
-            this.fields.clear();
+            if (!response.ok) {
+                throw new Error(fields.error || 'Failed to load fields');
+            }
+            
+            this.loadedFieldPages.add(pageNumber);
             fields.forEach(field => {
-                this.fields.set(field.id, field);
+                // Keep local edits to fields that were already loaded
+                if (!this.fields.has(field.id)) {
+                    this.fields.set(field.id, field);
+                }
             });
             
             this.updateFieldsList();
@@ -667,17 +681,19 @@ class RealtimePDFEditor {
             return;
         }
         
-        const formData = new FormData();
-        formData.append('pdf', file);
-        
         // Show progress
         this.elements.uploadProgress.style.display = 'block';
         this.elements.progressText.textContent = 'Uploading...';
         
         try {
+            // Send the raw file so the server can stream it straight to disk
             const response = await fetch(`${this.apiBaseUrl}/documents/upload`, {
                 method: 'POST',
-                body: formData
+                headers: {
+                    'Content-Type': 'application/pdf',
+                    'X-Filename': encodeURIComponent(file.name)
+                },
+                body: file
             });
             
             const result = await response.json();
@@ -709,7 +725,9 @@ class RealtimePDFEditor {
                     'Content-Type': 'application/json'
                 },
                 body: JSON.stringify({
-                    fields: fieldsData
+                    fields: fieldsData,
+                    // Only these pages were loaded, so only they are replaced on the server
+                    pages: Array.from(this.loadedFieldPages)
                 })
             });
             
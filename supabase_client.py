@@ -6,9 +6,166 @@ import uuid
 from supabase import create_client, Client
 from dotenv import load_dotenv
 import base64
+import importlib
+
+from audit_writer import AuditWriter
+from blob_store import get_blob_store
+from permission_cache import get_permission_cache
+from render_cache import get_render_cache
+from supabase_transport import get_supabase_transport
+from user_cache import get_user_cache
 
 load_dotenv()
 
+# Columns the document list views need; everything else (user data, supporting docs) stays on the server
+DOCUMENT_SUMMARY_COLUMNS = 'id, name, status, original_filename, created_at, updated_at'
+
+# Document ids per pdf_fields `in_()` query - 36-char UUIDs keep the request URL well under proxy limits
+FIELD_BATCH_SIZE = int(os.getenv('SUPABASE_FIELD_BATCH_SIZE', '100'))
+
+# Rows per pdf_fields response page; must not exceed PostgREST's max-rows (1000 by default), which
+# truncates larger responses without an error
+FIELD_PAGE_SIZE = int(os.getenv('SUPABASE_FIELD_PAGE_SIZE', '1000'))
+
+# Dashboard page sizes
+DEFAULT_PAGE_SIZE = int(os.getenv('DASHBOARD_PAGE_SIZE', '25'))
+MAX_PAGE_SIZE = int(os.getenv('DASHBOARD_MAX_PAGE_SIZE', '100'))
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    """Keep a requested page size within 1..MAX_PAGE_SIZE"""
+    if not limit:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+def encode_document_cursor(document: Dict[str, Any]) -> str:
+    """Opaque keyset cursor pointing just after a document in (created_at, id) descending order"""
+    raw = f"{document.get('created_at') or ''}|{document['id']}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_document_cursor(cursor: Optional[str]) -> Optional[tuple]:
+    """Decode a cursor into (created_at, id), or None if it is missing or malformed"""
+    if not cursor:
+        return None
+    try:
+        created_at, document_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|', 1)
+        return created_at, document_id
+    except Exception:
+        return None
+
+def format_field_rows(fields: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convert a list of pdf_fields rows in one pass (columns left out of a projection come back as None)"""
+    for field in fields:
+        get = field.get
+        field['position'] = {'x': get('position_x'), 'y': get('position_y'),
+                             'width': get('width'), 'height': get('height')}
+        field['name'] = get('field_name')
+        field['type'] = get('field_type')
+        field['value'] = get('field_value')
+        field['page'] = get('page_number')
+    return fields
+
+# Column projections for load_document, per call site: (documents columns, pdf_fields columns).
+# The dashboard lists documents through get_documents_page, which selects summary columns only.
+DOCUMENT_VIEWS = {
+    # Completed-PDF rendering (fill pipeline, render cache key and job dedupe)
+    'download': (
+        'id, name, status, file_path, original_filename, user1_data, user2_data, completed_at, updated_at',
+        'id, field_name, field_type, field_value, assigned_to, position_x, position_y, width, height, '
+        'page_number, source, pdf_field_name'
+    ),
+    # Editors and everything else get the full rows
+    'full': ('*', '*'),
+}
+
+# pdf_fields columns compared when deciding whether a saved field actually changed
+FIELD_COMPARE_COLUMNS = (
+    'field_name', 'field_type', 'field_value', 'assigned_to', 'position_x', 'position_y',
+    'width', 'height', 'page_number', 'source', 'pdf_field_name', 'is_required'
+)
+
+def build_field_record(document_id: str, field: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert an API/editor field into a pdf_fields row (without timestamps)"""
+    position = field.get('position', {})
+    
+    return {
+        'id': field.get('id') or str(uuid.uuid4()),
+        'document_id': document_id,
+        'field_name': field.get('name', ''),
+        'field_type': field.get('type', 'text'),
+        'field_value': field.get('value', ''),
+        'assigned_to': field.get('assigned_to', 'user1'),
+        'position_x': position.get('x', 0),
+        'position_y': position.get('y', 0),
+        'width': position.get('width', 0),
+        'height': position.get('height', 0),
+        'page_number': field.get('page', 0),
+        'source': field.get('source', 'extracted'),
+        'pdf_field_name': field.get('pdf_field_name', ''),
+        'is_required': field.get('is_required', False)
+    }
+
+def field_records_equal(stored: Dict[str, Any], incoming: Dict[str, Any]) -> bool:
+    """Compare a stored pdf_fields row with a freshly built record"""
+    for column in FIELD_COMPARE_COLUMNS:
+        stored_value = stored.get(column)
+        incoming_value = incoming.get(column)
+        
+        if isinstance(stored_value, (int, float)) and isinstance(incoming_value, (int, float)) \
+                and not isinstance(stored_value, bool) and not isinstance(incoming_value, bool):
+            # Positions are REAL (float32) columns, so allow for the precision lost on the round-trip
+            if abs(stored_value - incoming_value) > 1e-3 * max(1.0, abs(incoming_value)):
+                return False
+        elif (stored_value if stored_value is not None else '') != (incoming_value if incoming_value is not None else ''):
+            return False
+    
+    return True
+
+def document_field_id(document_id: str, field_id: str) -> str:
+    """Stable id for a field of this document whose incoming id belongs to another document's row"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"pdfcollab:{document_id}:{field_id}"))
+
+def diff_field_records(document_id: str, records: List[Dict[str, Any]], existing_by_id: Dict[str, Dict[str, Any]],
+                       taken_ids: set, pages: List[int] = None, now: str = None) -> tuple:
+    """Work out a field save: (rows to insert, rows to update, ids to remove, counts)
+    
+    existing_by_id holds every stored row of the document; taken_ids are incoming ids that belong to
+    other documents' rows. Those get an id derived from this document, so the save never writes over
+    (and never moves) a row of another document.
+    """
+    now = now or datetime.now().isoformat()
+    
+    # Last occurrence wins if the editor sends the same field twice
+    incoming_by_id = {}
+    for record in records:
+        if record['id'] in taken_ids:
+            record['id'] = document_field_id(document_id, record['id'])
+        incoming_by_id[record['id']] = record
+    
+    inserts, updates = [], []
+    counts = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+    
+    for field_id, field_record in incoming_by_id.items():
+        existing = existing_by_id.get(field_id)
+        if existing is None:
+            field_record['created_at'] = now
+            field_record['updated_at'] = now
+            inserts.append(field_record)
+            counts['added'] += 1
+        elif field_records_equal(existing, field_record):
+            counts['unchanged'] += 1
+        else:
+            field_record['created_at'] = existing.get('created_at') or now
+            field_record['updated_at'] = now
+            updates.append(field_record)
+            counts['updated'] += 1
+    
+    # Partial save: fields on pages that weren't sent are kept
+    removed_ids = [field_id for field_id, row in existing_by_id.items()
+                   if field_id not in incoming_by_id and (not pages or row.get('page_number') in pages)]
+    counts['removed'] = len(removed_ids)
+    
+    return inserts, updates, removed_ids, counts
+
 class SupabaseManager:
     def __init__(self):
         url = os.getenv("SUPABASE_URL")
@@ -18,9 +175,28 @@ class SupabaseManager:
             raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY must be set in environment variables")
         
         self.supabase: Client = create_client(url, key)
+        # Pooled keep-alive HTTP/2 session with timeouts, read retries and latency histograms
+        get_supabase_transport().attach(self.supabase)
+        
+        # Audit records are written in the background unless AUDIT_ASYNC_ENABLED is turned off
+        async_audit = os.getenv('AUDIT_ASYNC_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+        self.audit_writer = AuditWriter(self._insert_audit_records) if async_audit else None
     
     def create_document(self, document_id: str, name: str, file_path: str, owner_id: str, metadata: Dict[str, Any] = None) -> str:
         """Create a new document record"""
+        self.insert_document(document_id, name, file_path, metadata)
+        
+        # Create user-document relationship with owner role
+        self.add_user_to_document(document_id, owner_id, 'owner', created_by=owner_id)
+        
+        # Log the creation
+        self.log_action(document_id, owner_id, 'document_created', 
+                       f"Document '{name}' created")
+        
+        return document_id
+    
+    def insert_document(self, document_id: str, name: str, file_path: str, metadata: Dict[str, Any] = None) -> str:
+        """Insert just the document row (create_document also adds the owner and logs the creation)"""
         if metadata is None:
             metadata = {}
             
@@ -37,43 +213,87 @@ class SupabaseManager:
             'updated_at': datetime.now().isoformat()
         }
         
-        result = self.supabase.table('documents').insert(document_record).execute()
-        
-        # Create user-document relationship with owner role
-        self.add_user_to_document(document_id, owner_id, 'owner', created_by=owner_id)
-        
-        # Log the creation
-        self.log_action(document_id, owner_id, 'document_created', 
-                       f"Document '{name}' created")
+        self.supabase.table('documents').insert(document_record).execute()
         
         return document_id
     
-    def get_document(self, document_id: str) -> Optional[Dict[str, Any]]:
+    def get_document(self, document_id: str, include_fields: bool = True) -> Optional[Dict[str, Any]]:
         """Get a document by ID"""
+        if include_fields:
+            # Row and fields in a single round trip
+            return self.load_document(document_id)
+        
         result = self.supabase.table('documents').select('*').eq('id', document_id).execute()
         
+        return result.data[0] if result.data else None
+    
+    def load_document(self, document_id: str, view: str = 'full') -> Optional[Dict[str, Any]]:
+        """Get a document with its fields in one embedded select, projected for a view"""
+        document_columns, field_columns = DOCUMENT_VIEWS[view]
+        select = f"{document_columns}, pdf_fields({field_columns})"
+        
+        result = self.supabase.table('documents').select(select).eq('id', document_id).limit(1).execute()
+        
         if not result.data:
             return None
         
         document = result.data[0]
-        
-        # Get PDF fields
-        document['pdf_fields'] = self.get_document_fields(document_id)
+        fields = document.get('pdf_fields') or []
+        # Embedded rows come back unordered; sort here rather than with a per-table order parameter
+        fields.sort(key=lambda field: (field.get('page_number') or 0, field.get('position_y') or 0))
+        document['pdf_fields'] = format_field_rows(fields)
         
         return document
     
-    def get_all_documents(self) -> List[Dict[str, Any]]:
-        """Get all documents"""
-        result = self.supabase.table('documents').select('*').order('created_at', desc=True).execute()
+    def get_all_documents(self, include_fields: bool = True) -> List[Dict[str, Any]]:
+        """Get all documents (summary columns only when include_fields is False)"""
+        columns = '*' if include_fields else DOCUMENT_SUMMARY_COLUMNS
+        result = self.supabase.table('documents').select(columns).order('created_at', desc=True).execute()
         
         documents = result.data
         
-        # Add PDF fields to each document
-        for document in documents:
-            document['pdf_fields'] = self.get_document_fields(document['id'])
+        if include_fields:
+            # Load the fields of every document in a few batched queries instead of one per document
+            fields_by_document = self.get_documents_fields_batch([document['id'] for document in documents])
+            for document in documents:
+                document['pdf_fields'] = fields_by_document.get(document['id'], [])
         
         return documents
     
+    def get_documents_page(self, limit: int = None, cursor: str = None, user_id: str = None) -> Dict[str, Any]:
+        """Get one page of document summaries, newest first, using keyset pagination on (created_at, id)"""
+        limit = clamp_page_size(limit)
+        
+        if user_id:
+            # Only documents the user owns or that are shared with them
+            query = self.supabase.table('documents').select(
+                f"{DOCUMENT_SUMMARY_COLUMNS}, user_documents!inner(role, can_edit, can_share)", count='estimated'
+            ).eq('user_documents.user_id', user_id)
+        else:
+            query = self.supabase.table('documents').select(DOCUMENT_SUMMARY_COLUMNS, count='estimated')
+        
+        position = decode_document_cursor(cursor)
+        if position:
+            created_at, document_id = position
+            # Rows strictly after the cursor in (created_at desc, id desc) order; values are quoted
+            # because timestamps contain characters PostgREST treats as reserved in logic trees
+            query = query.or_(
+                f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt."{document_id}")'
+            )
+        
+        # Fetch one extra row to learn whether another page exists without a second query
+        result = query.order('created_at', desc=True).order('id', desc=True).limit(limit + 1).execute()
+        
+        documents = result.data[:limit]
+        has_more = len(result.data) > limit
+        
+        return {
+            'documents': documents,
+            'next_cursor': encode_document_cursor(documents[-1]) if has_more and documents else None,
+            'total_estimate': result.count,
+            'limit': limit
+        }
+    
     def update_document(self, document_id: str, updates: Dict[str, Any]) -> bool:
         """Update a document"""
         updates['updated_at'] = datetime.now().isoformat()
@@ -86,69 +306,107 @@ class SupabaseManager:
         
         return len(result.data) > 0
     
-    def save_pdf_fields(self, document_id: str, fields: List[Dict[str, Any]]) -> bool:
-        """Save PDF fields for a document"""
-        # First, delete existing fields for this document
-        self.supabase.table('pdf_fields').delete().eq('document_id', document_id).execute()
+    def save_pdf_fields(self, document_id: str, fields: List[Dict[str, Any]], pages: List[int] = None) -> Dict[str, int]:
+        """Save PDF fields for a document, writing only rows that were added, changed or removed"""
+        existing_rows = self._fetch_field_pages(
+            lambda: self.supabase.table('pdf_fields').select('*').eq('document_id', document_id).order('id')
+        )
+        existing_by_id = {row['id']: row for row in existing_rows}
+        records = [build_field_record(document_id, field) for field in fields]
         
-        # Prepare fields for insertion
-        field_records = []
-        for field in fields:
-            position = field.get('position', {})
-            
-            field_record = {
-                'id': field.get('id', str(uuid.uuid4())),
-                'document_id': document_id,
-                'field_name': field.get('name', ''),
-                'field_type': field.get('type', 'text'),
-                'field_value': field.get('value', ''),
-                'assigned_to': field.get('assigned_to', 'user1'),
-                'position_x': position.get('x', 0),
-                'position_y': position.get('y', 0),
-                'width': position.get('width', 0),
-                'height': position.get('height', 0),
-                'page_number': field.get('page', 0),
-                'source': field.get('source', 'extracted'),
-                'pdf_field_name': field.get('pdf_field_name', ''),
-                'is_required': field.get('is_required', False),
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat()
-            }
-            field_records.append(field_record)
+        # Incoming ids that aren't this document's must not be written over another document's rows
+        unknown_ids = list({record['id'] for record in records if record['id'] not in existing_by_id})
+        taken_ids = set()
+        for start in range(0, len(unknown_ids), FIELD_BATCH_SIZE):
+            chunk = unknown_ids[start:start + FIELD_BATCH_SIZE]
+            result = self.supabase.table('pdf_fields').select('id').in_('id', chunk).execute()
+            taken_ids.update(row['id'] for row in result.data)
         
-        if field_records:
-            result = self.supabase.table('pdf_fields').insert(field_records).execute()
+        inserts, updates, removed_ids, counts = diff_field_records(document_id, records, existing_by_id, taken_ids, pages)
+        
+        if inserts:
+            # Plain insert: a conflicting id fails the save instead of taking over the row
+            self.supabase.table('pdf_fields').insert(inserts).execute()
+        
+        if updates:
+            # Every updated row was read with this document's id, so the upsert stays within the document
+            self.supabase.table('pdf_fields').upsert(updates, on_conflict='id').execute()
+        
+        for start in range(0, len(removed_ids), FIELD_BATCH_SIZE):
+            chunk = removed_ids[start:start + FIELD_BATCH_SIZE]
+            self.supabase.table('pdf_fields').delete().eq('document_id', document_id).in_('id', chunk).execute()
+        
+        if inserts or updates or removed_ids:
+            get_render_cache().invalidate_document(document_id)
             
             # Log the field save
-            self.log_action(document_id, 'system', 'fields_saved', 
-                           f"Saved {len(fields)} PDF fields")
+            self.log_action(document_id, 'system', 'fields_saved',
+                           f"Saved PDF fields: {counts['added']} added, {counts['updated']} updated, "
+                           f"{counts['removed']} removed")
+        
+        return counts
+    
+    def get_document_fields(self, document_id: str, page_number: int = None) -> List[Dict[str, Any]]:
+        """Get PDF fields for a document (or for one of its pages)"""
+        def build_query():
+            query = self.supabase.table('pdf_fields').select('*').eq('document_id', document_id)
+            if page_number is not None:
+                query = query.eq('page_number', page_number)
+            return query.order('page_number').order('position_y').order('id')
+        
+        return format_field_rows(self._fetch_field_pages(build_query))
+    
+    def get_documents_fields_batch(self, document_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get PDF fields for many documents at once, grouped by document id"""
+        fields_by_document: Dict[str, List[Dict[str, Any]]] = {document_id: [] for document_id in document_ids}
+        unique_ids = list(fields_by_document.keys())
+        
+        for start in range(0, len(unique_ids), FIELD_BATCH_SIZE):
+            chunk = unique_ids[start:start + FIELD_BATCH_SIZE]
+            rows = self._fetch_field_pages(
+                lambda: self.supabase.table('pdf_fields').select('*').in_('document_id', chunk)
+                .order('document_id').order('page_number').order('position_y').order('id')
+            )
             
-            return len(result.data) > 0
+            # Rows come back ordered per document, so appending keeps each list in page/position order
+            for field in format_field_rows(rows):
+                fields_by_document[field['document_id']].append(field)
         
-        return True
+        return fields_by_document
     
-    def get_document_fields(self, document_id: str) -> List[Dict[str, Any]]:
-        """Get PDF fields for a document"""
-        result = self.supabase.table('pdf_fields').select('*').eq('document_id', document_id).order('page_number').order('position_y').execute()
+    def _fetch_field_pages(self, build_query) -> List[Dict[str, Any]]:
+        """All rows of a pdf_fields query, fetched in FIELD_PAGE_SIZE pages (the query needs a total order)"""
+        rows = []
+        while True:
+            page = build_query().range(len(rows), len(rows) + FIELD_PAGE_SIZE - 1).execute().data
+            rows.extend(page)
+            if len(page) < FIELD_PAGE_SIZE:
+                return rows
+    
+    def update_fields_batch(self, document_id: str, updates: Dict[str, Dict[str, Any]]) -> int:
+        """Apply column updates to many fields of a document ({field_id: {column: value}}) in one upsert"""
+        field_ids = list(updates.keys())
+        now = datetime.now().isoformat()
         
-        fields = []
-        for field in result.data:
-            # Reconstruct position object
-            field['position'] = {
-                'x': field['position_x'],
-                'y': field['position_y'],
-                'width': field['width'],
-                'height': field['height']
-            }
-            # Clean up individual position fields for API compatibility
-            field['name'] = field['field_name']
-            field['type'] = field['field_type']
-            field['value'] = field['field_value']
-            field['page'] = field['page_number']
+        field_records = []
+        for start in range(0, len(field_ids), FIELD_BATCH_SIZE):
+            chunk = field_ids[start:start + FIELD_BATCH_SIZE]
+            result = self.supabase.table('pdf_fields').select('*').eq('document_id', document_id).in_('id', chunk).execute()
             
-            fields.append(field)
+            # Upserts need complete rows, so merge the changes into what is stored
+            for row in result.data:
+                row.update(updates[row['id']])
+                row['updated_at'] = now
+                field_records.append(row)
         
-        return fields
+        if field_records:
+            self.supabase.table('pdf_fields').upsert(field_records, on_conflict='id').execute()
+            get_render_cache().invalidate_document(document_id)
+            
+            self.log_action(document_id, 'system', 'fields_updated',
+                           f"Applied collaborative edits to {len(field_records)} fields")
+        
+        return len(field_records)
     
     def update_field_value(self, field_id: str, value: str, user_type: str = 'user') -> bool:
         """Update a field value"""
@@ -163,6 +421,7 @@ class SupabaseManager:
             # Get document_id for logging
             field_result = self.supabase.table('pdf_fields').select('document_id').eq('id', field_id).execute()
             if field_result.data:
+                get_render_cache().invalidate_document(field_result.data[0]['document_id'])
                 self.log_action(field_result.data[0]['document_id'], user_type, 'field_updated', 
                                f"Field {field_id} updated to '{value}'")
         
@@ -238,10 +497,21 @@ class SupabaseManager:
             'timestamp': datetime.now().isoformat()
         }
         
-        self.supabase.table('audit_log').insert(log_record).execute()
+        if self.audit_writer:
+            self.audit_writer.enqueue(log_record)
+        else:
+            self._insert_audit_records([log_record])
+    
+    def _insert_audit_records(self, log_records: List[Dict[str, Any]]):
+        """Bulk insert audit log records"""
+        self.supabase.table('audit_log').insert(log_records).execute()
     
     def get_audit_log(self, document_id: str = None, limit: int = 100) -> List[Dict[str, Any]]:
         """Get audit log entries"""
+        # Make sure records still buffered in this process show up
+        if self.audit_writer:
+            self.audit_writer.flush()
+        
         query = self.supabase.table('audit_log').select('*')
         
         if document_id:
@@ -259,9 +529,11 @@ class SupabaseManager:
         
         # Delete document
         result = self.supabase.table('documents').delete().eq('id', document_id).execute()
+        get_permission_cache().invalidate_document(document_id)
+        get_render_cache().invalidate_document(document_id)
         
-        # Log the deletion
-        self.log_action(document_id, 'system', 'document_deleted', 
+        # Log the deletion (without document_id: the row is gone, and audit_log.document_id references it)
+        self.log_action(None, 'system', 'document_deleted', 
                        f"Document {document_id} deleted")
         
         return len(result.data) > 0
@@ -361,6 +633,7 @@ class SupabaseManager:
             }
             
             result = self.supabase.table('users').update(update_data).eq('id', user_id).execute()
+            get_user_cache().invalidate(user_id)
             
             # Log the login
             self.log_action(None, user_id, 'user_login', f"User logged in from {ip_address or 'unknown IP'}")
@@ -392,6 +665,7 @@ class SupabaseManager:
                 self.log_action(None, user_id, 'user_locked', f"User account locked after {attempts} failed attempts")
             
             result = self.supabase.table('users').update(update_data).eq('id', user_id).execute()
+            get_user_cache().invalidate(user_id)
             return len(result.data) > 0
             
         except Exception as e:
@@ -429,6 +703,7 @@ class SupabaseManager:
             result = self.supabase.table('users').update(update_data).eq('id', user_id).execute()
             
             if len(result.data) > 0:
+                get_user_cache().invalidate(user_id)
                 self.log_action(None, user_id, 'profile_updated', f"User profile updated")
                 return True
             return False
@@ -448,6 +723,7 @@ class SupabaseManager:
             result = self.supabase.table('users').update(update_data).eq('id', user_id).execute()
             
             if len(result.data) > 0:
+                get_user_cache().invalidate(user_id)
                 self.log_action(None, user_id, 'password_changed', "User password changed")
                 return True
             return False
@@ -487,6 +763,8 @@ class SupabaseManager:
             result = self.supabase.table('users').update(update_data).eq('id', target_user_id).execute()
             
             if len(result.data) > 0:
+                get_permission_cache().invalidate_user(target_user_id)
+                get_user_cache().invalidate(target_user_id)
                 self.log_action(None, admin_user_id, 'user_deactivated', f"Admin deactivated user {target_user_id}")
                 return True
             return False
@@ -510,6 +788,15 @@ class SupabaseManager:
             print(f"Error getting user documents: {e}")
             return []
     
+    def get_document_permission(self, document_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get a user's role and permissions on one document, or None if they have no access
+        
+        Database errors propagate: returning None would be cached as "no access" by the permission cache.
+        """
+        result = self.supabase.table('user_documents').select('role, can_edit, can_share').eq('document_id', document_id).eq('user_id', user_id).limit(1).execute()
+        
+        return result.data[0] if result.data else None
+    
     def add_user_to_document(self, document_id: str, user_id: str, role: str, can_edit: bool = True, can_share: bool = False, created_by: str = None) -> bool:
         """Add a user to a document with specific role and permissions"""
         try:
@@ -526,6 +813,7 @@ class SupabaseManager:
             result = self.supabase.table('user_documents').insert(user_doc_data).execute()
             
             if result.data:
+                get_permission_cache().invalidate_user(user_id)
                 self.log_action(document_id, created_by or 'system', 'user_added_to_document', 
                               f"User {user_id} added to document with role {role}")
                 return True
@@ -619,6 +907,7 @@ class SupabaseManager:
                 }
                 
                 self.supabase.table('document_invitations').update(update_data).eq('token', token).execute()
+                get_permission_cache().invalidate_user(user_id)
                 
                 self.log_action(invitation['document_id'], user_id, 'invitation_accepted', 
                               f"User accepted invitation for role {invitation['role']}")
@@ -633,18 +922,17 @@ class SupabaseManager:
     def upload_template_document(self, name: str, description: str, file_path: str) -> Optional[str]:
         """Upload a PDF template document to the database"""
         try:
-            # Read file as binary
-            with open(file_path, 'rb') as f:
-                file_data = f.read()
+            # The PDF goes to the blob store; the row only references it by content hash
+            blob_key = get_blob_store().put_file(file_path)
             
             # Get file info
-            file_size = len(file_data)
+            file_size = os.path.getsize(file_path)
             filename = os.path.basename(file_path)
             
             template_data = {
                 'name': name,
                 'description': description,
-                'file_data': base64.b64encode(file_data).decode('utf-8'),
+                'blob_key': blob_key,
                 'filename': filename,
                 'file_size': file_size,
                 'content_type': 'application/pdf',
@@ -658,6 +946,13 @@ class SupabaseManager:
             if len(result.data) > 0:
                 template_id = result.data[0]['id']
                 print(f"✅ Template document uploaded: {name} (ID: {template_id})")
+                
+                # Compile once now so documents created from it skip copying and extraction
+                try:
+                    from template_compiler import get_template_compiler
+                    get_template_compiler().compile(file_path, filename, template_id)
+                except Exception as e:
+                    print(f"⚠️  Template {template_id} will be compiled on first use: {e}")
                 return template_id
             return None
             
@@ -681,7 +976,7 @@ class SupabaseManager:
     def get_active_templates(self) -> List[Dict[str, Any]]:
         """Get all active template documents"""
         try:
-            result = self.supabase.table('template_documents').select('id, name, description, filename, file_size, created_at').eq('is_active', True).order('created_at', desc=True).execute()
+            result = self.supabase.table('template_documents').select('id, name, description, filename, file_size, blob_key, created_at').eq('is_active', True).order('created_at', desc=True).execute()
             return result.data if result.data else []
             
         except Exception as e:
@@ -689,15 +984,61 @@ class SupabaseManager:
             return []
     
     def get_template_file_data(self, template_id: str) -> Optional[bytes]:
-        """Get the binary file data for a template document"""
+        """Get the binary file data for a template document (prefer get_template_file_path for large files)"""
+        file_path = self.get_template_file_path(template_id)
+        if not file_path:
+            return None
+        
+        with open(file_path, 'rb') as f:
+            return f.read()
+    
+    def get_template_file_path(self, template_id: str) -> Optional[str]:
+        """Local path of a template's PDF, streamed into the blob cache on first use"""
         try:
-            result = self.supabase.table('template_documents').select('file_data').eq('id', template_id).eq('is_active', True).execute()
+            result = self.supabase.table('template_documents').select('blob_key').eq('id', template_id).eq('is_active', True).execute()
+            if not result.data:
+                return None
             
-            if len(result.data) > 0:
-                file_data_b64 = result.data[0]['file_data']
-                return base64.b64decode(file_data_b64)
-            return None
+            blob_key = result.data[0].get('blob_key')
+            file_path = get_blob_store().local_path(blob_key) if blob_key else None
+            if file_path is None:
+                # Legacy row, or a blob on another node's local store: fall back to the bytes kept in file_data
+                blob_key = self._migrate_template_file_data(template_id)
+                file_path = get_blob_store().local_path(blob_key) if blob_key else None
+            return file_path
             
         except Exception as e:
-            print(f"Error getting template file data: {e}")
-            return None
\ No newline at end of file
+            print(f"Error getting template file: {e}")
+            return None
+    
+    def _migrate_template_file_data(self, template_id: str) -> Optional[str]:
+        """Copy a template's base64 file_data into the blob store, clearing the column once the blob is shared"""
+        result = self.supabase.table('template_documents').select('file_data').eq('id', template_id).execute()
+        if not result.data or not result.data[0].get('file_data'):
+            return None
+        
+        blob_store = get_blob_store()
+        blob_key = blob_store.put_bytes(base64.b64decode(result.data[0]['file_data']))
+        updates = {'blob_key': blob_key, 'updated_at': datetime.now().isoformat()}
+        # A local blob store is one node's disk: other nodes (and the next deploy) still need the column
+        if not blob_store.backend.is_local:
+            updates['file_data'] = None
+        self.supabase.table('template_documents').update(updates).eq('id', template_id).execute()
+        
+        print(f"📦 Copied template {template_id} file data to blob {blob_key[:12]}")
+        return blob_key
+
+# Storage backends selectable with DATABASE_BACKEND -> (module, class); all share SupabaseManager's interface
+DATABASE_BACKENDS = {
+    'supabase': ('supabase_client', 'SupabaseManager'),
+    'sqlite': ('sqlite_manager', 'SQLiteManager'),
+}
+
+def create_database_manager():
+    """Create the storage backend chosen by DATABASE_BACKEND (default: supabase)"""
+    backend = os.getenv('DATABASE_BACKEND', 'supabase').lower()
+    if backend not in DATABASE_BACKENDS:
+        raise ValueError(f"Unknown DATABASE_BACKEND '{backend}' (expected one of {', '.join(DATABASE_BACKENDS)})")
+    
+    module_name, class_name = DATABASE_BACKENDS[backend]
+    return getattr(importlib.import_module(module_name), class_name)()
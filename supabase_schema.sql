@@ -34,6 +34,11 @@ CREATE TABLE IF NOT EXISTS template_documents (
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Template PDFs live in the blob store (content-addressed by SHA-256); file_data only remains for
+-- rows uploaded before, which are moved to the blob store the first time they are read
+ALTER TABLE template_documents ADD COLUMN IF NOT EXISTS blob_key TEXT;
+ALTER TABLE template_documents ALTER COLUMN file_data DROP NOT NULL;
+
 -- PDF fields table
 CREATE TABLE IF NOT EXISTS pdf_fields (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -0,0 +1,206 @@
+"""
+Pooled HTTP/2 transport for SupabaseManager's PostgREST calls, with read retries and per-table latency histograms
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket catches everything slower
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Only reads are retried - a timed-out write may still have been applied
+RETRY_METHODS = ('GET', 'HEAD')
+RETRY_STATUS_CODES = (502, 503, 504)
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (cheap to update on every request)"""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float) -> None:
+        index = len(LATENCY_BUCKETS_MS)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given percentile (max latency for the overflow bucket)"""
+        if not self.count:
+            return None
+        threshold = fraction * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= threshold:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else round(self.max_ms, 1)
+        return round(self.max_ms, 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'retries': self.retries,
+            'avg_ms': round(self.total_ms / self.count, 1) if self.count else None,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': round(self.max_ms, 1),
+            'buckets': {
+                **{f"le_{bound}": self.counts[i] for i, bound in enumerate(LATENCY_BUCKETS_MS)},
+                'inf': self.counts[-1]
+            }
+        }
+
+
+class InstrumentedClient(httpx.Client):
+    """httpx client that retries idempotent reads and records latency per (method, table)"""
+
+    def __init__(self, transport_stats: 'SupabaseTransport', retry_attempts: int, retry_backoff: float, **kwargs):
+        super().__init__(**kwargs)
+        self.transport_stats = transport_stats
+        self.retry_attempts = retry_attempts
+        self.retry_backoff = retry_backoff
+
+    def request(self, method: str, url, **kwargs) -> httpx.Response:
+        method = method.upper()
+        table = self.transport_stats.table_for(str(url))
+        attempts = self.retry_attempts if method in RETRY_METHODS else 1
+
+        for attempt in range(1, attempts + 1):
+            started = time.perf_counter()
+            try:
+                response = super().request(method, url, **kwargs)
+            except httpx.TransportError:
+                self.transport_stats.record(method, table, started, error=True, retried=attempt > 1)
+                if attempt == attempts:
+                    raise
+            else:
+                failed = response.status_code in RETRY_STATUS_CODES
+                self.transport_stats.record(method, table, started, error=failed, retried=attempt > 1)
+                if not failed or attempt == attempts:
+                    return response
+                response.close()
+
+            # Exponential backoff with jitter so retrying workers don't stampede together
+            time.sleep(self.retry_backoff * (2 ** (attempt - 1)) * (0.5 + random.random()))
+
+
+class SupabaseTransport:
+    """Builds the pooled PostgREST session and keeps its latency statistics"""
+
+    def __init__(self):
+        self.enabled = os.getenv('SUPABASE_TRANSPORT_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+        self.http2 = os.getenv('SUPABASE_HTTP2', 'true').lower() not in ('0', 'false', 'no')
+
+        self.limits = httpx.Limits(
+            max_connections=int(os.getenv('SUPABASE_POOL_MAX_CONNECTIONS', '20')),
+            max_keepalive_connections=int(os.getenv('SUPABASE_POOL_MAX_KEEPALIVE', '10')),
+            keepalive_expiry=_env_float('SUPABASE_KEEPALIVE_EXPIRY_SECONDS', 60.0)
+        )
+        self.timeout = httpx.Timeout(
+            connect=_env_float('SUPABASE_CONNECT_TIMEOUT_SECONDS', 5.0),
+            read=_env_float('SUPABASE_READ_TIMEOUT_SECONDS', 15.0),
+            write=_env_float('SUPABASE_WRITE_TIMEOUT_SECONDS', 15.0),
+            # Waiting for a free pooled connection - fail fast instead of queueing forever
+            pool=_env_float('SUPABASE_POOL_TIMEOUT_SECONDS', 5.0)
+        )
+        self.retry_attempts = max(1, int(os.getenv('SUPABASE_RETRY_ATTEMPTS', '3')))
+        self.retry_backoff = _env_float('SUPABASE_RETRY_BACKOFF_SECONDS', 0.1)
+
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def table_for(url: str) -> str:
+        """PostgREST table (or rpc/<function>) from a request path"""
+        path = url.split('?', 1)[0].strip('/').split('/')
+        if path and path[0] == 'rpc' and len(path) > 1:
+            return f"rpc/{path[1]}"
+        return path[-1] if path and path[-1] else 'unknown'
+
+    def create_session(self, base_url: str, headers: Dict[str, str]) -> InstrumentedClient:
+        return InstrumentedClient(
+            self,
+            self.retry_attempts,
+            self.retry_backoff,
+            base_url=base_url,
+            headers=headers,
+            timeout=self.timeout,
+            limits=self.limits,
+            http2=self.http2,
+            follow_redirects=True
+        )
+
+    def attach(self, client) -> None:
+        """Make a supabase Client's PostgREST calls go through the pooled session"""
+        if not self.enabled:
+            return
+
+        init_postgrest_client = client._init_postgrest_client
+
+        def init_pooled_postgrest_client(*args, **kwargs):
+            postgrest = init_postgrest_client(*args, **kwargs)
+            default_session = postgrest.session
+            postgrest.session = self.create_session(str(default_session.base_url), dict(default_session.headers))
+            default_session.close()
+            return postgrest
+
+        # The client rebuilds its PostgREST client after auth events, so hook creation rather than swap once
+        client._init_postgrest_client = init_pooled_postgrest_client
+        client._postgrest = None
+        print(f"🔌 Supabase transport: pool {self.limits.max_connections}, "
+              f"{'HTTP/2' if self.http2 else 'HTTP/1.1'}, {self.retry_attempts} read attempts")
+
+    def record(self, method: str, table: str, started: float, error: bool = False, retried: bool = False) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        key = f"{method} {table}"
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.observe(elapsed_ms)
+            if error:
+                histogram.errors += 1
+            if retried:
+                histogram.retries += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = {key: histogram.snapshot() for key, histogram in sorted(self._histograms.items())}
+        return {
+            'enabled': self.enabled,
+            'http2': self.http2,
+            'max_connections': self.limits.max_connections,
+            'max_keepalive_connections': self.limits.max_keepalive_connections,
+            'retry_attempts': self.retry_attempts,
+            'calls': calls
+        }
+
+
+# Global instance
+supabase_transport = SupabaseTransport()
+
+def get_supabase_transport() -> SupabaseTransport:
+    """Get the global Supabase transport instance"""
+    return supabase_transport
@@ -0,0 +1,279 @@
+"""
+Compiles template PDFs once into reusable artifact bundles under compiled/<hash>/
+
+A bundle holds the template, its enhanced copy (Section 5 widgets), the extracted field list,
+the widget index and page thumbnails. Documents created from a template get their own copy of
+the compiled PDFs but reuse the extracted fields, widget index and thumbnails instead of
+re-analyzing the template.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import fitz  # PyMuPDF
+
+from field_model import PDFField, iter_fields_json, pack_fields, unpack_fields
+from file_security import get_file_hash, remember_file_hash
+from pdf_processor import PDFProcessor, SECTION5_WIDGETS
+from widget_index import build_widget_index, seed_widget_index
+
+# Bump when bundle contents change so old bundles are rebuilt
+TEMPLATE_COMPILER_VERSION = "1"
+
+# Templates that get extra widgets in their enhanced copy: filename -> widgets to add
+TEMPLATE_ENHANCERS = {
+    'homworks.pdf': SECTION5_WIDGETS,
+}
+
+SOURCE_FILENAME = 'template.pdf'
+ENHANCED_FILENAME = 'template_enhanced.pdf'
+
+
+class TemplateCompiler:
+    """Builds and loads compiled template bundles, shared by every worker on the node"""
+
+    def __init__(self, compiled_dir: str = None):
+        self.compiled_dir = compiled_dir or os.getenv('TEMPLATE_COMPILED_DIR', 'compiled')
+        self.thumbnail_scale = float(os.getenv('TEMPLATE_THUMBNAIL_SCALE', '0.3'))
+
+        # template_id -> template hash, so a database template is located without fetching its bytes
+        self.index_dir = os.path.join(self.compiled_dir, 'by-template')
+        self.processor = PDFProcessor()
+        self._manifests: Dict[str, Dict[str, Any]] = {}
+        self._fields: Dict[str, List[PDFField]] = {}
+        # Template hashes whose widget index has been handed to the fill pipeline in this process
+        self._seeded_indexes: set = set()
+        self._lock = threading.Lock()
+
+        os.makedirs(self.index_dir, exist_ok=True)
+
+    def bundle_dir(self, template_hash: str) -> str:
+        return os.path.join(self.compiled_dir, template_hash)
+
+    def load(self, template_hash: str) -> Optional[Dict[str, Any]]:
+        """Manifest of a compiled bundle (with absolute artifact paths), or None if it isn't compiled"""
+        if not template_hash:
+            return None
+
+        with self._lock:
+            manifest = self._manifests.get(template_hash)
+        if manifest is not None:
+            return manifest
+
+        manifest_path = os.path.join(self.bundle_dir(template_hash), 'manifest.json')
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️  Unreadable template bundle {template_hash}: {e}")
+            return None
+
+        if manifest.get('version') != TEMPLATE_COMPILER_VERSION:
+            return None
+
+        manifest = self._resolve_paths(template_hash, manifest)
+        with self._lock:
+            self._manifests[template_hash] = manifest
+        return manifest
+
+    def load_for_template(self, template_id: str) -> Optional[Dict[str, Any]]:
+        """Bundle of a database template compiled on this node, or None"""
+        try:
+            with open(os.path.join(self.index_dir, f"{template_id}.json"), 'r', encoding='utf-8') as f:
+                return self.load(json.load(f)['template_hash'])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️  Unreadable template index entry {template_id}: {e}")
+            return None
+
+    def compile(self, pdf_path: str, filename: str = None, template_id: str = None,
+                extract_fields: Callable[[str], Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Compile a template PDF (a no-op if the same bytes were compiled before); returns its manifest"""
+        template_hash = get_file_hash(pdf_path)
+        if not template_hash:
+            return None
+
+        filename = filename or os.path.basename(pdf_path)
+        manifest = self.load(template_hash)
+        if manifest is None:
+            manifest = self._build(pdf_path, template_hash, filename,
+                                   extract_fields or self.processor.extract_fields_with_pymupdf)
+
+        if manifest and template_id:
+            self._remember_template(template_id, template_hash)
+        return manifest
+
+    def get_fields(self, manifest: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """A private copy of the bundle's extracted fields (callers fill in values and assignments)"""
+        with self._lock:
+            packed = self._fields.get(manifest['template_hash'])
+        if packed is None:
+            with open(manifest['fields_path'], 'r', encoding='utf-8') as f:
+                packed = pack_fields(json.load(f))
+            with self._lock:
+                self._fields[manifest['template_hash']] = packed
+        return unpack_fields(packed)
+
+    def create_document_file(self, manifest: Dict[str, Any], upload_folder: str, document_id: str,
+                             filename: str) -> str:
+        """Copy the bundle's PDFs to the document's own path in upload_folder; returns that path
+
+        Documents must not point into compiled/: bundles are a rebuildable cache (replaced when the
+        compiler version changes), and a shared path would give every document of the template the
+        same filename and path-derived state.
+        """
+        file_path = os.path.join(upload_folder, f"{document_id}_{filename}")
+        shutil.copyfile(manifest['source_path'], file_path)
+        # Same bytes as the bundle, so later cache lookups can skip hashing the copy
+        remember_file_hash(file_path, manifest['template_hash'])
+
+        fill_hash = self._seed_widget_index(manifest)
+        if manifest.get('enhanced_path'):
+            # Named so completed-PDF generation picks it up as the document's enhanced copy
+            enhanced_copy = file_path.replace('.pdf', '_enhanced.pdf')
+            shutil.copyfile(manifest['enhanced_path'], enhanced_copy)
+            if fill_hash:
+                remember_file_hash(enhanced_copy, fill_hash)
+        return file_path
+
+    def _seed_widget_index(self, manifest: Dict[str, Any]) -> Optional[str]:
+        """Hand widgets.json to the fill pipeline, which looks the index up by the hash of the PDF it fills
+        (the enhanced copy when there is one); returns that hash"""
+        fill_path = manifest.get('enhanced_path') or manifest['source_path']
+        fill_hash = get_file_hash(fill_path)
+        if not fill_hash:
+            return None
+
+        with self._lock:
+            if manifest['template_hash'] in self._seeded_indexes:
+                return fill_hash
+        try:
+            with open(manifest['widgets_path'], 'r', encoding='utf-8') as f:
+                # Built with self.processor's widget types, i.e. the index PDFProcessor fills through
+                seed_widget_index(fill_hash, 'pymupdf', json.load(f))
+        except Exception as e:
+            print(f"⚠️  Could not load the widget index of template {manifest['template_hash'][:12]}: {e}")
+            return fill_hash
+        with self._lock:
+            self._seeded_indexes.add(manifest['template_hash'])
+        return fill_hash
+
+    def _build(self, pdf_path: str, template_hash: str, filename: str,
+               extract_fields: Callable[[str], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        started = time.time()
+        print(f"🏗️  Compiling template {filename} ({template_hash[:12]})")
+
+        # Build beside the final location and rename, so readers never see a half-built bundle
+        build_dir = os.path.join(self.compiled_dir, f".{template_hash}.{os.getpid()}.{uuid.uuid4().hex[:8]}")
+        os.makedirs(build_dir)
+
+        try:
+            source_path = os.path.join(build_dir, SOURCE_FILENAME)
+            shutil.copyfile(pdf_path, source_path)
+
+            extraction_path = source_path
+            enhanced = False
+            extra_widgets = TEMPLATE_ENHANCERS.get(filename)
+            if extra_widgets:
+                enhanced_path = os.path.join(build_dir, ENHANCED_FILENAME)
+                if self.processor.add_form_widgets_to_pdf(source_path, extra_widgets, enhanced_path):
+                    extraction_path = enhanced_path
+                    enhanced = True
+
+            analysis = extract_fields(extraction_path)
+            if not analysis or 'error' in analysis:
+                raise RuntimeError((analysis or {}).get('error', 'field extraction failed'))
+            with open(os.path.join(build_dir, 'fields.json'), 'w', encoding='utf-8') as f:
+                f.writelines(iter_fields_json(analysis['fields']))
+
+            doc = fitz.open(extraction_path)
+            try:
+                page_count = len(doc)
+                widgets = build_widget_index(doc, self.processor.get_widget_type)
+            finally:
+                doc.close()
+            with open(os.path.join(build_dir, 'widgets.json'), 'w', encoding='utf-8') as f:
+                json.dump(widgets, f)
+
+            thumbnails = []
+            os.makedirs(os.path.join(build_dir, 'thumbnails'))
+            for page_num in range(page_count):
+                image_data = self.processor.render_page_image(extraction_path, page_num, self.thumbnail_scale, 'jpeg')
+                if not image_data:
+                    thumbnails.append(None)
+                    continue
+                thumbnail = os.path.join('thumbnails', f"page-{page_num + 1}.jpg")
+                with open(os.path.join(build_dir, thumbnail), 'wb') as f:
+                    f.write(image_data)
+                thumbnails.append(thumbnail)
+
+            manifest = {
+                'version': TEMPLATE_COMPILER_VERSION,
+                'template_hash': template_hash,
+                'filename': filename,
+                'source': SOURCE_FILENAME,
+                'enhanced': ENHANCED_FILENAME if enhanced else None,
+                'fields': 'fields.json',
+                'widgets': 'widgets.json',
+                'thumbnails': thumbnails,
+                'page_count': page_count,
+                'field_count': len(analysis['fields']),
+                'compiled_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+            }
+            with open(os.path.join(build_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+
+            try:
+                os.replace(build_dir, self.bundle_dir(template_hash))
+            except OSError:
+                if self.load(template_hash) is not None:
+                    # Another worker finished the same template first - use theirs
+                    shutil.rmtree(build_dir, ignore_errors=True)
+                else:
+                    # A bundle from an older compiler version is in the way
+                    shutil.rmtree(self.bundle_dir(template_hash), ignore_errors=True)
+                    os.replace(build_dir, self.bundle_dir(template_hash))
+        except Exception as e:
+            print(f"❌ Error compiling template {filename}: {e}")
+            shutil.rmtree(build_dir, ignore_errors=True)
+            return None
+
+        print(f"✅ Compiled template {filename}: {manifest['field_count']} fields, "
+              f"{page_count} pages in {time.time() - started:.1f}s")
+        return self.load(template_hash)
+
+    def _resolve_paths(self, template_hash: str, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        bundle_dir = self.bundle_dir(template_hash)
+        manifest['source_path'] = os.path.join(bundle_dir, manifest['source'])
+        manifest['enhanced_path'] = os.path.join(bundle_dir, manifest['enhanced']) if manifest.get('enhanced') else None
+        manifest['fields_path'] = os.path.join(bundle_dir, manifest['fields'])
+        manifest['widgets_path'] = os.path.join(bundle_dir, manifest['widgets'])
+        manifest['thumbnail_paths'] = [os.path.join(bundle_dir, thumbnail) if thumbnail else None
+                                       for thumbnail in manifest['thumbnails']]
+        return manifest
+
+    def _remember_template(self, template_id: str, template_hash: str) -> None:
+        path = os.path.join(self.index_dir, f"{template_id}.json")
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'template_id': template_id, 'template_hash': template_hash}, f)
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"⚠️  Could not record compiled template {template_id}: {e}")
+
+
+# Global instance
+template_compiler = TemplateCompiler()
+
+def get_template_compiler() -> TemplateCompiler:
+    """Get the global template compiler instance"""
+    return template_compiler
@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+
+import fitz  # PyMuPDF
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# The app's caches are module-level singletons rooted in the working directory; point them at a scratch
+# directory before anything imports them, and keep audit writes synchronous
+SCRATCH_DIR = tempfile.mkdtemp(prefix='pdfcollab-tests-')
+for name, subdir in (('RENDER_CACHE_DIR', 'rendered'), ('EXTRACTION_CACHE_DIR', 'extraction'),
+                     ('PREVIEW_CACHE_DIR', 'previews'), ('BLOB_STORE_DIR', 'blobs'),
+                     ('BLOB_CACHE_DIR', 'blob-cache'), ('JOB_QUEUE_DB', 'jobs.sqlite3')):
+    os.environ.setdefault(name, os.path.join(SCRATCH_DIR, subdir))
+os.environ.setdefault('AUDIT_ASYNC_ENABLED', 'false')
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """A fresh SQLiteManager on its own database file"""
+    from sqlite_manager import SQLiteManager
+    return SQLiteManager(str(tmp_path / 'pdfcollab.sqlite3'))
+
+
+@pytest.fixture
+def supabase_db():
+    """A SupabaseManager on an in-memory fake of the PostgREST client (the real one needs a server)"""
+    from supabase_client import SupabaseManager
+    from fake_supabase import FakeSupabase
+
+    manager = SupabaseManager.__new__(SupabaseManager)
+    manager.supabase = FakeSupabase()
+    manager.audit_writer = None
+    return manager
+
+
+@pytest.fixture
+def form_pdf(tmp_path):
+    """A small form with one text widget per page"""
+    path = tmp_path / 'form.pdf'
+    doc = fitz.open()
+    for page_num in range(4):
+        page = doc.new_page()
+        page.insert_text((72, 90), 'Applicant signature')
+        widget = fitz.Widget()
+        widget.field_name = f"name_{page_num}"
+        widget.field_type = fitz.PDF_WIDGET_TYPE_TEXT
+        widget.rect = fitz.Rect(72, 100, 272, 120)
+        page.add_widget(widget)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
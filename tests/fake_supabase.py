@@ -0,0 +1,150 @@
+"""
+In-memory stand-in for the supabase client's PostgREST query builder (the subset SupabaseManager uses)
+"""
+
+import copy
+import operator
+from types import SimpleNamespace
+
+FILTER_OPERATORS = {'eq': operator.eq, 'lt': operator.lt, 'lte': operator.le, 'gt': operator.gt, 'gte': operator.ge}
+
+
+def split_top_level(text):
+    """Split a PostgREST logic tree on commas outside parentheses and double quotes"""
+    parts, depth, quoted, start = [], 0, False, 0
+    for index, char in enumerate(text):
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and char == ',':
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return parts
+
+def parse_logic_tree(conditions, combine=any):
+    """Row predicate for the filter string passed to or_() (nested and()/or() and eq/lt/lte/gt/gte)"""
+    predicates = []
+    for condition in split_top_level(conditions):
+        for group, group_combine in (('and(', all), ('or(', any)):
+            if condition.startswith(group) and condition.endswith(')'):
+                predicates.append(parse_logic_tree(condition[len(group):-1], group_combine))
+                break
+        else:
+            column, op, value = condition.split('.', 2)
+            if value.startswith('"') and value.endswith('"'):
+                value = value[1:-1]
+            compare = FILTER_OPERATORS[op]
+            predicates.append(lambda row, column=column, compare=compare, value=value:
+                              row.get(column) is not None and compare(str(row.get(column)), value))
+    return lambda row: combine(predicate(row) for predicate in predicates)
+
+
+class FakeQuery:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.action = 'select'
+        self.payload = None
+        self.filters = []
+        self.orders = []
+        self.offset = 0
+        self.limit_rows = None
+
+    def select(self, columns='*', count=None):
+        self.action = 'select'
+        return self
+
+    def insert(self, rows):
+        self.action, self.payload = 'insert', rows
+        return self
+
+    def upsert(self, rows, on_conflict='id'):
+        self.action, self.payload = 'upsert', rows
+        return self
+
+    def update(self, values):
+        self.action, self.payload = 'update', values
+        return self
+
+    def delete(self):
+        self.action = 'delete'
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def or_(self, conditions):
+        self.filters.append(parse_logic_tree(conditions))
+        return self
+
+    def in_(self, column, values):
+        values = list(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        self.offset, self.limit_rows = start, end - start + 1
+        return self
+
+    def limit(self, count):
+        self.limit_rows = count
+        return self
+
+    def execute(self):
+        self.client.requests.append((self.action, self.table))
+        rows = self.client.tables.setdefault(self.table, [])
+        matching = [row for row in rows if all(match(row) for match in self.filters)]
+
+        if self.action == 'select':
+            for column, desc in reversed(self.orders):
+                matching.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+            matching = matching[self.offset:]
+            limit = min(self.limit_rows or self.client.max_rows, self.client.max_rows)
+            return SimpleNamespace(data=copy.deepcopy(matching[:limit]), count=len(matching))
+
+        if self.action == 'insert':
+            payload = self.payload if isinstance(self.payload, list) else [self.payload]
+            ids = {row['id'] for row in rows}
+            if any(record.get('id') in ids for record in payload):
+                raise RuntimeError('duplicate key value violates unique constraint')
+            rows.extend(copy.deepcopy(payload))
+            return SimpleNamespace(data=copy.deepcopy(payload), count=None)
+
+        if self.action == 'upsert':
+            payload = self.payload if isinstance(self.payload, list) else [self.payload]
+            by_id = {row['id']: row for row in rows}
+            for record in payload:
+                if record['id'] in by_id:
+                    by_id[record['id']].update(copy.deepcopy(record))
+                else:
+                    rows.append(copy.deepcopy(record))
+            return SimpleNamespace(data=copy.deepcopy(payload), count=None)
+
+        if self.action == 'update':
+            for row in matching:
+                row.update(self.payload)
+            return SimpleNamespace(data=copy.deepcopy(matching), count=None)
+
+        self.client.tables[self.table] = [row for row in rows if row not in matching]
+        return SimpleNamespace(data=copy.deepcopy(matching), count=None)
+
+
+class FakeSupabase:
+    """Tables as lists of dicts; responses are capped at max_rows like PostgREST's db-max-rows"""
+
+    def __init__(self, max_rows=1000):
+        self.tables = {}
+        self.max_rows = max_rows
+        self.requests = []
+
+    def table(self, name):
+        return FakeQuery(self, name)
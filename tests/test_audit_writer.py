@@ -0,0 +1,114 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from postgrest.exceptions import APIError
+
+from audit_writer import AuditWriter, is_permanent_error
+
+
+class FlakyAuditTable:
+    """Inserts records like PostgREST would: all or nothing per batch"""
+
+    def __init__(self):
+        self.rows = []
+        self.down = False
+        self.calls = 0
+
+    def insert_batch(self, records):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError('database unavailable')
+        if any(record.get('document_id') == 'deleted' for record in records):
+            raise APIError({'code': '23503', 'message': 'violates foreign key constraint "audit_log_document_id_fkey"'})
+        self.rows.extend(records)
+
+
+@pytest.fixture
+def table():
+    return FlakyAuditTable()
+
+
+@pytest.fixture
+def writer(table, tmp_path):
+    writer = AuditWriter(table.insert_batch, spool_path=str(tmp_path / 'audit_spool.jsonl'), batch_size=50)
+    yield writer
+    writer.stop()
+
+
+def records(count, **extra):
+    return [dict({'action': f'action-{index}'}, **extra) for index in range(count)]
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_error_classification():
+    assert is_permanent_error(APIError({'code': '23503', 'message': 'fk'}))
+    assert is_permanent_error(APIError({'code': 'PGRST204', 'message': 'unknown column'}))
+    assert is_permanent_error(APIError({'code': 400, 'message': 'bad request'}))
+    assert not is_permanent_error(APIError({'code': 503, 'message': 'unavailable'}))
+    assert not is_permanent_error(APIError({'code': 'PGRST000', 'message': 'connection'}))
+    assert not is_permanent_error(ConnectionError('down'))
+
+
+def test_one_bad_record_does_not_hold_back_the_batch(writer, table):
+    batch = records(5) + records(1, document_id='deleted') + records(5)
+    for record in batch:
+        writer.enqueue(record)
+    assert writer.flush()
+
+    assert len(table.rows) == 10
+    assert not os.path.exists(writer.spool_path)
+    rejected = read_jsonl(writer.rejected_path)
+    assert [entry['record']['document_id'] for entry in rejected] == ['deleted']
+
+
+def test_outage_spools_and_replays(writer, table):
+    table.down = True
+    for record in records(10):
+        writer.enqueue(record)
+    assert writer.flush()
+    assert len(read_jsonl(writer.spool_path)) == 10
+    # A database outage is retried later, not bisected into one insert per record
+    assert table.calls == 1
+
+    table.down = False
+    assert writer.flush()
+    assert len(table.rows) == 10
+    assert not os.path.exists(writer.spool_path)
+
+
+def test_spool_replay_skips_rejected_records(writer, table):
+    with open(writer.spool_path, 'w', encoding='utf-8') as f:
+        for record in records(1, document_id='deleted') + records(10):
+            f.write(json.dumps(record) + '\n')
+
+    writer.enqueue({'action': 'live'})
+    assert writer.flush()
+
+    assert len(table.rows) == 11
+    assert not os.path.exists(writer.spool_path)
+    assert len(read_jsonl(writer.rejected_path)) == 1
+
+
+def test_replays_orphaned_by_dead_processes_are_recovered(writer, table):
+    dead = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'], capture_output=True, text=True)
+    orphan_path = f"{writer.spool_path}.{int(dead.stdout)}.replay"
+    with open(orphan_path, 'w', encoding='utf-8') as f:
+        for record in records(3):
+            f.write(json.dumps(record) + '\n')
+    live_path = f"{writer.spool_path}.1.replay"
+    with open(live_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'action': 'claimed by a live process'}) + '\n')
+
+    writer.enqueue({'action': 'live'})
+    assert writer.flush()
+
+    assert len(table.rows) == 4
+    assert not os.path.exists(orphan_path)
+    assert os.path.exists(live_path)
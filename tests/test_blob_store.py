@@ -0,0 +1,77 @@
+import hashlib
+import os
+
+import pytest
+
+from blob_store import BlobStore, LocalBlobBackend, is_blob_key
+
+
+class RemoteBackend(LocalBlobBackend):
+    """A local directory standing in for remote storage, so reads go through the read-through cache"""
+
+    is_local = False
+
+
+@pytest.fixture
+def remote_store(tmp_path):
+    return BlobStore(RemoteBackend(str(tmp_path / 'remote')), cache_dir=str(tmp_path / 'cache'))
+
+
+def test_keys_must_be_sha256_hex():
+    assert is_blob_key(hashlib.sha256(b'x').hexdigest())
+    assert not is_blob_key('')
+    assert not is_blob_key(None)
+    assert not is_blob_key('A' * 64)
+    assert not is_blob_key('../' + 'a' * 61)
+    assert not is_blob_key('a' * 63)
+
+
+def test_local_store_is_content_addressed(tmp_path):
+    store = BlobStore(LocalBlobBackend(str(tmp_path / 'blobs')), cache_dir=str(tmp_path / 'cache'))
+
+    key = store.put_bytes(b'%PDF-1.4 template')
+    assert key == hashlib.sha256(b'%PDF-1.4 template').hexdigest()
+    assert store.put_bytes(b'%PDF-1.4 template') == key
+    assert store.read_range(key, 5, 3) == b'1.4'
+    assert b''.join(store.iter_range(key, 9)) == b'template'
+    with store.open(key) as f:
+        assert f.read() == b'%PDF-1.4 template'
+    assert store.local_path('../../etc/passwd') is None
+
+
+def test_remote_reads_are_verified_against_the_key(remote_store):
+    key = remote_store.put_bytes(b'original bytes')
+
+    cached = remote_store.local_path(key)
+    assert cached.startswith(remote_store.cache_dir)
+    with open(cached, 'rb') as f:
+        assert f.read() == b'original bytes'
+
+    # Tampered remote content is refused and never reaches the cache
+    tampered_key = remote_store.put_bytes(b'other bytes')
+    with open(remote_store.backend.path(tampered_key), 'wb') as f:
+        f.write(b'tampered')
+
+    assert remote_store.local_path(tampered_key) is None
+    assert not any(name.endswith(tampered_key) or name.endswith('.tmp')
+                   for _, _, names in os.walk(remote_store.cache_dir) for name in names)
+
+
+def test_missing_remote_blob(remote_store):
+    assert remote_store.local_path(hashlib.sha256(b'never stored').hexdigest()) is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    store = BlobStore(RemoteBackend(str(tmp_path / 'remote')), cache_dir=str(tmp_path / 'cache'), cache_max_bytes=25)
+    first = store.put_bytes(b'a' * 10)
+    second = store.put_bytes(b'b' * 10)
+    third = store.put_bytes(b'c' * 10)
+
+    first_path = store.local_path(first)
+    second_path = store.local_path(second)
+    os.utime(first_path, (1, 1))
+    os.utime(second_path, (2, 2))
+    store.local_path(third)
+
+    assert not os.path.exists(first_path)
+    assert os.path.exists(second_path)
@@ -0,0 +1,72 @@
+import collaboration
+from collaboration import CollaborationHub, socketio_cors_origins
+
+
+class FieldStore:
+    def __init__(self, field_ids):
+        self.field_ids = set(field_ids)
+        self.reads = 0
+        self.updates = []
+
+    def get_document_fields(self, document_id):
+        self.reads += 1
+        return [{'id': field_id} for field_id in self.field_ids]
+
+    def update_fields_batch(self, document_id, updates):
+        self.updates.append((document_id, updates))
+        return len(updates)
+
+
+def make_hub(field_ids=('f1',)):
+    hub = CollaborationHub()
+    hub.db = FieldStore(field_ids)
+    return hub
+
+
+def test_sockets_are_same_origin_unless_configured(monkeypatch):
+    monkeypatch.delenv('SOCKETIO_CORS_ORIGINS', raising=False)
+    assert socketio_cors_origins() is None
+
+    monkeypatch.setenv('SOCKETIO_CORS_ORIGINS', 'https://a.example.com, https://b.example.com')
+    assert socketio_cors_origins() == ['https://a.example.com', 'https://b.example.com']
+
+
+def test_page_edits_are_stored_zero_indexed(monkeypatch):
+    hub = make_hub()
+    hub.queue_update('doc-1', 'f1', 'page', 2, 's1')
+    hub.queue_update('doc-1', 'f1', 'position', {'x': 5, 'y': 6, 'page': 3}, 's1')
+    hub.flush_writes()
+
+    assert hub.db.updates == [('doc-1', {'f1': {'page_number': 2, 'position_x': 5, 'position_y': 6}})]
+
+
+def test_broadcasts_keep_the_editor_page_number(monkeypatch):
+    emitted = []
+    monkeypatch.setattr(collaboration.socketio, 'emit', lambda event, data, to=None: emitted.append(data))
+    hub = make_hub()
+    hub.queue_update('doc-1', 'f1', 'page', 2, 's1')
+    hub.flush_broadcasts()
+
+    assert emitted == [{'fieldId': 'f1', 'property': 'page', 'value': 2, 'sessionId': 's1'}]
+
+
+def test_only_stored_fields_accept_edits():
+    hub = make_hub(['f1'])
+
+    assert hub.field_exists('doc-1', 'f1')
+    assert hub.field_exists('doc-1', 'f1')
+    assert hub.db.reads == 1
+
+    assert not hub.field_exists('doc-1', 'detected-only')
+    # A field saved after the room loaded its ids is picked up on the next miss
+    hub.db.field_ids.add('saved-later')
+    assert hub.field_exists('doc-1', 'saved-later')
+
+
+def test_known_fields_are_dropped_with_the_room():
+    hub = make_hub(['f1'])
+    hub.join('sid-1', 'doc-1', {'sessionId': 's1'})
+    hub.field_exists('doc-1', 'f1')
+    hub.leave('sid-1')
+
+    assert 'doc-1' not in hub.known_fields
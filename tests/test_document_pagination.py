@@ -0,0 +1,105 @@
+import base64
+
+from supabase_client import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, clamp_page_size, decode_document_cursor, encode_document_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_document_cursor({'id': 'doc|1', 'created_at': '2024-01-01T10:00:00+00:00'})
+
+    assert decode_document_cursor(cursor) == ('2024-01-01T10:00:00+00:00', 'doc|1')
+    assert decode_document_cursor(encode_document_cursor({'id': 'doc-2'})) == ('', 'doc-2')
+
+
+def test_malformed_cursors_start_from_the_first_page():
+    assert decode_document_cursor(None) is None
+    assert decode_document_cursor('') is None
+    assert decode_document_cursor('not base64!') is None
+    assert decode_document_cursor(base64.urlsafe_b64encode(b'no separator').decode('ascii')) is None
+    assert decode_document_cursor('ünïcode') is None
+
+
+def test_page_size_is_clamped():
+    assert clamp_page_size(None) == DEFAULT_PAGE_SIZE
+    assert clamp_page_size(0) == DEFAULT_PAGE_SIZE
+    assert clamp_page_size(-5) == 1
+    assert clamp_page_size(10 ** 6) == MAX_PAGE_SIZE
+
+
+def make_documents(db, created_at_by_id):
+    owner_id = db.create_user('owner@example.com', 'hash')
+    for document_id, created_at in created_at_by_id.items():
+        db.create_document(document_id, f'Document {document_id}', f'uploads/{document_id}.pdf', owner_id)
+        db._update('documents', {'created_at': created_at}, 'id = ?', (document_id,))
+
+
+def walk_pages(db, limit, **kwargs):
+    ids, cursor = [], None
+    while True:
+        page = db.get_documents_page(limit=limit, cursor=cursor, **kwargs)
+        ids.extend(document['id'] for document in page['documents'])
+        cursor = page['next_cursor']
+        if not cursor:
+            return ids
+
+
+def test_keyset_pages_cover_every_document_once(sqlite_db):
+    # Several documents share a created_at, so the id tie-breaker decides their order
+    make_documents(sqlite_db, {
+        'a': '2024-01-01T00:00:00', 'b': '2024-01-02T00:00:00', 'c': '2024-01-02T00:00:00',
+        'd': '2024-01-02T00:00:00', 'e': '2024-01-03T00:00:00',
+    })
+
+    for limit in (1, 2, 3, 5, 10):
+        assert walk_pages(sqlite_db, limit) == ['e', 'd', 'c', 'b', 'a']
+
+    first = sqlite_db.get_documents_page(limit=2)
+    assert first['total_estimate'] == 5
+    assert first['limit'] == 2
+
+
+def test_last_page_has_no_cursor(sqlite_db):
+    make_documents(sqlite_db, {'a': '2024-01-01T00:00:00', 'b': '2024-01-02T00:00:00'})
+
+    assert sqlite_db.get_documents_page(limit=2)['next_cursor'] is None
+    assert sqlite_db.get_documents_page(limit=2, cursor='garbage')['next_cursor'] is None
+
+
+def test_user_pages_only_list_shared_documents(sqlite_db):
+    make_documents(sqlite_db, {'a': '2024-01-01T00:00:00', 'b': '2024-01-02T00:00:00', 'c': '2024-01-03T00:00:00'})
+    user_id = sqlite_db.create_user('user2@example.com', 'hash')
+    assert sqlite_db.add_user_to_document('b', user_id, 'editor', can_edit=True)
+    assert sqlite_db.add_user_to_document('c', user_id, 'viewer', can_edit=False)
+
+    page = sqlite_db.get_documents_page(limit=1, user_id=user_id)
+    assert [document['id'] for document in page['documents']] == ['c']
+    assert page['documents'][0]['user_documents'] == [{'role': 'viewer', 'can_edit': False, 'can_share': False}]
+    assert walk_pages(sqlite_db, 1, user_id=user_id) == ['c', 'b']
+
+
+def test_postgrest_keyset_filter_pages_through_ties(supabase_db):
+    supabase_db.supabase.tables['documents'] = [
+        {'id': document_id, 'name': document_id, 'created_at': created_at}
+        for document_id, created_at in (('a', '2024-01-01T00:00:00+00:00'), ('b', '2024-01-02T00:00:00+00:00'),
+                                        ('c', '2024-01-02T00:00:00+00:00'), ('d', '2024-01-02T00:00:00+00:00'),
+                                        ('e', '2024-01-03T00:00:00+00:00'))
+    ]
+
+    for limit in (1, 2, 3, 5):
+        assert walk_pages(supabase_db, limit) == ['e', 'd', 'c', 'b', 'a']
+
+    cursor = encode_document_cursor({'id': 'c', 'created_at': '2024-01-02T00:00:00+00:00'})
+    assert [document['id'] for document in supabase_db.get_documents_page(limit=10, cursor=cursor)['documents']] == ['b', 'a']
+
+
+def test_user_listing_is_empty_when_the_database_fails(monkeypatch):
+    import app as app_module
+
+    class BrokenDatabase:
+        def get_documents_page(self, **kwargs):
+            raise ConnectionError('database unavailable')
+
+    monkeypatch.setattr(app_module, 'USE_DATABASE', True)
+    monkeypatch.setattr(app_module, 'db', BrokenDatabase())
+
+    assert app_module.get_documents(user_id='user-1')['documents'] == []
+    assert app_module.get_documents()['documents'] == app_module.paginate_mock_documents(app_module.MOCK_DOCUMENTS)['documents']
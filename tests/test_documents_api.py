@@ -0,0 +1,72 @@
+import documents_api
+
+
+def test_stored_fields_use_one_indexed_pages(sqlite_db, monkeypatch):
+    owner_id = sqlite_db.create_user('owner@example.com', 'hash', 'Owner')
+    sqlite_db.create_document('d1', 'd1', 'uploads/d1.pdf', owner_id)
+    # Saved through the legacy PDFProcessor flow, which numbers pages from 0
+    sqlite_db.save_pdf_fields('d1', [{'id': 'first', 'name': 'First', 'page': 0},
+                                     {'id': 'second', 'name': 'Second', 'page': 1}])
+    monkeypatch.setattr(documents_api, 'db', sqlite_db, raising=False)
+
+    fields = documents_api.get_stored_fields('d1', 1)
+
+    assert [field['id'] for field in fields] == ['first']
+    assert fields[0]['page'] == 1
+    assert fields[0]['position']['page'] == 1
+    assert [field['page'] for field in documents_api.get_stored_fields('d1')] == [1, 2]
+
+
+def test_editor_saves_round_trip_to_the_same_page(sqlite_db, monkeypatch):
+    owner_id = sqlite_db.create_user('owner@example.com', 'hash', 'Owner')
+    sqlite_db.create_document('d1', 'd1', 'uploads/d1.pdf', owner_id)
+    monkeypatch.setattr(documents_api, 'db', sqlite_db, raising=False)
+
+    fields, pages = documents_api.to_stored_fields(
+        [{'id': 'f1', 'name': 'F1', 'position': {'x': 1, 'y': 2, 'width': 3, 'height': 4, 'page': 2}}], [2]
+    )
+    sqlite_db.save_pdf_fields('d1', fields, pages=pages)
+
+    assert pages == [1]
+    assert sqlite_db.get_document_fields('d1')[0]['page_number'] == 1
+    assert [field['id'] for field in documents_api.get_stored_fields('d1', 2)] == ['f1']
+
+
+def test_mock_documents_are_not_modified(monkeypatch):
+    document = {'id': 'mock', 'pdf_fields': [{'id': 'f1', 'page': 0, 'position': {'x': 1}}]}
+    monkeypatch.setattr(documents_api, 'db', None, raising=False)
+    monkeypatch.setattr(documents_api, 'get_api_document', lambda document_id: document)
+
+    assert documents_api.get_stored_fields('mock', 1)[0]['page'] == 1
+    assert document['pdf_fields'][0] == {'id': 'f1', 'page': 0, 'position': {'x': 1}}
+
+
+def test_concurrent_downloads_get_their_own_output_file(tmp_path, monkeypatch):
+    from flask import Flask
+
+    outputs = []
+
+    class RecordingProcessor:
+        def fill_pdf_realtime(self, pdf_path, field_values, output_path):
+            outputs.append(output_path)
+            with open(output_path, 'wb') as f:
+                f.write(b'%PDF-1.4 ' + output_path.encode())
+            return True
+
+    monkeypatch.setattr(documents_api, 'get_api_document', lambda document_id: {'id': document_id, 'name': 'Lease'})
+    monkeypatch.setattr(documents_api, 'document_pdf_path', lambda document: 'uploads/d1.pdf')
+    monkeypatch.setattr(documents_api, 'get_stored_fields', lambda document_id: [])
+    monkeypatch.setattr(documents_api, 'get_realtime_pdf_processor', lambda: RecordingProcessor())
+    app = Flask(__name__)
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    download = documents_api.download_document.__wrapped__.__wrapped__
+
+    with app.test_request_context():
+        first, second = download('d1'), download('d1')
+        first.direct_passthrough = second.direct_passthrough = False
+        assert first.get_data() != second.get_data()
+        first.close()
+        second.close()
+
+    assert len(set(outputs)) == 2
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,62 @@
+from field_model import FieldType, PDFField, Rect, compact, expand, pack_fields, unpack_fields
+
+
+def make_field():
+    return {
+        'id': 'field-1',
+        'name': 'Applicant',
+        'type': 'text',
+        'value': 'Jane',
+        'page': 0,
+        'position': {'x': 10, 'y': 20, 'width': 100, 'height': 18, 'page_width': 612},
+        'styling': {'font_size': 10, 'colors': [0, 0, 0]},
+        'options': ('a', ['b', 'c'], {'d': 1}),
+    }
+
+
+def test_pdf_field_round_trips_exactly():
+    field = make_field()
+    packed = PDFField.from_dict(field)
+
+    assert packed.type is FieldType.TEXT
+    assert packed.position == Rect(10, 20, 100, 18)
+    assert packed.to_dict() == field
+    assert type(packed.to_dict()['type']) is str
+
+
+def test_missing_keys_stay_missing():
+    field = {'id': 'field-2', 'type': 'mystery'}
+
+    assert PDFField.from_dict(field).to_dict() == field
+
+
+def test_unpacked_fields_share_nothing_with_the_cache():
+    field = make_field()
+    packed = pack_fields([field, {'widget': ['not', 'a', 'field']}])
+    field['options'][1].append('changed-source')
+
+    first = unpack_fields(packed)
+    first[0]['position']['x'] = 999
+    first[0]['styling']['colors'].append(1)
+    first[0]['options'][1].append('changed-copy')
+    first[0]['options'][2]['d'] = 2
+    first[1]['widget'].append('changed')
+
+    second = unpack_fields(packed)
+    assert second[0]['position']['x'] == 10
+    assert second[0]['styling']['colors'] == [0, 0, 0]
+    assert second[0]['options'] == ('a', ['b', 'c'], {'d': 1})
+    assert second[1] == {'widget': ['not', 'a', 'field']}
+
+
+def test_tuples_expand_to_fresh_tuples():
+    original = ({'a': [1]}, (2, [3]))
+    stored = compact(original)
+
+    first = expand(stored)
+    assert first == original
+    assert type(first) is tuple and type(first[1]) is tuple
+    first[0]['a'].append(4)
+    first[1][1].append(5)
+
+    assert expand(stored) == ({'a': [1]}, (2, [3]))
@@ -0,0 +1,30 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    import app as app_module
+    monkeypatch.setitem(app_module.app.config, 'UPLOAD_FOLDER', str(tmp_path / 'uploads'))
+    os.makedirs(app_module.app.config['UPLOAD_FOLDER'])
+    return app_module
+
+
+def test_upload_paths_must_stay_inside_the_upload_folder(app_module, tmp_path):
+    upload_folder = app_module.app.config['UPLOAD_FOLDER']
+    inside = os.path.join(upload_folder, 'form.pdf')
+    outside = tmp_path / 'secret.pdf'
+    outside.write_bytes(b'%PDF-1.4')
+    os.symlink(outside, os.path.join(upload_folder, 'link.pdf'))
+
+    assert app_module.resolve_upload_path(inside) == os.path.realpath(inside)
+    assert app_module.resolve_upload_path(os.path.join(upload_folder, '..', 'secret.pdf')) is None
+    assert app_module.resolve_upload_path(os.path.join(upload_folder, 'link.pdf')) is None
+    assert app_module.resolve_upload_path(upload_folder) is None
+
+
+def test_page_images_require_login(app_module):
+    response = app_module.app.test_client().get('/api/page-image/uploads/form.pdf/1')
+
+    assert response.status_code in (302, 401)
@@ -0,0 +1,62 @@
+import pytest
+
+from models import User
+from permission_cache import PermissionCache
+
+
+class FlakyPermissions:
+    """Fails the first lookup, then answers from a fixed row"""
+
+    def __init__(self, row):
+        self.row = row
+        self.calls = 0
+
+    def get_document_permission(self, document_id, user_id):
+        self.calls += 1
+        if self.calls == 1:
+            raise ConnectionError('database unavailable')
+        return self.row
+
+
+def test_failed_lookups_are_not_cached():
+    cache = PermissionCache(ttl_seconds=60)
+    db = FlakyPermissions({'role': 'owner', 'can_edit': True, 'can_share': True})
+
+    with pytest.raises(ConnectionError):
+        cache.get_permission(db, 'u1', 'd1')
+
+    assert cache.get_permission(db, 'u1', 'd1')['role'] == 'owner'
+    assert cache.get_permission(db, 'u1', 'd1')['role'] == 'owner'
+    assert db.calls == 2
+
+
+def test_no_access_is_cached():
+    cache = PermissionCache(ttl_seconds=60)
+    db = FlakyPermissions(None)
+    db.calls = 1
+
+    assert cache.get_permission(db, 'u1', 'd1') is None
+    assert cache.get_permission(db, 'u1', 'd1') is None
+    assert db.calls == 2
+
+
+def test_a_transient_error_only_denies_the_current_check(monkeypatch):
+    import models
+    monkeypatch.setattr(models, 'get_permission_cache', lambda cache=PermissionCache(ttl_seconds=60): cache)
+    # Built without __init__: it assigns is_active, which Flask-Login's UserMixin defines as a read-only property
+    user = User.__new__(User)
+    user.id, user.role = 'u1', 'user'
+    db = FlakyPermissions({'role': 'editor', 'can_edit': True, 'can_share': False})
+
+    assert user.can_access_document('d1', db) is False
+    assert user.can_access_document('d1', db) is True
+    assert user.can_edit_document('d1', db) is True
+
+
+def test_sqlite_errors_propagate(sqlite_db, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError('disk I/O error')
+    monkeypatch.setattr(sqlite_db, '_select', fail)
+
+    with pytest.raises(RuntimeError):
+        sqlite_db.get_document_permission('d1', 'u1')
@@ -0,0 +1,12 @@
+from preview_cache import PreviewCache
+
+
+def test_out_of_range_pages_render_nothing(form_pdf, tmp_path):
+    cache = PreviewCache(cache_dir=str(tmp_path / 'previews'))
+
+    first_page = cache.get_or_render_page(str(form_pdf), 0, 0.5)
+    assert first_page
+    for page_index in (-1, 4, 99):
+        assert cache.get_or_render_page(str(form_pdf), page_index, 0.5) is None
+    # Nothing was cached under the missing pages' keys either
+    assert cache.stats()['memory_entries'] == 1
@@ -0,0 +1,39 @@
+import os
+
+from extraction_engine import ExtractionEngine
+from realtime_pdf_processor import RealtimePDFProcessor
+
+
+def field_ids(result):
+    return [field['id'] for field in result['fields']]
+
+
+def test_ids_do_not_depend_on_path_or_parallelism(form_pdf, monkeypatch):
+    import realtime_pdf_processor
+
+    processor = RealtimePDFProcessor()
+    monkeypatch.setattr(realtime_pdf_processor, 'get_extraction_engine',
+                        lambda: ExtractionEngine(max_workers=1, min_parallel_pages=1000))
+    serial = field_ids(processor.detect_fields_with_positions(os.path.relpath(form_pdf)))
+
+    engine = ExtractionEngine(max_workers=2, min_parallel_pages=1)
+    monkeypatch.setattr(realtime_pdf_processor, 'get_extraction_engine', lambda: engine)
+    try:
+        parallel = field_ids(processor.detect_fields_with_positions(os.path.abspath(form_pdf)))
+    finally:
+        engine.shutdown()
+
+    assert serial and serial == parallel
+
+
+def test_page_ids_match_full_extraction_and_are_scoped_per_document(form_pdf):
+    processor = RealtimePDFProcessor()
+
+    page_ids = [field['id'] for field in processor.detect_page_fields(form_pdf, 2, use_cache=False)]
+    all_ids = field_ids(processor.detect_fields_with_positions(form_pdf))
+    first_document = [field['id'] for field in processor.detect_page_fields(form_pdf, 2, id_scope='doc-1')]
+    second_document = [field['id'] for field in processor.detect_page_fields(form_pdf, 2, id_scope='doc-2')]
+
+    assert page_ids and set(page_ids) <= set(all_ids)
+    assert first_document == [field['id'] for field in processor.detect_page_fields(form_pdf, 2, id_scope='doc-1')]
+    assert not set(first_document) & set(second_document)
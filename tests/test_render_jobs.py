@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+
+import pdf_renderer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_render_handler_does_not_import_the_flask_app():
+    # Each job worker resolves its handler by import, so the handler module must not pull in app.py
+    code = (
+        'import sys, job_queue, importlib\n'
+        'module_name, function_name = job_queue.JOB_HANDLERS["render_completed_pdf"]\n'
+        'getattr(importlib.import_module(module_name), function_name)\n'
+        'print("app" in sys.modules)\n'
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip().splitlines()[-1] == 'False'
+
+
+def test_render_dedupe_key_follows_field_values(form_pdf, monkeypatch):
+    import app as app_module
+
+    enqueued = []
+
+    class RecordingQueue:
+        def enqueue(self, job_type, payload, dedupe_key=None):
+            enqueued.append(dedupe_key)
+            return {'id': 'job'}
+
+    monkeypatch.setattr(app_module, 'get_job_queue', lambda: RecordingQueue())
+    document = {
+        'id': 'doc-1',
+        'file_path': str(form_pdf),
+        'updated_at': '2024-01-01T00:00:00',
+        'pdf_fields': [{'id': 'f1', 'value': 'before'}]
+    }
+
+    app_module.enqueue_render_job(document)
+    app_module.enqueue_render_job(document)
+    # A field save leaves documents.updated_at untouched
+    app_module.enqueue_render_job(dict(document, pdf_fields=[{'id': 'f1', 'value': 'after'}]))
+
+    assert enqueued[0] == enqueued[1]
+    assert enqueued[2] != enqueued[0]
+    assert pdf_renderer.completed_pdf_cache_key(document) in enqueued[0]
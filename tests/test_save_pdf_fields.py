@@ -0,0 +1,96 @@
+from supabase_client import build_field_record, diff_field_records, document_field_id
+
+
+def make_field(field_id, name='Field', value='', page=0, x=10.0):
+    return {'id': field_id, 'name': name, 'type': 'text', 'value': value, 'page': page,
+            'position': {'x': x, 'y': 20.0, 'width': 100.0, 'height': 14.0}}
+
+
+def create_documents(db, *document_ids):
+    owner_id = db.create_user('owner@example.com', 'hash', 'Owner')
+    for document_id in document_ids:
+        db.create_document(document_id, document_id, f"uploads/{document_id}.pdf", owner_id)
+
+
+def stored_fields(db, document_id):
+    return {field['id']: field for field in db.get_document_fields(document_id)}
+
+
+def test_diff_counts_added_updated_unchanged_and_removed():
+    existing = {
+        'keep': {'id': 'keep', 'field_name': 'Keep', 'field_type': 'text', 'field_value': '', 'assigned_to': 'user1',
+                 'position_x': 10.0, 'position_y': 20.0, 'width': 100.0, 'height': 14.0, 'page_number': 0,
+                 'source': 'extracted', 'pdf_field_name': '', 'is_required': False, 'created_at': 'then'},
+        'change': {'id': 'change', 'field_name': 'Change', 'field_value': 'old', 'page_number': 0, 'created_at': 'then'},
+        'gone': {'id': 'gone', 'page_number': 0},
+    }
+    records = [build_field_record('d1', field) for field in
+               (make_field('keep', 'Keep'), make_field('change', 'Change', 'new'), make_field('new', 'New'))]
+
+    inserts, updates, removed_ids, counts = diff_field_records('d1', records, existing, set(), now='now')
+
+    assert [record['id'] for record in inserts] == ['new']
+    assert [record['id'] for record in updates] == ['change']
+    assert updates[0]['created_at'] == 'then'
+    assert removed_ids == ['gone']
+    assert counts == {'added': 1, 'updated': 1, 'removed': 1, 'unchanged': 1}
+
+
+def test_diff_partial_save_keeps_fields_on_other_pages():
+    existing = {'p0': {'id': 'p0', 'page_number': 0}, 'p1': {'id': 'p1', 'page_number': 1}}
+
+    _, _, removed_ids, _ = diff_field_records('d1', [], existing, set(), pages=[1])
+
+    assert removed_ids == ['p1']
+
+
+def test_diff_gives_taken_ids_a_document_specific_id():
+    records = [build_field_record('d2', make_field('shared'))]
+
+    inserts, _, _, _ = diff_field_records('d2', records, {}, {'shared'})
+
+    assert inserts[0]['id'] == document_field_id('d2', 'shared')
+    assert inserts[0]['document_id'] == 'd2'
+
+
+def test_save_writes_only_changes(sqlite_db):
+    create_documents(sqlite_db, 'd1')
+
+    first = sqlite_db.save_pdf_fields('d1', [make_field('f1', 'One'), make_field('f2', 'Two')])
+    second = sqlite_db.save_pdf_fields('d1', [make_field('f1', 'One', 'filled'), make_field('f3', 'Three')])
+
+    assert first == {'added': 2, 'updated': 0, 'removed': 0, 'unchanged': 0}
+    assert second == {'added': 1, 'updated': 1, 'removed': 1, 'unchanged': 0}
+    fields = stored_fields(sqlite_db, 'd1')
+    assert set(fields) == {'f1', 'f3'}
+    assert fields['f1']['value'] == 'filled'
+
+
+def test_save_never_takes_another_documents_field(sqlite_db):
+    create_documents(sqlite_db, 'd1', 'd2')
+    sqlite_db.save_pdf_fields('d1', [make_field('shared', 'Original', 'd1 value')])
+
+    counts = sqlite_db.save_pdf_fields('d2', [make_field('shared', 'Copy', 'd2 value')])
+
+    assert counts['added'] == 1
+    d1_fields = stored_fields(sqlite_db, 'd1')
+    assert set(d1_fields) == {'shared'}
+    assert d1_fields['shared']['value'] == 'd1 value'
+    d2_fields = stored_fields(sqlite_db, 'd2')
+    assert set(d2_fields) == {document_field_id('d2', 'shared')}
+    assert d2_fields[document_field_id('d2', 'shared')]['value'] == 'd2 value'
+
+    # Saving the same editor state again maps onto the same row instead of re-inserting it
+    again = sqlite_db.save_pdf_fields('d2', [make_field('shared', 'Copy', 'd2 value')])
+    assert again == {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 1}
+    assert set(stored_fields(sqlite_db, 'd1')) == {'shared'}
+
+
+def test_partial_save_updates_a_field_moved_from_an_unsent_page(sqlite_db):
+    create_documents(sqlite_db, 'd1')
+    sqlite_db.save_pdf_fields('d1', [make_field('f1', page=0), make_field('f2', page=1)])
+
+    counts = sqlite_db.save_pdf_fields('d1', [make_field('f1', page=1)], pages=[1])
+
+    assert counts == {'added': 0, 'updated': 1, 'removed': 1, 'unchanged': 0}
+    assert {field_id: field['page'] for field_id, field in stored_fields(sqlite_db, 'd1').items()} == {'f1': 1}
@@ -0,0 +1,43 @@
+import random
+
+from page_analysis import SpanIndex
+
+
+def linear_nearest(entries, x, y, radius):
+    """The scan SpanIndex replaced: closest span within radius, first in reading order on ties"""
+    best, best_distance = None, None
+    for text, span_x, span_y in entries:
+        distance_squared = (span_x - x) ** 2 + (span_y - y) ** 2
+        if distance_squared <= radius * radius and (best_distance is None or distance_squared < best_distance):
+            best, best_distance = text, distance_squared
+    return best
+
+
+def test_ties_go_to_the_first_span_in_reading_order():
+    # Equidistant spans in different grid cells: the one added first wins, whatever cell it is in
+    entries = [('right', 150, 50), ('left', 50, 50), ('above', 100, 0)]
+    index = SpanIndex(entries, cell_size=100)
+
+    assert index.nearest(100, 50, radius=60) == 'right'
+    assert SpanIndex(entries[1:], cell_size=100).nearest(100, 50, radius=60) == 'left'
+
+
+def test_radius_is_inclusive_and_spans_cells():
+    index = SpanIndex([('far', 0, 0), ('edge', 300, 0)], cell_size=100)
+
+    assert index.nearest(0, 0, radius=0) == 'far'
+    assert index.nearest(200, 0, radius=100) == 'edge'
+    assert index.nearest(150, 0, radius=100) is None
+
+
+def test_matches_linear_scan():
+    rng = random.Random(7)
+    # Integer coordinates on a coarse lattice make ties common; negatives exercise floor()
+    entries = [(f'span{i}', rng.randrange(-200, 800, 10), rng.randrange(-200, 1000, 10)) for i in range(300)]
+
+    for cell_size in (25, 100, 333):
+        index = SpanIndex(entries, cell_size=cell_size)
+        for _ in range(300):
+            x, y = rng.randrange(-250, 850, 5), rng.randrange(-250, 1050, 5)
+            radius = rng.choice((0, 10, 50, 100, 250))
+            assert index.nearest(x, y, radius) == linear_nearest(entries, x, y, radius)
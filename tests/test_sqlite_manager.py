@@ -0,0 +1,148 @@
+import base64
+import os
+
+import blob_store
+from blob_store import BlobStore, LocalBlobBackend
+from supabase_client import DOCUMENT_VIEWS
+
+
+def make_field(field_id, page=0, y=20.0):
+    return {'id': field_id, 'name': field_id, 'type': 'text', 'value': 'v', 'assigned_to': 'user1', 'page': page,
+            'position': {'x': 10.0, 'y': y, 'width': 100.0, 'height': 14.0}}
+
+
+def test_documents_round_trip_json_columns(sqlite_db):
+    owner_id = sqlite_db.create_user('Owner@Example.com ', 'hash', 'Owner')
+    metadata = {'user1_data': {'name': 'Jane', 'tags': ['a', 'b']}, 'supporting_docs': [{'file': 'id.pdf'}]}
+    sqlite_db.create_document('doc-1', 'Lease', 'uploads/doc-1_lease.pdf', owner_id, metadata)
+
+    document = sqlite_db.get_document('doc-1', include_fields=False)
+    assert document['user1_data'] == {'name': 'Jane', 'tags': ['a', 'b']}
+    assert document['user2_data'] == {}
+    assert document['supporting_docs'] == [{'file': 'id.pdf'}]
+    assert document['original_filename'] == 'doc-1_lease.pdf'
+
+    assert sqlite_db.update_document('doc-1', {'status': 'completed', 'user2_data': {'signed': True}})
+    document = sqlite_db.get_document('doc-1', include_fields=False)
+    assert document['status'] == 'completed'
+    assert document['user2_data'] == {'signed': True}
+
+
+def test_load_document_projects_each_view(sqlite_db):
+    owner_id = sqlite_db.create_user('owner@example.com', 'hash')
+    sqlite_db.create_document('doc-1', 'Lease', 'uploads/doc-1.pdf', owner_id)
+    sqlite_db.save_pdf_fields('doc-1', [make_field('late', page=1), make_field('low', y=300.0), make_field('high')])
+
+    for view in DOCUMENT_VIEWS:
+        document = sqlite_db.load_document('doc-1', view)
+        assert document['id'] == 'doc-1'
+        assert [field['id'] for field in document['pdf_fields']] == ['high', 'low', 'late']
+
+    field = sqlite_db.load_document('doc-1')['pdf_fields'][0]
+    assert field['position'] == {'x': 10.0, 'y': 20.0, 'width': 100.0, 'height': 14.0}
+    assert (field['name'], field['type'], field['value'], field['page']) == ('high', 'text', 'v', 0)
+    assert field['is_required'] is False
+    assert sqlite_db.load_document('missing') is None
+
+
+def test_users_and_permissions(sqlite_db):
+    user_id = sqlite_db.create_user('Jane@Example.com', 'hash', 'Jane')
+    assert sqlite_db.create_user('jane@example.com', 'hash') is None
+
+    user = sqlite_db.get_user_by_email(' JANE@example.com')
+    assert user['id'] == user_id
+    assert user['is_active'] is True and user['email_verified'] is False
+
+    owner_id = sqlite_db.create_user('owner@example.com', 'hash')
+    sqlite_db.create_document('doc-1', 'Lease', 'uploads/doc-1.pdf', owner_id)
+    assert sqlite_db.get_document_permission('doc-1', owner_id) == {'role': 'owner', 'can_edit': True, 'can_share': False}
+    assert sqlite_db.get_document_permission('doc-1', user_id) is None
+
+    token = sqlite_db.create_document_invitation('doc-1', owner_id, 'jane@example.com', 'viewer')
+    assert sqlite_db.get_invitation_by_token(token)['documents'] == {'name': 'Lease', 'status': 'pending'}
+    assert sqlite_db.accept_invitation(token, user_id)
+    assert not sqlite_db.accept_invitation(token, user_id)
+    assert sqlite_db.get_document_permission('doc-1', user_id)['role'] == 'viewer'
+    assert [document['id'] for document in sqlite_db.get_user_documents(user_id)] == ['doc-1']
+
+
+def test_login_lockout(sqlite_db):
+    user_id = sqlite_db.create_user('jane@example.com', 'hash')
+
+    for _ in range(4):
+        sqlite_db.increment_login_attempts(user_id)
+    assert not sqlite_db.is_user_locked(user_id)
+    sqlite_db.increment_login_attempts(user_id)
+    assert sqlite_db.is_user_locked(user_id)
+
+    sqlite_db.update_user_login(user_id)
+    assert not sqlite_db.is_user_locked(user_id)
+    assert sqlite_db.get_user_by_id(user_id)['login_attempts'] == 0
+
+
+def test_delete_document_removes_its_rows(sqlite_db):
+    owner_id = sqlite_db.create_user('owner@example.com', 'hash')
+    sqlite_db.create_document('doc-1', 'Lease', 'uploads/doc-1.pdf', owner_id)
+    sqlite_db.save_pdf_fields('doc-1', [make_field('f1')])
+    assert sqlite_db.save_field_configuration('doc-1', 'f1', {'font_size': 12})
+    assert sqlite_db.get_field_configuration('doc-1', 'f1') == {'font_size': 12}
+
+    assert sqlite_db.delete_document('doc-1')
+    assert sqlite_db.get_document('doc-1') is None
+    assert sqlite_db.get_document_fields('doc-1') == []
+    assert sqlite_db.get_document_permission('doc-1', owner_id) is None
+    assert 'document_deleted' in [entry['action'] for entry in sqlite_db.get_audit_log('doc-1')]
+
+
+def test_templates_are_stored_in_the_blob_store(sqlite_db, form_pdf):
+    template_id = sqlite_db.upload_template_document('Intake', 'Intake form', str(form_pdf))
+
+    template = sqlite_db.get_template_document(template_id)
+    assert template['blob_key'] and template['file_data'] is None
+    assert template['is_active'] is True
+    assert [row['id'] for row in sqlite_db.get_active_templates()] == [template_id]
+    with open(form_pdf, 'rb') as f:
+        assert sqlite_db.get_template_file_data(template_id) == f.read()
+
+
+def insert_legacy_template(db, data):
+    db._insert('template_documents', {
+        'id': 'legacy', 'name': 'Legacy', 'filename': 'legacy.pdf', 'file_size': len(data),
+        'file_data': base64.b64encode(data).decode('ascii'), 'is_active': True,
+    })
+
+
+def test_legacy_template_bytes_stay_in_the_row_with_a_local_blob_store(sqlite_db):
+    insert_legacy_template(sqlite_db, b'%PDF-1.4 legacy')
+
+    path = sqlite_db.get_template_file_path('legacy')
+    with open(path, 'rb') as f:
+        assert f.read() == b'%PDF-1.4 legacy'
+    row = sqlite_db._select('template_documents', "SELECT * FROM template_documents WHERE id = 'legacy'")[0]
+    assert row['blob_key'] and row['file_data']
+
+    # Another node (or a fresh disk) doesn't have the local blob, but can still read the template
+    os.remove(path)
+    assert sqlite_db.get_template_file_data('legacy') == b'%PDF-1.4 legacy'
+
+
+def test_legacy_template_bytes_are_cleared_once_the_blob_is_shared(sqlite_db, tmp_path, monkeypatch):
+    class SharedBackend(LocalBlobBackend):
+        is_local = False
+
+    monkeypatch.setattr(blob_store, 'blob_store',
+                        BlobStore(SharedBackend(str(tmp_path / 'remote')), cache_dir=str(tmp_path / 'cache')))
+    insert_legacy_template(sqlite_db, b'%PDF-1.4 legacy')
+
+    assert sqlite_db.get_template_file_data('legacy') == b'%PDF-1.4 legacy'
+    row = sqlite_db._select('template_documents', "SELECT * FROM template_documents WHERE id = 'legacy'")[0]
+    assert row['blob_key'] and row['file_data'] is None
+
+
+def test_download_view_has_the_columns_summary_pdfs_print(sqlite_db):
+    owner_id = sqlite_db.create_user('owner@example.com', 'hash')
+    sqlite_db.create_document('doc-1', 'Lease', 'uploads/doc-1.pdf', owner_id)
+    sqlite_db.update_document('doc-1', {'status': 'completed', 'completed_at': '2024-05-06T07:08:09'})
+
+    document = sqlite_db.load_document('doc-1', 'download')
+    assert (document['status'], document['completed_at']) == ('completed', '2024-05-06T07:08:09')
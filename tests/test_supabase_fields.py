@@ -0,0 +1,33 @@
+import supabase_client
+
+
+def add_field_rows(db, document_id, count):
+    db.supabase.tables.setdefault('pdf_fields', []).extend(
+        {'id': f"{document_id}-{index:02d}", 'document_id': document_id, 'field_name': f"Field {index}",
+         'page_number': index % 2, 'position_y': float(index)}
+        for index in range(count)
+    )
+
+
+def test_batch_load_pages_past_the_server_row_limit(supabase_db, monkeypatch):
+    supabase_db.supabase.max_rows = 3
+    monkeypatch.setattr(supabase_client, 'FIELD_PAGE_SIZE', 3)
+    add_field_rows(supabase_db, 'd1', 7)
+    add_field_rows(supabase_db, 'd2', 2)
+
+    fields = supabase_db.get_documents_fields_batch(['d1', 'd2', 'd3'])
+
+    assert len(fields['d1']) == 7
+    assert len(fields['d2']) == 2
+    assert fields['d3'] == []
+    assert [(field['page'], field['position']['y']) for field in fields['d1']] == \
+        sorted((field['page'], field['position']['y']) for field in fields['d1'])
+
+
+def test_document_fields_page_past_the_server_row_limit(supabase_db, monkeypatch):
+    supabase_db.supabase.max_rows = 4
+    monkeypatch.setattr(supabase_client, 'FIELD_PAGE_SIZE', 4)
+    add_field_rows(supabase_db, 'd1', 8)
+
+    assert len(supabase_db.get_document_fields('d1')) == 8
+    assert len(supabase_db.get_document_fields('d1', page_number=1)) == 4
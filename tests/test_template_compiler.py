@@ -0,0 +1,43 @@
+import json
+import os
+
+import extraction_cache
+from extraction_cache import ExtractionCache
+from file_security import get_file_hash
+from template_compiler import TemplateCompiler
+from widget_index import get_widget_index
+
+
+def test_documents_get_their_own_copy_of_the_template(form_pdf, tmp_path):
+    compiler = TemplateCompiler(str(tmp_path / 'compiled'))
+    upload_folder = tmp_path / 'uploads'
+    upload_folder.mkdir()
+
+    manifest = compiler.compile(form_pdf, 'form.pdf')
+    first = compiler.create_document_file(manifest, str(upload_folder), 'doc-1', 'form.pdf')
+    second = compiler.create_document_file(manifest, str(upload_folder), 'doc-2', 'form.pdf')
+
+    assert first != second
+    assert os.path.basename(first) == 'doc-1_form.pdf'
+    assert not first.startswith(compiler.compiled_dir)
+    assert get_file_hash(first) == get_file_hash(second) == manifest['template_hash']
+    assert compiler.get_fields(manifest)
+
+
+def test_documents_fill_through_the_bundle_widget_index(form_pdf, tmp_path, monkeypatch):
+    compiler = TemplateCompiler(str(tmp_path / 'compiled'))
+    upload_folder = tmp_path / 'uploads'
+    upload_folder.mkdir()
+    manifest = compiler.compile(form_pdf, 'form.pdf')
+
+    # Another node: the bundle is there, but this node's extraction cache has never seen the template
+    monkeypatch.setattr(extraction_cache, 'extraction_cache', ExtractionCache(cache_dir=str(tmp_path / 'extraction')))
+    document_path = compiler.create_document_file(manifest, str(upload_folder), 'doc-1', 'form.pdf')
+
+    def rebuild_not_expected(widget):
+        raise AssertionError('widget index was rebuilt instead of read from the bundle')
+
+    with open(manifest['widgets_path'], encoding='utf-8') as f:
+        bundle_widgets = json.load(f)
+    assert bundle_widgets
+    assert get_widget_index(document_path, rebuild_not_expected, 'pymupdf') == bundle_widgets
@@ -0,0 +1,48 @@
+import json
+
+from user_cache import UserCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+USER_ROW = {
+    'id': 'u1', 'email': 'jane@example.com', 'name': 'Jane', 'role': 'user', 'is_active': True,
+    'email_verified': False, 'created_at': '2024-01-01', 'last_login': None,
+    'password_hash': '$2b$12$secret', 'login_attempts': 3, 'locked_until': None,
+}
+
+
+def make_cache():
+    cache = UserCache(ttl_seconds=60)
+    cache._redis = FakeRedis()
+    return cache
+
+
+def test_credentials_are_never_cached():
+    cache = make_cache()
+    cache.put('u1', USER_ROW)
+
+    shared = json.loads(cache._redis.values[cache.key_prefix + 'u1'])
+    for user_data in (cache.get('u1'), shared):
+        assert 'password_hash' not in user_data
+        assert 'login_attempts' not in user_data
+        assert user_data['email'] == 'jane@example.com' and user_data['is_active'] is True
+
+
+def test_full_rows_already_in_redis_are_stripped():
+    cache = make_cache()
+    cache._redis.setex(cache.key_prefix + 'u1', 60, json.dumps(USER_ROW))
+
+    assert 'password_hash' not in cache.get('u1')
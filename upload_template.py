@@ -5,14 +5,14 @@ Run this once to set up the template in production.
 """
 
 import os
-from supabase_client import SupabaseManager
+from supabase_client import create_database_manager
 
 def upload_template():
     """Upload homworks.pdf as a template document"""
     try:
         # Initialize database connection
-        db = SupabaseManager()
-        print("✅ Connected to Supabase database")
+        db = create_database_manager()
+        print(f"✅ Connected to {type(db).__name__} database")
         
         # Check if template already exists
         templates = db.get_active_templates()
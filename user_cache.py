@@ -0,0 +1,102 @@
+"""
+Cache of user records for the Flask-Login user loader
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional
+
+from ttl_cache import TTLCache
+
+# Columns the Flask-Login user needs; credentials and lockout state are always read fresh from the database
+CACHED_USER_COLUMNS = ('id', 'email', 'name', 'role', 'is_active', 'email_verified', 'created_at', 'last_login')
+
+
+def cacheable_user(user_data: Dict[str, Any]) -> Dict[str, Any]:
+    """The part of a users row that may be cached (no password hash or lockout counters)"""
+    return {column: user_data[column] for column in CACHED_USER_COLUMNS if column in user_data}
+
+
+class UserCache:
+    """In-process TTL LRU of user rows, optionally backed by Redis so workers share entries"""
+
+    def __init__(self, ttl_seconds: float = None, max_entries: int = None, redis_url: str = None):
+        self.ttl_seconds = ttl_seconds or float(os.getenv('USER_CACHE_TTL_SECONDS', '60'))
+        max_entries = max_entries or int(os.getenv('USER_CACHE_MAX_ENTRIES', '10000'))
+        redis_url = redis_url or os.getenv('USER_CACHE_REDIS_URL')
+        self.key_prefix = os.getenv('USER_CACHE_REDIS_PREFIX', 'pdfcollab:user:')
+
+        self._redis = self._connect_redis(redis_url) if redis_url else None
+
+        # With a shared backend, other workers' invalidations only reach us through Redis,
+        # so the local copy is kept just long enough to absorb bursts within a page load
+        local_ttl = min(self.ttl_seconds, 5.0) if self._redis else self.ttl_seconds
+        self._local = TTLCache(max_entries=max_entries, ttl_seconds=local_ttl)
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached user row, or None"""
+        user_data = self._local.get(user_id)
+        if user_data is not None:
+            return dict(user_data)
+
+        if self._redis is None:
+            return None
+
+        try:
+            payload = self._redis.get(self.key_prefix + user_id)
+        except Exception as e:
+            print(f"⚠️  User cache backend read failed: {e}")
+            return None
+
+        if payload is None:
+            return None
+
+        # Entries written before CACHED_USER_COLUMNS existed may still carry the full row
+        user_data = cacheable_user(json.loads(payload))
+        self._local.put(user_id, user_data)
+        return dict(user_data)
+
+    def put(self, user_id: str, user_data: Dict[str, Any]) -> None:
+        """Cache a user row (only CACHED_USER_COLUMNS are kept)"""
+        user_data = cacheable_user(user_data)
+        self._local.put(user_id, user_data)
+
+        if self._redis is not None:
+            try:
+                self._redis.setex(self.key_prefix + user_id, int(self.ttl_seconds), json.dumps(user_data, default=str))
+            except Exception as e:
+                print(f"⚠️  User cache backend write failed: {e}")
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget a user so the next request reloads it from the database"""
+        self._local.invalidate(user_id)
+
+        if self._redis is not None:
+            try:
+                self._redis.delete(self.key_prefix + user_id)
+            except Exception as e:
+                print(f"⚠️  User cache backend invalidation failed: {e}")
+
+    def _connect_redis(self, redis_url: str):
+        try:
+            import redis
+        except ImportError:
+            print("⚠️  USER_CACHE_REDIS_URL is set but the redis package is not installed; using in-process user cache only")
+            return None
+
+        try:
+            client = redis.Redis.from_url(redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+            client.ping()
+            print("✅ User cache connected to Redis")
+            return client
+        except Exception as e:
+            print(f"⚠️  Could not connect user cache to Redis ({e}); using in-process user cache only")
+            return None
+
+
+# Global instance
+user_cache = UserCache()
+
+def get_user_cache() -> UserCache:
+    """Get the global user cache instance"""
+    return user_cache
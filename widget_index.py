@@ -0,0 +1,107 @@
+"""
+Per-template index of form widgets (field name -> page, xref, type, rect) used to fill PDFs without scanning every page
+"""
+
+import fitz  # PyMuPDF
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from extraction_cache import get_extraction_cache
+
+# Bump when the index layout changes so stale cache entries are ignored
+WIDGET_INDEX_VERSION = "1"
+
+
+def build_widget_index(doc, get_widget_type: Callable) -> List[Dict[str, Any]]:
+    """Scan every widget of an open document once"""
+    entries = []
+    for page_num in range(len(doc)):
+        for widget in doc[page_num].widgets():
+            if not widget.field_name:
+                continue
+            rect = widget.rect
+            entries.append({
+                'name': widget.field_name,
+                'page': page_num,
+                'xref': widget.xref,
+                'type': get_widget_type(widget),
+                'rect': [rect.x0, rect.y0, rect.x1, rect.y1]
+            })
+    return entries
+
+def seed_widget_index(file_hash: str, index_name: str, entries: List[Dict[str, Any]]) -> None:
+    """Store a widget index built elsewhere (a compiled template bundle) unless one is already cached"""
+    cache = get_extraction_cache()
+    cache_key = cache.make_key(file_hash, f"{WIDGET_INDEX_VERSION}-widgets-{index_name}")
+    if cache.get(cache_key) is None:
+        cache.put(cache_key, entries)
+
+def get_widget_index(pdf_path: str, get_widget_type: Callable, index_name: str,
+                     doc=None) -> Optional[List[Dict[str, Any]]]:
+    """Widget index of a template, cached by file hash; index_name separates processors that classify types differently"""
+    cache = get_extraction_cache()
+    cache_key = cache.key_for_file(pdf_path, f"{WIDGET_INDEX_VERSION}-widgets-{index_name}")
+
+    if cache_key:
+        entries = cache.get(cache_key)
+        if entries is not None:
+            return entries
+
+    try:
+        if doc is None:
+            template = fitz.open(pdf_path)
+            try:
+                entries = build_widget_index(template, get_widget_type)
+            finally:
+                template.close()
+        else:
+            entries = build_widget_index(doc, get_widget_type)
+    except Exception as e:
+        print(f"⚠️  Could not build widget index for {pdf_path}: {e}")
+        return None
+
+    if cache_key:
+        cache.put(cache_key, entries)
+    return entries
+
+def iter_fill_widgets(doc, field_names, index: Optional[List[Dict[str, Any]]],
+                      get_widget_type: Callable) -> Iterator[Tuple[Any, Any, str]]:
+    """Yield (page, widget, widget_type) for the widgets named in field_names
+
+    With an index only the pages holding those widgets are loaded; without one (or if the index
+    doesn't match the document) every widget of every page is scanned as before.
+    """
+    targets = _resolve_targets(doc, field_names, index) if index is not None else None
+
+    if targets is None:
+        for page_num in range(len(doc)):
+            page = doc[page_num]
+            for widget in list(page.widgets()):
+                if widget.field_name and widget.field_name in field_names:
+                    yield page, widget, get_widget_type(widget)
+        return
+
+    yield from targets
+
+def _resolve_targets(doc, field_names, index: List[Dict[str, Any]]) -> Optional[List[Tuple[Any, Any, str]]]:
+    by_page: Dict[int, List[Dict[str, Any]]] = {}
+    for entry in index:
+        if entry['name'] in field_names:
+            by_page.setdefault(entry['page'], []).append(entry)
+
+    # Load everything before filling anything, so a mismatch can still fall back to the full scan
+    targets = []
+    try:
+        for page_num in sorted(by_page):
+            page = doc[page_num]
+            for entry in by_page[page_num]:
+                widget = page.load_widget(entry['xref'])
+                if widget is None or widget.field_name != entry['name']:
+                    print(f"⚠️  Widget index out of date at '{entry['name']}', scanning all pages")
+                    return None
+                targets.append((page, widget, entry['type']))
+    except Exception as e:
+        print(f"⚠️  Widget index lookup failed ({e}), scanning all pages")
+        return None
+
+    print(f"🗂️  Widget index: {len(targets)} widgets on {len(by_page)} of {len(doc)} pages")
+    return targets